@@ -0,0 +1,287 @@
+import os
+import sys
+from typing import Any
+
+from pylogic.classes import State, PagedMemory
+from pylogic.components.memory import RAM
+from pylogic.components.wiring import Clock
+from pylogic.enums import BitState
+from pylogic.snapshot import Snapshot
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "LEV32"))
+
+from machine import Lev32Machine  # noqa: E402
+
+# The architectural state both engines are compared on, by the data bus location LEV32 keeps it in
+REGISTERS = {"A": 1, "B": 2, "C": 3, "D": 4, "ALU-A": 5, "ALU-B": 6, "ALU-C": 7, "ALU-OA": 8, "ALU-OB": 9}
+COUNTER = "IC"
+MEMORIES = ("RAM", "GRAM", "Text GRAM")
+# Stands in for a location the candidate does not have
+MISSING = "nothing"
+
+# Where the Virus32 model in Circuit.circ keeps the architectural state, by instance path and port in its netlist.
+# The arithmetic parts of its ALU are not imported, so ALU-OA and ALU-OB read as errors once the ALU is used.
+VIRUS32_LOCATIONS = {
+	"A": ("/BufferedRegister(1400, 370)/Register(780, 250)", "Q"),
+	"B": ("/BufferedRegister(1400, 470)/Register(780, 250)", "Q"),
+	"C": ("/BufferedRegister(1400, 570)/Register(780, 250)", "Q"),
+	"D": ("/BufferedRegister(1400, 670)/Register(780, 250)", "Q"),
+	"ALU-A": ("/Register(1950, 240)", "Q"),
+	"ALU-B": ("/Register(1950, 360)", "Q"),
+	"ALU-C": ("/Register(1950, 480)", "Q"),
+	"ALU-OA": ("/BufferedRegister(2220, 270)/Register(780, 250)", "Q"),
+	"ALU-OB": ("/BufferedRegister(2220, 390)/Register(780, 250)", "Q"),
+	COUNTER: ("/Counter(410, 2090)", "O"),
+}
+VIRUS32_MEMORIES = {"RAM": "/RAM(1160, 870)"}
+VIRUS32_START = "/Button(320, 310)"
+VIRUS32_FREQUENCY = 1000
+# Both graphics memories sit in the FrameGraphics and CharGraphics subcircuits, which the importer does not support
+VIRUS32_UNCHECKED = ("GRAM", "Text GRAM")
+
+
+class Divergence:
+	def __init__(self, instruction: int, location: str, expected, actual):
+		self.instruction = instruction
+		self.location = location
+		self.expected = expected
+		self.actual = actual
+
+	def __str__(self):
+		return f"Engines diverged after instruction {self.instruction} on {self.location}: expected {self.expected}, got {self.actual}"
+
+
+def compare(expected: dict[str, Any], actual: dict[str, Any], unchecked: set[str] = frozenset()) -> tuple[str, Any, Any] | None:
+	"""
+	The first location that differs as (location, expected, actual), memories word by word. A location expected but
+	missing from actual differs too, with MISSING as its value, unless it is one of unchecked.
+	"""
+	for name, value in expected.items():
+		if name in unchecked:
+			continue
+		if name not in actual:
+			return name, value, MISSING
+		other = actual[name]
+		if other == value:
+			continue
+		if isinstance(value, dict):
+			# Words stored as zero on one side only are no difference
+			differing = [address for address in value.keys() | other.keys() if value.get(address, 0) != other.get(address, 0)]
+			if not differing:
+				continue
+			address = min(differing)
+			return f"{name}[{address:#x}]", value.get(address, 0), other.get(address, 0)
+		return name, value, other
+	return None
+
+
+def memory_words(memory: PagedMemory) -> dict[int, int | State]:
+	"""The nonzero words of memory as {address: word}, words with unknown bits as their State."""
+	words = {}
+	for number, page in memory.values.items():
+		unknowns = memory.unknowns.get(number)
+		start = number << memory.page_bits
+		for offset, value in enumerate(page):
+			if unknowns is not None and unknowns[offset]:
+				words[start + offset] = memory[start + offset]
+			elif value:
+				words[start + offset] = value
+	return words
+
+
+class Lev32Engine:
+	"""A LEV32 machine as an engine of a co-simulation. Being the cheap one, it is meant to be the reference."""
+	unchecked = ()
+
+	def __init__(self, machine: Lev32Machine):
+		self.machine = machine
+
+	@property
+	def instructions(self) -> int:
+		return self.machine.executed
+
+	@property
+	def halted(self) -> bool:
+		return self.machine.halted
+
+	def run(self, count: int) -> int:
+		return self.machine.run(count)
+
+	def state(self) -> dict[str, Any]:
+		machine = self.machine
+		if machine.alu_stale and machine.alu_mode == 0:
+			machine.update_alu()
+		state = {name: machine.registers[index] for name, index in REGISTERS.items()}
+		# Lines without an instruction take no time, so the counter stands at the next line that has one
+		counter = machine.line_counter + 1
+		lines = machine.program.lines
+		while counter < len(lines) and lines[counter] is None:
+			counter += 1
+		state[COUNTER] = counter
+		state["RAM"] = dict(machine.ram.items())
+		state["GRAM"] = dict(machine.gram[0].items())
+		state["Text GRAM"] = dict(machine.gram[1].items())
+		return state
+
+	def checkpoint(self) -> bytes:
+		return self.machine.snapshot()
+
+	def restore(self, checkpoint: bytes):
+		self.machine.restore(checkpoint)
+
+
+class PylogicEngine:
+	"""
+	A pylogic model as an engine of a co-simulation.
+
+	locations maps the name of every location to compare to the Bus or the component holding it, the component's
+	state being read. memories maps memory names to their RAM components. Every register, the counter and every
+	memory of LEV32 has to be mapped or named in unchecked, which the comparison then skips. An instruction lasts from
+	one change of the counter location to the next, clocked by run_until of clock, which gives up after limit cycles.
+	"""
+
+	def __init__(
+			self,
+			components: list,
+			clock,
+			locations: dict[str, Any],
+			memories: dict[str, Any] = None,
+			counter: str = COUNTER,
+			limit: int = 64,
+			unchecked: tuple[str, ...] = ()
+	):
+		self.components = components
+		self.clock = clock
+		self.locations = locations
+		self.memories = memories or {}
+		self.counter = counter
+		self.limit = limit
+		self.unchecked = unchecked
+		self.instructions = 0
+		self.halted = False
+		missing = [name for name in [*REGISTERS, counter, *MEMORIES] if name not in {*locations, *self.memories, *unchecked}]
+		if missing:
+			raise ValueError(f"The model maps no location for {', '.join(missing)}; map them or list them as unchecked")
+
+	@staticmethod
+	def read(source) -> int | State:
+		state = source.state
+		return state if state.unknown else state.value
+
+	def run(self, count: int) -> int:
+		ran = 0
+		counter = self.locations[self.counter]
+		while ran < count and not self.halted:
+			start = counter.state
+			self.clock.run_until(lambda: counter.state != start, self.limit)
+			if counter.state == start:
+				# The counter stopped moving, the way the CPU halts
+				self.halted = True
+				break
+			ran += 1
+		self.instructions += ran
+		return ran
+
+	def state(self) -> dict[str, Any]:
+		state = {name: self.read(source) for name, source in self.locations.items()}
+		for name, ram in self.memories.items():
+			state[name] = memory_words(ram.locs)
+		return state
+
+	def checkpoint(self) -> tuple[int, bool, Snapshot]:
+		return self.instructions, self.halted, Snapshot.take(self.components)
+
+	def restore(self, checkpoint: tuple[int, bool, Snapshot]):
+		self.instructions, self.halted, snapshot = checkpoint
+		snapshot.restore(self.components)
+
+
+def virus32_engine(circuit, limit: int = 64) -> PylogicEngine:
+	"""
+	The Virus32 model imported from Circuit.circ as an engine, its graphics memories left unchecked. Start is pressed
+	and a Clock drives the clock net, which the import leaves undriven.
+	"""
+	start = circuit.pins[VIRUS32_START]
+	start.set_state(State(1, starter=BitState.HIGH))
+	start.set_state(State(1, starter=BitState.LOW))
+	clock = Clock(VIRUS32_FREQUENCY)
+	clock.C.set_b(circuit.clock)
+	instances = {where: ports for _, where, _, ports in circuit.netlist.components}
+	locations = {name: circuit.buses[instances[where][port]] for name, (where, port) in VIRUS32_LOCATIONS.items()}
+	memories = {}
+	for name, where in VIRUS32_MEMORIES.items():
+		address = circuit.buses[instances[where]["A"]]
+		memories[name] = next(c for c in circuit.components if isinstance(c, RAM) and c.A.bus is address)
+	return PylogicEngine(circuit.components + [clock], clock, locations, memories, limit=limit, unchecked=VIRUS32_UNCHECKED)
+
+
+class Cosimulation:
+	"""
+	Runs one program on a reference and a candidate engine in lockstep and finds the first instruction after which
+	their architectural states differ.
+
+	The reference runs ahead by checkpoint samples, one every interval instructions, keeping its state at each; the
+	candidate then runs through them, compared at every sample. When a sample differs both engines go back to the
+	checkpoint of the last round and step one instruction at a time up to it, which pins down the instruction that
+	diverged without comparing every one on the way there.
+	"""
+
+	def __init__(self, reference, candidate, interval: int = 1, checkpoint: int = 64):
+		self.reference = reference
+		self.candidate = candidate
+		self.interval = interval
+		self.checkpoint = checkpoint
+		self.unchecked = {*reference.unchecked, *candidate.unchecked}
+		self.samples = 0
+
+	def run(self, limit: int | None = None) -> Divergence | None:
+		"""Runs until both engines halt or limit instructions have run. Returns the first divergence, if there is one."""
+		reference, candidate = self.reference, self.candidate
+		instruction = 0
+		divergence = self.sample(instruction)
+		if divergence is not None:
+			return divergence
+		while not reference.halted and (limit is None or instruction < limit):
+			saved = (instruction, reference.checkpoint(), candidate.checkpoint())
+			samples = []
+			for _ in range(self.checkpoint):
+				count = self.interval if limit is None else min(self.interval, limit - instruction)
+				ran = reference.run(count)
+				instruction += ran
+				samples.append((ran, instruction, reference.state()))
+				if reference.halted or ran < count or instruction == limit:
+					break
+			for ran, at, expected in samples:
+				if candidate.run(ran) != ran or self.differs(expected, candidate.state()):
+					return self.bisect(saved, at)
+			# A model only notices that it halted once it fails to run another instruction
+			if reference.halted and not candidate.halted and candidate.run(1):
+				return Divergence(instruction + 1, "halted", True, False)
+		return None
+
+	def differs(self, expected: dict[str, Any], actual: dict[str, Any]) -> bool:
+		self.samples += 1
+		return compare(expected, actual, self.unchecked) is not None
+
+	def sample(self, instruction: int) -> Divergence | None:
+		self.samples += 1
+		difference = compare(self.reference.state(), self.candidate.state(), self.unchecked)
+		return Divergence(instruction, *difference) if difference is not None else None
+
+	def bisect(self, saved: tuple, end: int) -> Divergence:
+		instruction, reference, candidate = saved
+		self.reference.restore(reference)
+		self.candidate.restore(candidate)
+		while instruction < end:
+			instruction += 1
+			if self.reference.run(1) != self.candidate.run(1):
+				return Divergence(instruction, "halted", self.reference.halted, self.candidate.halted)
+			divergence = self.sample(instruction)
+			if divergence is not None:
+				return divergence
+		raise RuntimeError("Replaying from the checkpoint did not diverge again, so an engine is not deterministic")
+
+
+def lockstep(machine: Lev32Machine, candidate, interval: int = 1, checkpoint: int = 64, limit: int = None) -> Divergence | None:
+	"""Co-simulates candidate against machine as the reference, from the state both are in."""
+	return Cosimulation(Lev32Engine(machine), candidate, interval, checkpoint).run(limit)
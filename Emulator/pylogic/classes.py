@@ -1,68 +1,236 @@
+from array import array
+
 from .enums import BitState
 
+# Every bit is stored in two integer planes: ``value`` and ``unknown``.
+#   LOW      -> value 0, unknown 0
+#   HIGH     -> value 1, unknown 0
+#   FLOATING -> value 0, unknown 1
+#   ERROR    -> value 1, unknown 1
+_PLANES = {
+	BitState.LOW: (0, 0),
+	BitState.HIGH: (1, 0),
+	BitState.FLOATING: (0, 1),
+	BitState.ERROR: (1, 1),
+}
+_STATES = {planes: state for state, planes in _PLANES.items()}
+
 
 class State:
+	__slots__ = ("width", "mask", "value", "unknown")
+
 	def __init__(self, width: int, starter: BitState = BitState.FLOATING):
 		self.width = width
-		self.bits = [starter] * width
+		self.mask = (1 << width) - 1
+		value, unknown = _PLANES[starter]
+		self.value = self.mask if value else 0
+		self.unknown = self.mask if unknown else 0
+
+	@classmethod
+	def from_planes(cls, width: int, value: int, unknown: int = 0):
+		state = cls.__new__(cls)
+		state.width = width
+		state.mask = (1 << width) - 1
+		state.value = value & state.mask
+		state.unknown = unknown & state.mask
+		return state
+
+	def copy(self):
+		return State.from_planes(self.width, self.value, self.unknown)
 
 	def __str__(self):
-		if any(self.bits[i] == BitState.FLOATING for i in range(self.width)):
+		if self.unknown & ~self.value:
 			return 'Undefined'
-		elif any(self.bits[i] == BitState.ERROR for i in range(self.width)):
+		elif self.unknown:
 			return 'Error'
 		else:
-			binary = ""
-			for i in range(self.width):
-				if self.bits[i] == BitState.FLOATING:
-					binary += "0"
-				elif self.bits[i] == BitState.ERROR:
-					binary += "1"
-			return f"{int(binary, 2):x} = {int(binary, 2)} = {binary}"
+			return f"{self.value:x} = {self.value} = {self.value:0{self.width}b}"
+
+	def __repr__(self):
+		return f"State({self.width}, value={self.value:#x}, unknown={self.unknown:#x})"
+
+	def __eq__(self, other):
+		if not isinstance(other, State):
+			return NotImplemented
+		return self.width == other.width and self.value == other.value and self.unknown == other.unknown
+
+	def __hash__(self):
+		return hash((self.width, self.value, self.unknown))
+
+	def __len__(self):
+		return self.width
+
+	def __getitem__(self, index: int | slice):
+		if isinstance(index, slice):
+			start, stop, step = index.indices(self.width)
+			if step == 1:
+				width = max(stop - start, 0)
+				return State.from_planes(width, self.value >> start, self.unknown >> start)
+			indices = range(start, stop, step)
+			state = State(len(indices))
+			for i, j in enumerate(indices):
+				state.set(i, self.get(j))
+			return state
+		return self.get(index)
 
 	def get(self, index: int) -> BitState:
-		return self.bits[index]
+		if index < 0:
+			index += self.width
+		return _STATES[((self.value >> index) & 1, (self.unknown >> index) & 1)]
 
 	def set(self, index: int, state: BitState):
-		self.bits[index] = state
+		if index < 0:
+			index += self.width
+		bit = 1 << index
+		value, unknown = _PLANES[state]
+		self.value = (self.value | bit) if value else (self.value & ~bit)
+		self.unknown = (self.unknown | bit) if unknown else (self.unknown & ~bit)
+
+	@property
+	def bits(self) -> list[BitState]:
+		return [self.get(i) for i in range(self.width)]
+
+	@bits.setter
+	def bits(self, bits: list[BitState]):
+		self.width = len(bits)
+		self.mask = (1 << self.width) - 1
+		self.value = 0
+		self.unknown = 0
+		for i, bit in enumerate(bits):
+			self.set(i, bit)
+
+	@property
+	def defined(self):
+		return not self.unknown
+
+	@property
+	def floating(self):
+		return self.unknown & ~self.value
+
+	@property
+	def error(self):
+		return self.unknown & self.value
+
+	@property
+	def unsigned(self):
+		if self.unknown:
+			raise ValueError
+		return self.value
 
 	def from_int(self, i: int, tc=False):
-		if not (-(2**(self.width / 2)) <= i < 2**(self.width / 2)):
+		if not (-(1 << (self.width - 1)) <= i < (1 << (self.width - (1 if tc else 0)))):
 			raise ValueError(f"Integer {i} is too big or too small")
-		if not tc:
-			for j in range(self.width, -1, -1):
-				if i > 2 ** j:
-					i -= 2 ** j
-					self.set(j, BitState.HIGH)
-				else:
-					self.set(j, BitState.LOW)
-		else:
-			for j in range(self.width - 1, -1, -1):
-				if i > 2 ** j:
-					i -= 2 ** j
-					self.set(j, BitState.HIGH)
-				else:
-					self.set(j, BitState.LOW)
-			if i < 0:
-				self.set(self.width - 1, BitState.HIGH)
-			else:
-				self.set(self.width - 1, BitState.LOW)
+		self.value = i & self.mask
+		self.unknown = 0
 		return self
 
 	def __int__(self):
-		if any(self.bits[i] == BitState.FLOATING or self.bits[i] == BitState.ERROR for i in range(self.width)):
+		if self.unknown:
 			raise ValueError
-		out = 0
-		for i in range(self.width - 1):
-			if self.bits[i] == BitState.HIGH:
-				out += 2**i
-		return out - ((2**(self.width - 1)) if self.bits[-1] == BitState.HIGH else 0)
+		if self.width and self.value >> (self.width - 1):
+			return self.value - (1 << self.width)
+		return self.value
 
 	def __neg__(self):
-		state = State(self.width)
-		for i in range(self.width):
-			state.set(i, -self.get(i))
-		return state
+		return State.from_planes(self.width, ~self.value | self.unknown, self.unknown)
 
 	def set_all(self, state: BitState):
-		self.bits = [state] * self.width
+		value, unknown = _PLANES[state]
+		self.value = self.mask if value else 0
+		self.unknown = self.mask if unknown else 0
+
+
+class PagedMemory:
+	"""
+	The cells of a RAM or ROM, stored in pages that are allocated on the first write to them.
+
+	Untouched cells read as LOW, or from image when one is attached, so memory use follows the touched addresses
+	rather than the address width and clearing only drops the pages. The unknown plane of a page is only allocated once
+	an unknown bit is written to it. Copies share their pages until either side writes to one.
+	"""
+
+	def __init__(self, addr_width: int, data_width: int, page_bits: int = 8):
+		self.addr_width = addr_width
+		self.data_width = data_width
+		self.page_bits = min(page_bits, addr_width)
+		self.page_mask = (1 << self.page_bits) - 1
+		# Words wider than the largest array type are kept in plain lists
+		self.typecode = next((code for code in "BHIQ" if array(code).itemsize * 8 >= data_width), None)
+		self.values: dict[int, array | list] = {}
+		self.unknowns: dict[int, array | list] = {}
+		# Anything with word(address) -> int, such as the images in util
+		self.image = None
+		# Pages that another copy may still hold
+		self.shared: set[int] = set()
+
+	def __len__(self):
+		return 1 << self.addr_width
+
+	def page(self) -> array | list:
+		if self.typecode is None:
+			return [0] * (1 << self.page_bits)
+		return array(self.typecode, bytes(array(self.typecode).itemsize << self.page_bits))
+
+	def __getitem__(self, address: int) -> State:
+		number = address >> self.page_bits
+		values = self.values.get(number)
+		if values is None:
+			return State.from_planes(self.data_width, self.image.word(address) if self.image is not None else 0)
+		offset = address & self.page_mask
+		unknowns = self.unknowns.get(number)
+		return State.from_planes(self.data_width, values[offset], unknowns[offset] if unknowns is not None else 0)
+
+	def __setitem__(self, address: int, state: State):
+		self.set(address, state.value, state.unknown)
+
+	def set(self, address: int, value: int, unknown: int = 0):
+		number = address >> self.page_bits
+		offset = address & self.page_mask
+		if number in self.shared:
+			self.unshare(number)
+		values = self.values.get(number)
+		if values is None:
+			values = self.values[number] = self.page()
+			if self.image is not None:
+				mask = (1 << self.data_width) - 1
+				start = number << self.page_bits
+				for i in range(len(values)):
+					values[i] = self.image.word(start + i) & mask
+		values[offset] = value
+		unknowns = self.unknowns.get(number)
+		if unknowns is None and unknown:
+			unknowns = self.unknowns[number] = self.page()
+		if unknowns is not None:
+			unknowns[offset] = unknown
+
+	def unshare(self, number: int):
+		self.shared.discard(number)
+		if number in self.values:
+			self.values[number] = self.values[number][:]
+		if number in self.unknowns:
+			self.unknowns[number] = self.unknowns[number][:]
+
+	def clear(self):
+		self.values = {}
+		self.unknowns = {}
+		self.image = None
+		self.shared = set()
+
+	def copy(self):
+		memory = PagedMemory(self.addr_width, self.data_width, self.page_bits)
+		memory.values = dict(self.values)
+		memory.unknowns = dict(self.unknowns)
+		memory.image = self.image
+		self.shared |= self.values.keys()
+		memory.shared = set(self.shared)
+		return memory
+
+	def first_difference(self, other: "PagedMemory") -> int | None:
+		for number in sorted(set(self.values) | set(other.values)):
+			if self.values.get(number) == other.values.get(number) and self.unknowns.get(number) == other.unknowns.get(number):
+				continue
+			start = number << self.page_bits
+			for address in range(start, start + (1 << self.page_bits)):
+				if self[address] != other[address]:
+					return address
+		return None
@@ -11,6 +11,7 @@ class Multiplexer:
 		self.state = State(width)
 		self.selector_width = selector_width
 		self.S = InputPort(selector_width)
+		self.S.set_callback(self.on_change)
 		self.inputs = []
 		for _ in range(2**selector_width):
 			ip = InputPort(width)
@@ -22,12 +23,12 @@ class Multiplexer:
 		self.on_change(self.S.state, self.S)
 
 	def on_change(self, state: State, _):
-		if any(state.get(i) == BitState.FLOATING for i in range(self.width)):
+		if state.floating:
 			self.O.set_state(State(self.width))
-		elif any(state.get(i) == BitState.ERROR for i in range(self.width)):
+		elif state.error:
 			self.O.set_state(State(self.width, starter=BitState.ERROR))
 		else:
-			self.O.set_state(self.inputs[int(state)].state)
+			self.O.set_state(self.inputs[state.unsigned].state)
 
 
 class Demultiplexer:
@@ -36,6 +37,7 @@ class Demultiplexer:
 		self.state = State(width)
 		self.selector_width = selector_width
 		self.S = InputPort(selector_width)
+		self.S.set_callback(self.on_change)
 		self.outputs = [OutputPort(self.width) for _ in range(2**selector_width)]
 		self.I = InputPort(width)
 		self.I.set_callback(self.on_input_change)
@@ -45,13 +47,13 @@ class Demultiplexer:
 		self.on_change(self.S.state, self.S)
 
 	def on_change(self, state: State, _):
-		for i in range(self.width):
-			p = self.outputs[i]
-			if any(state.get(i) == BitState.FLOATING for i in range(self.width)):
+		selected = None if state.unknown else state.unsigned
+		for i, p in enumerate(self.outputs):
+			if state.floating:
 				p.set_state(State(self.width))
-			elif any(state.get(i) == BitState.ERROR for i in range(self.width)):
+			elif state.error:
 				p.set_state(State(self.width, starter=BitState.ERROR))
-			elif i == int(state):
+			elif i == selected:
 				p.set_state(self.I.state)
 			else:
 				p.set_state(State(self.width, starter=BitState.FLOATING if self.threestate else BitState.LOW))
@@ -73,9 +75,10 @@ class BitSelector:
 		self.on_change(self.S.state, self.S)
 
 	def on_change(self, state: State, _):
-		if int(state) > (self.i_width / self.o_width):
+		if state.unknown:
+			self.O.set_state(BitState.ERROR)
+			return
+		if state.value >= (self.i_width / self.o_width):
 			raise ValueError
-		start_i = int(state) * self.o_width
-		end_i = start_i + self.o_width
-		s = State(self.o_width)
-		s.bits = self.I.state.bits[start_i:end_i]
+		start_i = state.value * self.o_width
+		self.O.set_state(self.I.state[start_i:start_i + self.o_width])
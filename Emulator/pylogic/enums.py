@@ -8,17 +8,17 @@ class BitState(Enum):
 	ERROR = 3
 
 	def __neg__(self):
-		if self.LOW:
-			return self.HIGH
-		elif self.HIGH:
-			return self.LOW
+		if self is BitState.LOW:
+			return BitState.HIGH
+		elif self is BitState.HIGH:
+			return BitState.LOW
 		else:
-			return self.ERROR
+			return BitState.ERROR
 
 	def __bool__(self):
-		if self.LOW:
+		if self is BitState.LOW:
 			return False
-		elif self.HIGH:
+		elif self is BitState.HIGH:
 			return True
 		else:
 			raise ValueError("Floating and Error values cannot be cast into boolean")
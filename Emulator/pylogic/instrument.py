@@ -0,0 +1,166 @@
+import json
+import time
+from collections import Counter
+from typing import Any, Callable
+
+from .base_components import Bus, OutputPort
+from .simulator import Simulator, get_simulator
+from .snapshot import Snapshot, ports_of
+
+SORT_KEYS = ("events", "time", "mean", "fanout", "deliveries", "name")
+
+
+class InstrumentedSimulator(Simulator):
+	"""The simulator with every callback counted and timed, and the deltas of every settle tracked."""
+	instrumentation: "Instrumentation"
+
+	def settle(self) -> int:
+		stats = self.instrumentation
+		started = self.delta
+		try:
+			return super().settle()
+		finally:
+			stats.settles += 1
+			stats.depth = max(stats.depth, self.delta - started)
+
+	def dispatch(self, dirty: dict[Callable, tuple]):
+		stats = self.instrumentation
+		clock = time.perf_counter_ns
+		for callback, (state, port) in dirty.items():
+			started = clock()
+			callback(state, port)
+			owner = getattr(callback, "__self__", callback)
+			stats.time[owner] += clock() - started
+			stats.calls[owner] += 1
+
+
+class InstrumentedBus(Bus):
+	"""A bus that counts its changes and the readers each of them reached."""
+
+	def update(self, state) -> bool:
+		changed = super().update(state)
+		if changed:
+			stats = get_simulator().instrumentation
+			stats.events[self] += 1
+			stats.deliveries[self] += len(self.callbacks)
+		return changed
+
+
+class Instrumentation:
+	"""
+	Where a circuit spends its simulation time: the callbacks run and the time taken by every component, the changes
+	of every bus with the readers they reached, and the most delta cycles one change took to settle.
+
+	Instrumenting swaps the class of the simulator and of every bus of the circuit for an instrumented subclass and
+	detaching swaps them back, so a circuit that is not instrumented runs without any checks. names maps components
+	and buses to the names they are reported by, in place of their type and position in the circuit.
+	"""
+
+	def __init__(self, components: list, names: dict[Any, str] = None):
+		self.components = components
+		self.buses, _ = Snapshot.layout(components)
+		self.names: dict[Any, str] = {}
+		for i, component in enumerate(components):
+			self.names[component] = f"{type(component).__name__}#{i}"
+		for i, bus in enumerate(self.buses):
+			self.names[bus] = f"Bus#{i}"
+		self.names.update(names or {})
+		self.classes: dict[Any, type] = {}
+		self.calls: Counter[Any] = Counter()
+		self.time: Counter[Any] = Counter()
+		self.events: Counter[Bus] = Counter()
+		self.deliveries: Counter[Bus] = Counter()
+		self.settles = 0
+		self.depth = 0
+
+	def attach(self):
+		simulator = get_simulator()
+		if isinstance(simulator, InstrumentedSimulator):
+			raise RuntimeError("The simulator is already instrumented")
+		for item, kind in [(simulator, InstrumentedSimulator)] + [(bus, InstrumentedBus) for bus in self.buses]:
+			self.classes[item] = type(item)
+			item.__class__ = kind
+		simulator.instrumentation = self
+
+	def detach(self):
+		for item, kind in self.classes.items():
+			item.__class__ = kind
+			if isinstance(item, Simulator):
+				del item.instrumentation
+		self.classes = {}
+
+	def __enter__(self) -> "Instrumentation":
+		if not self.classes:
+			self.attach()
+		return self
+
+	def __exit__(self, *_):
+		self.detach()
+
+	def reset(self):
+		for counter in (self.calls, self.time, self.events, self.deliveries):
+			counter.clear()
+		self.settles = 0
+		self.depth = 0
+
+	def fanout(self, component: Any) -> int:
+		"""The readers of the buses the outputs of component drive."""
+		return sum(len(port.bus.callbacks) for port in ports_of(component) if isinstance(port, OutputPort) and port.bus is not None)
+
+	def rows(self) -> list[dict[str, Any]]:
+		"""One row per component and bus that saw any activity."""
+		rows = []
+		for component in set(self.calls) | set(self.time):
+			calls = self.calls[component]
+			rows.append({
+				"name": self.names.get(component, f"{type(component).__name__}@{id(component):x}"),
+				"kind": "component",
+				"events": calls,
+				"time": self.time[component],
+				"mean": self.time[component] / calls if calls else 0,
+				"fanout": self.fanout(component),
+				"deliveries": 0,
+			})
+		for bus, events in self.events.items():
+			rows.append({
+				"name": self.names.get(bus, f"Bus@{id(bus):x}"),
+				"kind": "bus",
+				"width": bus.width,
+				"events": events,
+				"time": 0,
+				"mean": 0,
+				"fanout": len(bus.callbacks),
+				"deliveries": self.deliveries[bus],
+			})
+		return rows
+
+	def table(self, sort: str = "time", top: int | None = 30) -> str:
+		"""The rows as text, sorted by one of SORT_KEYS, most first or by name."""
+		if sort not in SORT_KEYS:
+			raise ValueError(f"Cannot sort by {sort}, only by {', '.join(SORT_KEYS)}")
+		rows = sorted(self.rows(), key=lambda row: row[sort], reverse=sort != "name")[:top]
+		out = [
+			f"{self.settles} settles, at most {self.depth} delta cycles each",
+			f"{'events':>10} {'time ms':>10} {'mean us':>9} {'fanout':>7} {'deliveries':>11}  name",
+		]
+		for row in rows:
+			out.append(
+				f"{row['events']:>10} {row['time'] / 1e6:>10.3f} {row['mean'] / 1e3:>9.3f} {row['fanout']:>7} "
+				f"{row['deliveries']:>11}  {row['name']}"
+			)
+		return "\n".join(out)
+
+	def dump(self) -> dict[str, Any]:
+		"""Everything measured as plain data, times in nanoseconds."""
+		return {"settles": self.settles, "depth": self.depth, "rows": self.rows()}
+
+	def save(self, path: str):
+		with open(path, "w") as f:
+			json.dump(self.dump(), f, indent="\t")
+
+
+def instrument(components: list, names: dict[Any, str] = None) -> Instrumentation:
+	"""Instruments components until the returned Instrumentation is detached, or for the block it is used in."""
+	instrumentation = Instrumentation(components, names)
+	instrumentation.attach()
+	return instrumentation
@@ -0,0 +1,750 @@
+import os
+import pickle
+import collections
+import xml.etree.ElementTree as ElementTree
+
+from .base_components import Bus
+from .classes import State
+from .enums import BitState, Edge, BufferSetting, OverflowSetting
+from .errors import WidthConflictException
+from .simulator import get_simulator
+from .components.gates import Not, Buffer, And, Or, Nand, Nor, Xor, Xnor, ControlledBuffer
+from .components.plexers import Multiplexer, Demultiplexer, BitSelector
+from .components.memory import DFlipFlop, TFlipFlop, JKFlipFlop, SRFlipFlop, Register, Counter, ShiftRegister, RAM, ROM
+from .components.wiring import Splitter, PullResistor, Constant
+
+# Bump whenever the layout of a cached Netlist changes
+CACHE_VERSION = 2
+
+
+class CircuitSpec:
+	"""One <circuit> of a .circ file as it was read, before any wiring is resolved"""
+
+	def __init__(self, name: str):
+		self.name = name
+		self.components: list[tuple[str, tuple[int, int], dict[str, str]]] = []
+		self.wires: list[tuple[tuple[int, int], tuple[int, int]]] = []
+		# Offsets of the custom appearance ports relative to the anchor, keyed by the pin they belong to
+		self.ports: dict[tuple[int, int], tuple[int, int]] = {}
+		self.anchor: tuple[int, int] | None = None
+
+
+class Netlist:
+	"""The flattened, picklable result of resolving a .circ file into nets"""
+
+	def __init__(self):
+		self.widths: list[int] = []
+		# (Logisim component name, instance path, attributes, {port name: net or None})
+		self.components: list[tuple[str, str, dict[str, str], dict[str, int | None]]] = []
+		# Top level pins: label -> (net, is output)
+		self.pins: dict[str, tuple[int, bool]] = {}
+		self.clocks: list[int] = []
+		self.unsupported: list[str] = []
+		self.warnings: list[str] = []
+
+
+class Circuit:
+	"""A ready to simulate pylogic netlist built from a Netlist"""
+
+	def __init__(self, netlist: Netlist):
+		self.netlist = netlist
+		self.buses: list[Bus] = [Bus(width) for width in netlist.widths]
+		self.components: list = []
+		self.pins: dict[str, Bus] = {label: self.buses[net] for label, (net, _) in netlist.pins.items()}
+		self.clocks: list[Bus] = [self.buses[net] for net in netlist.clocks]
+		self.constants: dict[tuple[int, BitState], Bus] = {}
+		self.warnings: list[str] = list(netlist.warnings)
+
+	@property
+	def clock(self) -> Bus | None:
+		return self.clocks[0] if self.clocks else None
+
+	def connect(self, port, bus: Bus | None, where: str = ""):
+		if bus is None:
+			return
+		if bus.width != port.width:
+			raise WidthConflictException(where, port.width, bus.width)
+		port.set_b(bus)
+
+	def invert(self, bus: Bus) -> Bus:
+		inverter = Not(bus.width)
+		inverter.I.set_b(bus)
+		inverter.O.set_b(Bus(bus.width))
+		self.components.append(inverter)
+		return inverter.O.bus
+
+	def constant(self, width: int, state: BitState) -> Bus:
+		key = (width, state)
+		if key not in self.constants:
+			constant = Constant(width, state)
+			constant.set_b(Bus(width))
+			self.components.append(constant)
+			self.constants[key] = constant.O.bus
+		return self.constants[key]
+
+
+def _point(text: str) -> tuple[int, int]:
+	x, y = text.strip("()").split(",")
+	return int(x), int(y)
+
+
+def parse_circ(path: str) -> tuple[dict[str, CircuitSpec], str | None]:
+	"""Streams a Logisim-evolution .circ file and returns its circuits and the name of the main circuit"""
+	circuits: dict[str, CircuitSpec] = {}
+	main = None
+	circuit = None
+	attrs = None
+	ports: list[tuple[tuple[int, int], tuple[int, int]]] = []
+	for event, element in ElementTree.iterparse(path, events=("start", "end")):
+		tag = element.tag
+		if event == "start":
+			if tag == "circuit":
+				circuit = CircuitSpec(element.get("name"))
+				circuits[circuit.name] = circuit
+			elif tag == "comp":
+				attrs = {}
+			continue
+		if tag == "a":
+			if attrs is not None:
+				value = element.get("val")
+				attrs[element.get("name")] = value if value is not None else (element.text or "")
+		elif tag == "comp":
+			circuit.components.append((element.get("name"), _point(element.get("loc")), attrs))
+			attrs = None
+			element.clear()
+		elif tag == "wire":
+			circuit.wires.append((_point(element.get("from")), _point(element.get("to"))))
+			element.clear()
+		elif tag == "circ-anchor":
+			circuit.anchor = (int(element.get("x")) + int(element.get("width")) // 2, int(element.get("y")) + int(element.get("height")) // 2)
+		elif tag == "circ-port":
+			center = (int(element.get("x")) + int(element.get("width")) // 2, int(element.get("y")) + int(element.get("height")) // 2)
+			ports.append((_point(element.get("pin")), center))
+		elif tag == "appear":
+			for pin, center in ports:
+				circuit.ports[pin] = (center[0] - circuit.anchor[0], center[1] - circuit.anchor[1])
+			ports = []
+			element.clear()
+		elif tag == "circuit":
+			circuit = None
+			element.clear()
+		elif tag == "main":
+			main = element.get("name")
+	return circuits, main
+
+
+# Port layouts, relative to the location of the component
+
+def _rotate(offset: tuple[int, int], facing: str) -> tuple[int, int]:
+	x, y = offset
+	if facing == "north":
+		return y, -x
+	elif facing == "west":
+		return -x, -y
+	elif facing == "south":
+		return -y, x
+	return x, y
+
+
+def _width(attrs: dict, name: str = "width", default: int = 1) -> int:
+	return int(attrs.get(name, default))
+
+
+def _gate_layout(name: str, attrs: dict) -> list:
+	facing = attrs.get("facing", "east")
+	width = _width(attrs)
+	inputs = int(attrs.get("inputs", 2))
+	size = int(attrs.get("size", 50))
+	axis = size + (10 if name in ("XOR Gate", "XNOR Gate") else 0) + (10 if name in ("NAND Gate", "NOR Gate", "XNOR Gate") else 0)
+	if inputs <= 3:
+		if size < 40:
+			start, distance, lower = -5, 10, 10
+		elif size < 60 or inputs <= 2:
+			start, distance, lower = -10, 20, 20
+		else:
+			start, distance, lower = -15, 30, 30
+	elif inputs == 4 and size >= 60:
+		start, distance, lower = -5, 20, 0
+	else:
+		start, distance, lower = -5, 10, 10
+	layout = [("O", (0, 0), width)]
+	for i in range(inputs):
+		if inputs & 1:
+			dy = start * (inputs - 1) + distance * i
+		else:
+			dy = start * inputs + distance * i + (lower if i >= inputs // 2 else 0)
+		# A negated input sits further out, past the bubble
+		dx = axis + (10 if attrs.get(f"negate{i}") == "true" else 0)
+		# Turning a gate keeps its inputs in order from top to bottom or left to right, it does not rotate them
+		offset = {"east": (-dx, dy), "west": (dx, dy), "north": (dy, dx), "south": (dy, -dx)}[facing]
+		layout.append((f"I{i}", offset, width))
+	return layout
+
+
+def _splitter_layout(attrs: dict) -> list:
+	fanout = int(attrs.get("fanout", 2))
+	incoming = _width(attrs, "incoming", 2)
+	facing = attrs.get("facing", "east")
+	appear = attrs.get("appear", "left")
+	gap = 10 * int(attrs.get("spacing", 1))
+	justify = {"right": 1, "left": -1}.get(appear, 0)
+	if facing in ("north", "south"):
+		m = 1 if facing == "north" else -1
+		if justify == 0:
+			dx = gap * ((fanout + 1) // 2 - 1)
+		else:
+			dx = -10 if m * justify < 0 else 10 + gap * (fanout - 1)
+		start, step = (dx, -m * 20), (-gap, 0)
+	else:
+		m = -1 if facing == "west" else 1
+		if justify == 0:
+			dy = -gap * (fanout // 2)
+		else:
+			dy = 10 if m * justify > 0 else -(10 + gap * (fanout - 1))
+		start, step = (m * 20, dy), (0, gap)
+	ends = _splitter_ends(attrs, fanout, incoming)
+	layout = [("C", (0, 0), incoming)]
+	for i in range(fanout):
+		layout.append((f"E{i}", (start[0] + step[0] * i, start[1] + step[1] * i), len(ends[i])))
+	return layout
+
+
+def _splitter_ends(attrs: dict, fanout: int, incoming: int) -> list[list[int]]:
+	# Logisim leaves out a bit that goes to the end of its own index, the default it falls back to when reading
+	per_end, extra = divmod(incoming, fanout)
+	default = []
+	for end in range(fanout):
+		default += [str(end)] * (per_end + (1 if end < extra else 0))
+	ends: list[list[int]] = [[] for _ in range(fanout)]
+	for bit in range(incoming):
+		value = attrs.get(f"bit{bit}", str(bit) if bit < fanout else default[bit])
+		if value != "none":
+			ends[int(value)].append(bit)
+	return ends
+
+
+def _plexer_layout(name: str, attrs: dict) -> list:
+	facing = attrs.get("facing", "east")
+	width = _width(attrs)
+	select = _width(attrs, "select")
+	mult = 1 if attrs.get("selloc", "bl") == "bl" else -1
+	count = 1 << select
+	# The ends keep their top to bottom / left to right order in every orientation
+	if count == 2:
+		if facing == "west":
+			ends = [(30, -10), (30, 10)]
+			sel = (20, mult * 20)
+		elif facing == "north":
+			ends = [(-10, 30), (10, 30)]
+			sel = (mult * -20, 20)
+		elif facing == "south":
+			ends = [(-10, -30), (10, -30)]
+			sel = (mult * -20, -20)
+		else:
+			ends = [(-30, -10), (-30, 10)]
+			sel = (-20, mult * 20)
+	else:
+		dx = dy = -(count // 2) * 10
+		ddx = ddy = 10
+		if facing == "west":
+			dx, ddx = 40, 0
+			sel = (20, mult * (dy + 10 * count))
+		elif facing == "north":
+			dy, ddy = 40, 0
+			sel = (mult * dx, 20)
+		elif facing == "south":
+			dy, ddy = -40, 0
+			sel = (mult * dx, -20)
+		else:
+			dx, ddx = -40, 0
+			sel = (-20, mult * (dy + 10 * count))
+		ends = [(dx + ddx * i, dy + ddy * i) for i in range(count)]
+	if name == "Demultiplexer":
+		# A demultiplexer is a multiplexer mirrored along the direction it faces
+		if facing in ("east", "west"):
+			ends = [(-x, y) for x, y in ends]
+			sel = (-sel[0], sel[1])
+		else:
+			ends = [(x, -y) for x, y in ends]
+			sel = (sel[0], -sel[1])
+	layout = [(f"E{i}", end, width) for i, end in enumerate(ends)]
+	return layout + [("S", sel, select), ("C", (0, 0), width)]
+
+
+def _decoder_layout(attrs: dict) -> list:
+	facing = attrs.get("facing", "east")
+	select = _width(attrs, "select")
+	top_right = attrs.get("selloc", "bl") != "bl"
+	count = 1 << select
+	if count == 2:
+		if facing in ("north", "south"):
+			y = -10 if facing == "north" else 10
+			ends = [(-30, y), (-10, y)] if top_right else [(10, y), (30, y)]
+		else:
+			x = -10 if facing == "west" else 10
+			ends = [(x, 10), (x, 30)] if top_right else [(x, -30), (x, -10)]
+	elif facing in ("north", "south"):
+		y = -20 if facing == "north" else 20
+		x = -10 * count if top_right else 0
+		ends = [(x + 10 * i, y) for i in range(count)]
+	else:
+		x = -20 if facing == "west" else 20
+		y = 0 if top_right else -10 * count
+		ends = [(x, y + 10 * i) for i in range(count)]
+	return [(f"E{i}", end, 1) for i, end in enumerate(ends)] + [("S", (0, 0), select)]
+
+
+def _layout(name: str, attrs: dict, circuits: dict[str, CircuitSpec]) -> list | None:
+	"""Returns [(port name, offset, width)] for a component, or None if it has no pylogic equivalent"""
+	facing = attrs.get("facing", "east")
+	width = _width(attrs)
+	if name in ("Pin", "Constant", "Power", "Ground", "Clock", "Button", "POR"):
+		layout = [("O", (0, 0), width)]
+	elif name in ("Tunnel", "Pull Resistor", "Probe"):
+		# These adapt to the width of the net they are placed on
+		layout = [("O", (0, 0), 0)]
+	elif name in ("AND Gate", "OR Gate", "NAND Gate", "NOR Gate", "XOR Gate", "XNOR Gate"):
+		layout = _gate_layout(name, attrs)
+	elif name == "NOT Gate":
+		layout = [("O", (0, 0), width), ("I", _rotate((-20 if attrs.get("size") == "20" else -30, 0), facing), width)]
+	elif name == "Buffer":
+		layout = [("O", (0, 0), width), ("I", _rotate((-20, 0), facing), width)]
+	elif name == "Controlled Buffer":
+		control = (-10, -10) if attrs.get("control") == "left" else (-10, 10)
+		layout = [("O", (0, 0), width), ("I", _rotate((-20, 0), facing), width), ("E", _rotate(control, facing), 1)]
+	elif name == "Splitter":
+		layout = _splitter_layout(attrs)
+	elif name in ("Multiplexer", "Demultiplexer"):
+		layout = _plexer_layout(name, attrs)
+	elif name == "Decoder":
+		layout = _decoder_layout(attrs)
+	elif name == "BitSelector":
+		group = _width(attrs, "group")
+		select = max((-(-width // group) - 1).bit_length(), 1)
+		sel = (-10, 10) if attrs.get("selloc", "bl") == "bl" else (-10, -10)
+		layout = [("O", (0, 0), group), ("I", _rotate((-30, 0), facing), width), ("S", _rotate(sel, facing), select)]
+	elif name == "Register":
+		layout = [("Q", (60, 30), width), ("D", (0, 30), width), ("C", (0, 70), 1), ("R", (30, 90), 1), ("WE", (0, 50), 1)]
+	elif name == "Counter":
+		right = 190 + (width - 1) // 7 * 10
+		layout = [
+			("O", (right, 110), width), ("D", (0, 110), width), ("C", (0, 80), 1), ("R", (0, 20), 1),
+			("MS", (0, 30), 1), ("DS", (0, 50), 1), ("CE", (0, 70), 1), ("OF", (right, 50), 1),
+		]
+	elif name in ("D Flip-Flop", "T Flip-Flop", "J-K Flip-Flop", "S-R Flip-Flop"):
+		if name in ("D Flip-Flop", "T Flip-Flop"):
+			layout = [(name[0], (-10, 10), 1), ("C", (-10, 50), 1)]
+		else:
+			first, second = name[0], name[2]
+			layout = [(first, (-10, 10), 1), (second, (-10, 30), 1), ("C", (-10, 50), 1)]
+		layout += [("Q", (50, 10), 1), ("Qi", (50, 50), 1), ("AR", (20, 60), 1), ("AS", (20, 0), 1)]
+	elif name == "Shift Register":
+		layout = [("R", (0, 20), 1), ("L", (0, 30), 1), ("S", (0, 40), 1), ("C", (0, 50), 1), ("I", (0, 70), width)]
+		if attrs.get("parallel", "true") == "true":
+			# Stages shift downwards, out of the bottom one, which Logisim numbers 0
+			for p in range(int(attrs.get("length", "8"))):
+				layout += [(f"D{p}", (0, 90 + 20 * p), width), (f"Q{p}", (120, 90 + 20 * p), width)]
+	elif name == "RAM":
+		data = _width(attrs, "dataWidth", 8)
+		layout = [
+			("A", (0, 10), _width(attrs, "addrWidth", 8)), ("WE", (0, 50), 1), ("OE", (0, 60), 1), ("C", (0, 70), 1),
+			("IN", (0, 90), data), ("OUT", (240, 90), data),
+		]
+	elif name == "ROM":
+		layout = [("A", (0, 10), _width(attrs, "addrWidth", 8)), ("O", (240, 60), _width(attrs, "dataWidth", 8))]
+	elif name in circuits:
+		spec = circuits[name]
+		if spec.anchor is None:
+			return None
+		layout = [(pin, offset, 0) for pin, offset in spec.ports.items()]
+	else:
+		return None
+	return layout
+
+
+# Ports driven by each kind of component, used to orient splitters
+OUTPUTS = {
+	"Pin": {"O"}, "Constant": {"O"}, "Power": {"O"}, "Ground": {"O"}, "Clock": {"O"}, "Button": {"O"}, "POR": {"O"},
+	"AND Gate": {"O"}, "OR Gate": {"O"}, "NAND Gate": {"O"}, "NOR Gate": {"O"}, "XOR Gate": {"O"}, "XNOR Gate": {"O"},
+	"NOT Gate": {"O"}, "Buffer": {"O"}, "Controlled Buffer": {"O"}, "Multiplexer": {"C"}, "BitSelector": {"O"},
+	"Register": {"Q"}, "Counter": {"O", "OF"}, "RAM": {"OUT"}, "ROM": {"O"},
+	"D Flip-Flop": {"Q", "Qi"}, "T Flip-Flop": {"Q", "Qi"}, "J-K Flip-Flop": {"Q", "Qi"}, "S-R Flip-Flop": {"Q", "Qi"},
+}
+
+
+def _drives(kind: str, port: str) -> bool:
+	if kind in ("Demultiplexer", "Decoder"):
+		return port.startswith("E")
+	if kind == "Shift Register":
+		return port.startswith("Q")
+	return port in OUTPUTS.get(kind, ())
+
+
+class UnionFind:
+	def __init__(self):
+		self.parent: dict = {}
+
+	def find(self, item):
+		parent = self.parent
+		if item not in parent:
+			parent[item] = item
+			return item
+		while parent[item] != item:
+			parent[item] = parent[parent[item]]
+			item = parent[item]
+		return item
+
+	def union(self, a, b):
+		a = self.find(a)
+		b = self.find(b)
+		if a != b:
+			self.parent[b] = a
+
+
+def _local_nets(spec: CircuitSpec, circuits: dict[str, CircuitSpec]) -> tuple[list, UnionFind]:
+	"""Lays out the components of one circuit and joins the points that are wired together"""
+	nets = UnionFind()
+	placed = []
+	points = set()
+	for name, loc, attrs in spec.components:
+		layout = _layout(name, attrs, circuits)
+		if name == "Tunnel":
+			nets.union(("tunnel", attrs.get("label", "")), loc)
+		if layout is not None:
+			layout = [(port, (loc[0] + dx, loc[1] + dy), width) for port, (dx, dy), width in layout]
+			points.update(point for _, point, _ in layout)
+		placed.append((name, loc, attrs, layout))
+	horizontal: dict[int, list] = {}
+	vertical: dict[int, list] = {}
+	for start, end in spec.wires:
+		nets.union(start, end)
+		points.add(start)
+		points.add(end)
+		if start[1] == end[1]:
+			horizontal.setdefault(start[1], []).append((min(start[0], end[0]), max(start[0], end[0]), start))
+		else:
+			vertical.setdefault(start[0], []).append((min(start[1], end[1]), max(start[1], end[1]), start))
+	# Ends that touch the middle of a wire are connected to it as well
+	for x, y in points:
+		for low, high, end in horizontal.get(y, ()):
+			if low < x < high:
+				nets.union(end, (x, y))
+		for low, high, end in vertical.get(x, ()):
+			if low < y < high:
+				nets.union(end, (x, y))
+	return placed, nets
+
+
+def resolve(circuits: dict[str, CircuitSpec], main: str) -> Netlist:
+	"""Flattens the main circuit and its subcircuits into one Netlist"""
+	netlist = Netlist()
+	nets = UnionFind()
+	widths: dict = {}
+	components = []
+	pins = {}
+	clocks = []
+	local: dict[str, tuple[list, UnionFind]] = {}
+	attached = []
+
+	def key(path: str, point: tuple[int, int], width: int):
+		k = nets.find((path, local_nets.find(point)))
+		attached.append(k)
+		if width:
+			widths[k] = max(widths.get(k, 0), width)
+		return k
+
+	def flatten(name: str, path: str):
+		nonlocal local_nets
+		if name not in local:
+			local[name] = _local_nets(circuits[name], circuits)
+		placed, local_nets = local[name]
+		for kind, loc, attrs, layout in placed:
+			where = f"{path}/{kind}{loc}"
+			if layout is None:
+				netlist.unsupported.append(where)
+			elif kind in circuits:
+				outer = [(point, key(path, point, 0)) for _, point, _ in layout]
+				flatten(kind, where)
+				inner_nets = local_nets
+				for (pin, _, _), (_, outer_key) in zip(layout, outer):
+					nets.union(outer_key, (where, inner_nets.find(pin)))
+				local_nets = local[name][1]
+			elif kind == "Pin":
+				if not path:
+					label = attrs.get("label") or f"Pin{loc}"
+					pins[label] = (key(path, loc, _width(attrs)), attrs.get("output") == "true")
+				else:
+					key(path, loc, _width(attrs))
+			elif kind in ("Tunnel", "Probe"):
+				continue
+			else:
+				ports = {port: key(path, point, width) for port, point, width in layout}
+				components.append((kind, where, attrs, ports))
+				if kind == "Clock":
+					clocks.append(ports["O"])
+
+	local_nets = UnionFind()
+	flatten(main, "")
+
+	# Number the nets that have ports of a known width on them
+	numbers: dict = {}
+
+	def number(k) -> int | None:
+		k = nets.find(k)
+		if k not in numbers:
+			if not widths.get(k):
+				return None
+			numbers[k] = len(netlist.widths)
+			netlist.widths.append(widths[k])
+		return numbers[k]
+
+	# Widths are only known on the roots they were recorded under, so merge them onto the final roots first
+	for k, width in list(widths.items()):
+		root = nets.find(k)
+		widths[root] = max(widths.get(root, 0), width)
+	# A port that nothing else is attached to is left unconnected, which gates take as not being there at all
+	attachments = collections.Counter(nets.find(k) for k in attached)
+	for kind, where, attrs, ports in components:
+		ports = {port: number(k) if attachments[nets.find(k)] > 1 else None for port, k in ports.items()}
+		netlist.components.append((kind, where, attrs, ports))
+	netlist.pins = {label: (number(k), output) for label, (k, output) in pins.items()}
+	netlist.clocks = [number(k) for k in clocks]
+	_orient_splitters(netlist)
+	return netlist
+
+
+def _orient_splitters(netlist: Netlist):
+	"""Logisim splitters are bidirectional, so each one is turned into a split or a combine from the side that is driven"""
+	driven = {net for net, output in netlist.pins.values() if not output}
+	for kind, _, attrs, ports in netlist.components:
+		for port, net in ports.items():
+			if net is not None and _drives(kind, port):
+				driven.add(net)
+	# Pull resistors only drive weakly, so they orient the splitters that nothing else does
+	pulled = {ports["O"] for kind, _, _, ports in netlist.components if kind == "Pull Resistor" and ports["O"] is not None}
+	splitters = [(where, attrs, ports) for kind, where, attrs, ports in netlist.components if kind == "Splitter"]
+	for sources in (driven, pulled):
+		driven |= sources
+		changed = True
+		while changed:
+			changed = False
+			for where, attrs, ports in splitters:
+				if "direction" in attrs:
+					continue
+				ends = [net for port, net in ports.items() if port != "C" and net is not None]
+				combined = ports["C"] in driven
+				fanned = any(net in driven for net in ends)
+				if combined and not fanned:
+					attrs["direction"] = "split"
+					driven.update(ends)
+					changed = True
+				elif fanned and not combined:
+					attrs["direction"] = "combine"
+					if ports["C"] is not None:
+						driven.add(ports["C"])
+					changed = True
+	for where, attrs, ports in splitters:
+		if "direction" not in attrs:
+			attrs["direction"] = "split"
+			if ports["C"] in driven:
+				netlist.warnings.append(f"{where} is driven from both sides, treating it as a split")
+
+
+def load_circ(path: str, cache: bool = True) -> Netlist:
+	"""Returns the resolved Netlist of a .circ file, reusing the cached one while the file is unchanged"""
+	stat = os.stat(path)
+	stamp = (CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+	cache_path = os.path.join(os.path.dirname(os.path.abspath(path)), "__pycache__", os.path.basename(path) + ".netlist")
+	if cache and os.path.exists(cache_path):
+		try:
+			with open(cache_path, "rb") as f:
+				cached_stamp, netlist = pickle.load(f)
+			if cached_stamp == stamp:
+				return netlist
+		except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+			pass
+	circuits, main = parse_circ(path)
+	netlist = resolve(circuits, main)
+	if cache:
+		try:
+			os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+			with open(cache_path, "wb") as f:
+				pickle.dump((stamp, netlist), f)
+		except OSError:
+			pass
+	return netlist
+
+
+# Building pylogic components from a Netlist
+
+EDGES = {"rising": Edge.RISING, "falling": Edge.FALLING, "high": Edge.HIGH, "low": Edge.LOW}
+GATES = {"AND Gate": And, "OR Gate": Or, "NAND Gate": Nand, "NOR Gate": Nor, "XOR Gate": Xor, "XNOR Gate": Xnor}
+FLIP_FLOPS = {"D Flip-Flop": DFlipFlop, "T Flip-Flop": TFlipFlop, "J-K Flip-Flop": JKFlipFlop, "S-R Flip-Flop": SRFlipFlop}
+OVERFLOWS = {"wrap": OverflowSetting.WRAP, "stay": OverflowSetting.STAY, "cont": OverflowSetting.CONTINUE, "load": OverflowSetting.LOAD}
+PULLS = {"0": BitState.LOW, "1": BitState.HIGH, "X": BitState.ERROR}
+
+
+def memory_contents(text: str) -> dict[int, int]:
+	"""Decodes the "addr/data: A D" contents of a Logisim memory into its nonzero words, expanding run-length "N*value" words"""
+	words = {}
+	address = 0
+	for token in text.split("\n", 1)[1].split() if "\n" in text else []:
+		count, _, value = token.rpartition("*")
+		count = int(count) if count else 1
+		value = int(value, 16)
+		if value:
+			words.update(dict.fromkeys(range(address, address + count), value))
+		address += count
+	return words
+
+
+def _edge(attrs: dict) -> Edge:
+	return EDGES[attrs.get("trigger", "rising")]
+
+
+def _build_component(circuit: Circuit, kind: str, where: str, attrs: dict, buses: dict[str, Bus | None]):
+	width = _width(attrs)
+	connect = circuit.connect
+	if kind in ("Button", "POR"):
+		# Both rest low, a button until it is pressed and a POR once the circuit is reset
+		if buses["O"] is not None:
+			buses["O"].set_state(State(buses["O"].width, starter=BitState.LOW))
+		circuit.pins[attrs.get("label") or where] = buses["O"]
+		return None
+	elif kind == "Clock":
+		return None
+	elif kind in ("Constant", "Power", "Ground"):
+		if kind == "Constant":
+			component = Constant(width, int(attrs.get("value", "0x1"), 16))
+		else:
+			component = Constant(width, BitState.HIGH if kind == "Power" else BitState.LOW)
+		connect(component.O, buses["O"], where)
+		component.push()
+	elif kind == "Pull Resistor":
+		if buses["O"] is None:
+			return None
+		component = PullResistor(buses["O"].width, PULLS[attrs.get("pull", "0")])
+		component.set_b(buses["O"])
+	elif kind in GATES:
+		component = GATES[kind](width)
+		for port, bus in buses.items():
+			if port != "O" and bus is not None:
+				if attrs.get(f"negate{port[1:]}") == "true":
+					bus = circuit.invert(bus)
+				connect(component.add_input(), bus, where)
+		connect(component.O, buses["O"], where)
+	elif kind == "NOT Gate":
+		component = Not(width)
+		connect(component.I, buses["I"], where)
+		connect(component.O, buses["O"], where)
+	elif kind == "Buffer":
+		component = Buffer(width, BufferSetting.LOW_HIGH)
+		connect(component.I, buses["I"], where)
+		connect(component.O, buses["O"], where)
+	elif kind == "Controlled Buffer":
+		component = ControlledBuffer(width)
+		connect(component.I, buses["I"], where)
+		connect(component.E, buses["E"], where)
+		connect(component.O, buses["O"], where)
+	elif kind == "Splitter":
+		incoming = _width(attrs, "incoming", 2)
+		ends = _splitter_ends(attrs, int(attrs.get("fanout", 2)), incoming)
+		component = Splitter(incoming)
+		if attrs["direction"] == "split":
+			connect(component.add_input(list(range(incoming))), buses["C"], where)
+			for i, bits in enumerate(ends):
+				if bits and buses[f"E{i}"] is not None:
+					connect(component.add_output(bits), buses[f"E{i}"], where)
+		else:
+			for i, bits in enumerate(ends):
+				if bits and buses[f"E{i}"] is not None:
+					connect(component.add_input(bits), buses[f"E{i}"], where)
+			connect(component.add_output(list(range(incoming))), buses["C"], where)
+	elif kind == "Multiplexer":
+		component = Multiplexer(width, _width(attrs, "select"))
+		for i, port in enumerate(component.inputs):
+			connect(port, buses[f"E{i}"], where)
+		connect(component.S, buses["S"], where)
+		connect(component.O, buses["C"], where)
+	elif kind in ("Demultiplexer", "Decoder"):
+		select = _width(attrs, "select")
+		threestate = attrs.get("tristate") == "true"
+		if kind == "Decoder":
+			component = Demultiplexer(1, select, threestate)
+			connect(component.I, circuit.constant(1, BitState.HIGH))
+		else:
+			component = Demultiplexer(width, select, threestate)
+			connect(component.I, buses["C"], where)
+		for i, port in enumerate(component.outputs):
+			connect(port, buses[f"E{i}"], where)
+		connect(component.S, buses["S"], where)
+	elif kind == "BitSelector":
+		component = BitSelector(width, _width(attrs, "group"))
+		connect(component.I, buses["I"], where)
+		connect(component.S, buses["S"], where)
+		connect(component.O, buses["O"], where)
+	elif kind == "Register":
+		component = Register(width, _edge(attrs))
+		connect(component.D, buses["D"], where)
+		connect(component.C, buses["C"], where)
+		connect(component.R, buses["R"], where)
+		# Logisim treats an unconnected enable as enabled and has no output enable
+		connect(component.WE, buses["WE"] or circuit.constant(1, BitState.HIGH), where)
+		connect(component.OE, circuit.constant(1, BitState.HIGH), where)
+		connect(component.Q, buses["Q"], where)
+	elif kind == "Counter":
+		maximum = int(attrs.get("max", hex((1 << width) - 1)), 16)
+		component = Counter(width, maximum, OVERFLOWS[attrs.get("ongoal", "wrap")], _edge(attrs))
+		for port in ("D", "C", "R", "MS", "DS", "CE"):
+			connect(getattr(component, port), buses[port], where)
+		connect(component.O, buses["O"], where)
+		connect(component.OF, buses["OF"], where)
+	elif kind in FLIP_FLOPS:
+		component = FLIP_FLOPS[kind](_edge(attrs))
+		for port, bus in buses.items():
+			if port in ("AR", "AS") and kind != "S-R Flip-Flop":
+				port = "R" if port == "AR" else "S"
+			connect(getattr(component, port), bus, where)
+		# Logisim's flip-flops drive their outputs from the start, before any input changes
+		component.Q.set_state(component.state)
+		component.Qi.set_state(-component.state)
+	elif kind == "Shift Register":
+		component = ShiftRegister(width, int(attrs.get("length", "8")), _edge(attrs))
+		for port in ("R", "L", "S", "C"):
+			connect(getattr(component, port), buses[port], where)
+		connect(component.S_IN, buses["I"], where)
+		for p in range(component.stage_count):
+			connect(component.inputs[p], buses.get(f"D{p}"), where)
+			connect(component.outputs[p], buses.get(f"Q{p}"), where)
+	elif kind == "RAM":
+		component = RAM(_width(attrs, "addrWidth", 8), _width(attrs, "dataWidth", 8), edge=_edge(attrs), async_read=True)
+		for port in ("A", "WE", "OE", "C", "IN"):
+			connect(getattr(component, port), buses[port], where)
+		connect(component.OUT, buses["OUT"], where)
+	elif kind == "ROM":
+		component = ROM(_width(attrs, "addrWidth", 8), _width(attrs, "dataWidth", 8))
+		for address, word in memory_contents(attrs.get("contents", "")).items():
+			component.locs.set(address, word)
+		connect(component.A, buses["A"], where)
+		# Logisim's ROM always drives its output
+		connect(component.OE, circuit.constant(1, BitState.HIGH), where)
+		connect(component.O, buses["O"], where)
+	else:
+		circuit.warnings.append(f"{where}: {kind} has no pylogic equivalent")
+		return None
+	circuit.components.append(component)
+	return component
+
+
+def build_circuit(netlist: Netlist) -> Circuit:
+	"""Instantiates the pylogic components of a Netlist and connects them to one Bus per net"""
+	circuit = Circuit(netlist)
+	with get_simulator().batch():
+		for kind, where, attrs, ports in netlist.components:
+			buses = {port: None if net is None else circuit.buses[net] for port, net in ports.items()}
+			_build_component(circuit, kind, where, attrs, buses)
+	return circuit
+
+
+def import_circ(path: str, cache: bool = True) -> Circuit:
+	return build_circuit(load_circ(path, cache))
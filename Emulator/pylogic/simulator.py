@@ -0,0 +1,87 @@
+from contextlib import contextmanager
+from typing import Callable
+
+from .classes import State
+from .errors import OscillationException
+
+
+class Simulator:
+	def __init__(self, sim_limit: int = 1000):
+		self.sim_limit = sim_limit
+		self.delta = 0
+		# Simulated time in seconds, advanced by clocks
+		self.time = 0.0
+		self.updates: dict = {}
+		self.dirty: dict[Callable, tuple] = {}
+		self.settling = False
+		self.batching = 0
+		self.delivered = 0
+		self.suppressed = 0
+
+	def post(self, port, state: State):
+		self.updates[port] = state
+		self.kick()
+
+	def mark(self, callback: Callable, state: State, port):
+		self.dirty[callback] = (state, port)
+		self.kick()
+
+	def kick(self):
+		if not self.settling and not self.batching:
+			self.settle()
+
+	def settle(self) -> int:
+		deltas = 0
+		self.settling = True
+		try:
+			while self.updates or self.dirty:
+				if deltas >= self.sim_limit:
+					self.updates = {}
+					self.dirty = {}
+					raise OscillationException(self.sim_limit)
+				updates, self.updates = self.updates, {}
+				for port, state in updates.items():
+					if port.bus.drive(port, state):
+						self.delivered += 1
+					else:
+						self.suppressed += 1
+				dirty, self.dirty = self.dirty, {}
+				self.dispatch(dirty)
+				self.delta += 1
+				deltas += 1
+		finally:
+			self.settling = False
+		return deltas
+
+	def dispatch(self, dirty: dict[Callable, tuple]):
+		"""Runs the callbacks of one delta cycle; the hook subclasses wrap to watch every callback."""
+		for callback, (state, port) in dirty.items():
+			callback(state, port)
+
+	def advance(self, seconds: float):
+		self.time += seconds
+
+	def reset_counters(self):
+		self.delivered = 0
+		self.suppressed = 0
+
+	@contextmanager
+	def batch(self):
+		self.batching += 1
+		try:
+			yield self
+		finally:
+			self.batching -= 1
+		self.kick()
+
+
+_simulator = Simulator()
+
+
+def get_simulator() -> Simulator:
+	return _simulator
+
+
+def set_simulator(simulator: Simulator):
+	global _simulator
+	_simulator = simulator
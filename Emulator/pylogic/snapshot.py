@@ -0,0 +1,251 @@
+import os
+import struct
+import sys
+from array import array
+from typing import Any
+
+from .base_components import Bus, Port, TriggerPort
+from .classes import State, PagedMemory
+from .simulator import get_simulator
+
+# A snapshot is a header followed by the buses, the ports and the components of the circuit in the order they were
+# found. A bus is its state and its drivers, a driver being the index of its port or OUTSIDE; a port is its state and
+# the delta of its last edge; a component is a list of named fields.
+SNAPSHOT_MAGIC = b"PLSNAP\x02"
+SNAPSHOT_HEADER = struct.Struct("<7sQdIII")
+OUTSIDE = 0xFFFFFFFF
+# The attributes of a component that make up its state, rather than its configuration
+FIELDS = ("state", "stages", "locs", "cycles", "running")
+STATE, STATES, MEMORY, INTEGER = range(4)
+
+
+def ports_of(component: Any) -> list[Port]:
+	ports = []
+	for value in vars(component).values():
+		if isinstance(value, Port):
+			ports.append(value)
+		elif isinstance(value, list):
+			ports += [item for item in value if isinstance(item, Port)]
+		elif isinstance(value, dict):
+			# A splitter keys its inputs by port and its outputs by bits
+			ports += [item for pair in value.items() for item in pair if isinstance(item, Port)]
+	return ports
+
+
+class Snapshot:
+	"""
+	The state of a circuit at one moment: every bus with its drivers, every port and the state of every component,
+	down to the contents of its memories.
+
+	A snapshot is taken from a list of components and restored into the same list, or into another circuit built the
+	same way. Components replace their States rather than modifying them in place, so taking one only copies
+	references; memories are copied on write. Every circuit restored from one snapshot shares its memory pages until
+	it writes to them, which keeps fanning out from a warmed-up state cheap.
+	"""
+
+	def __init__(self, delta: int, time: float):
+		self.delta = delta
+		self.time = time
+		self.buses: list[tuple[State, list[tuple[int, State]]]] = []
+		self.ports: list[tuple[State, int]] = []
+		self.components: list[dict[str, Any]] = []
+
+	@staticmethod
+	def layout(components: list) -> tuple[list[Bus], list[Port]]:
+		ports = [port for component in components for port in ports_of(component)]
+		buses = list({id(port.bus): port.bus for port in ports if port.bus is not None}.values())
+		return buses, ports
+
+	@classmethod
+	def take(cls, components: list) -> "Snapshot":
+		simulator = get_simulator()
+		snapshot = cls(simulator.delta, simulator.time)
+		buses, ports = cls.layout(components)
+		index = {id(port): i for i, port in enumerate(ports)}
+		for bus in buses:
+			drivers = [(index.get(id(driver), OUTSIDE), state) for driver, state in bus.drivers.items()]
+			snapshot.buses.append((bus.state, drivers))
+		for port in ports:
+			snapshot.ports.append((port.state, port.edge_delta if isinstance(port, TriggerPort) else -1))
+		for component in components:
+			fields = {}
+			for name in FIELDS:
+				value = getattr(component, name, None)
+				if isinstance(value, PagedMemory):
+					value = (value.copy(), value.image is not None)
+				elif isinstance(value, list):
+					value = list(value)
+				elif not isinstance(value, (State, bool, int)):
+					continue
+				fields[name] = value
+			snapshot.components.append(fields)
+		return snapshot
+
+	def restore(self, components: list):
+		"""Puts every bus, port and component back into its state, without running any callbacks."""
+		buses, ports = self.layout(components)
+		if (len(buses), len(ports), len(components)) != (len(self.buses), len(self.ports), len(self.components)):
+			raise ValueError("The snapshot was taken from a different circuit")
+		simulator = get_simulator()
+		simulator.delta = self.delta
+		simulator.time = self.time
+		for bus, (state, drivers) in zip(buses, self.buses):
+			bus.state = state
+			bus.drivers = {None if i == OUTSIDE else ports[i]: driven for i, driven in drivers}
+		for port, (state, edge_delta) in zip(ports, self.ports):
+			port.state = state
+			if isinstance(port, TriggerPort):
+				port.edge_delta = edge_delta
+		for component, fields in zip(components, self.components):
+			for name, value in fields.items():
+				if isinstance(value, tuple):
+					memory, imaged = value
+					image = component.locs.image if imaged else None
+					value = memory.copy()
+					value.image = image
+					store = getattr(component, "store", None)
+					if store is not None:
+						store.clear()
+						for number in value.values:
+							store.touch(number << value.page_bits)
+				elif isinstance(value, list):
+					value = list(value)
+				setattr(component, name, value)
+
+	# Binary form
+
+	def to_bytes(self) -> bytes:
+		out = [SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, self.delta, self.time, len(self.buses), len(self.ports), len(self.components))]
+		for state, drivers in self.buses:
+			out.append(encode_state(state))
+			out.append(struct.pack("<I", len(drivers)))
+			for i, driven in drivers:
+				out.append(struct.pack("<I", i))
+				out.append(encode_state(driven))
+		for state, edge_delta in self.ports:
+			out.append(encode_state(state))
+			out.append(struct.pack("<q", edge_delta))
+		for fields in self.components:
+			out.append(struct.pack("<B", len(fields)))
+			for name, value in fields.items():
+				out.append(struct.pack("<B", FIELDS.index(name)))
+				if isinstance(value, State):
+					out.append(struct.pack("<B", STATE) + encode_state(value))
+				elif isinstance(value, list):
+					out.append(struct.pack("<BI", STATES, len(value)))
+					out += [encode_state(state) for state in value]
+				elif isinstance(value, tuple):
+					out.append(struct.pack("<B", MEMORY) + encode_memory(*value))
+				else:
+					out.append(struct.pack("<Bq", INTEGER, value))
+		return b"".join(out)
+
+	@classmethod
+	def from_bytes(cls, data: bytes) -> "Snapshot":
+		reader = Reader(data)
+		magic, delta, time, buses, ports, components = reader.unpack(SNAPSHOT_HEADER)
+		if magic != SNAPSHOT_MAGIC:
+			raise ValueError("Not a pylogic snapshot")
+		snapshot = cls(delta, time)
+		for _ in range(buses):
+			state = reader.state()
+			drivers = [(reader.unpack("<I")[0], reader.state()) for _ in range(reader.unpack("<I")[0])]
+			snapshot.buses.append((state, drivers))
+		for _ in range(ports):
+			snapshot.ports.append((reader.state(), reader.unpack("<q")[0]))
+		for _ in range(components):
+			fields = {}
+			for _ in range(reader.unpack("<B")[0]):
+				name, kind = FIELDS[reader.unpack("<B")[0]], reader.unpack("<B")[0]
+				if kind == STATE:
+					fields[name] = reader.state()
+				elif kind == STATES:
+					fields[name] = [reader.state() for _ in range(reader.unpack("<I")[0])]
+				elif kind == MEMORY:
+					fields[name] = reader.memory()
+				else:
+					value = reader.unpack("<q")[0]
+					fields[name] = bool(value) if name == "running" else value
+			snapshot.components.append(fields)
+		return snapshot
+
+	def save(self, path: str):
+		with open(path + ".tmp", "wb") as f:
+			f.write(self.to_bytes())
+		os.replace(path + ".tmp", path)
+
+	@classmethod
+	def load(cls, path: str) -> "Snapshot":
+		with open(path, "rb") as f:
+			return cls.from_bytes(f.read())
+
+
+def encode_state(state: State) -> bytes:
+	size = (state.width + 7) // 8
+	return struct.pack("<I", state.width) + state.value.to_bytes(size, "little") + state.unknown.to_bytes(size, "little")
+
+
+def encode_page(page: array | list, data_width: int) -> bytes:
+	if isinstance(page, list):
+		size = (data_width + 7) // 8
+		return b"".join(word.to_bytes(size, "little") for word in page)
+	if sys.byteorder == "big":
+		page = page[:]
+		page.byteswap()
+	return page.tobytes()
+
+
+def encode_memory(memory: PagedMemory, imaged: bool) -> bytes:
+	out = [struct.pack("<BBBBI", memory.addr_width, memory.data_width, memory.page_bits, imaged, len(memory.values))]
+	for number, values in memory.values.items():
+		unknowns = memory.unknowns.get(number)
+		out.append(struct.pack("<IB", number, unknowns is not None))
+		out.append(encode_page(values, memory.data_width))
+		if unknowns is not None:
+			out.append(encode_page(unknowns, memory.data_width))
+	return b"".join(out)
+
+
+class Reader:
+	def __init__(self, data: bytes):
+		self.data = memoryview(data)
+		self.offset = 0
+
+	def unpack(self, layout: struct.Struct | str) -> tuple:
+		if isinstance(layout, str):
+			layout = struct.Struct(layout)
+		values = layout.unpack_from(self.data, self.offset)
+		self.offset += layout.size
+		return values
+
+	def take(self, size: int) -> memoryview:
+		chunk = self.data[self.offset:self.offset + size]
+		self.offset += size
+		return chunk
+
+	def state(self) -> State:
+		width = self.unpack("<I")[0]
+		size = (width + 7) // 8
+		value = int.from_bytes(self.take(size), "little")
+		return State.from_planes(width, value, int.from_bytes(self.take(size), "little"))
+
+	def page(self, memory: PagedMemory) -> array | list:
+		if memory.typecode is None:
+			size = (memory.data_width + 7) // 8
+			data = self.take(size << memory.page_bits)
+			return [int.from_bytes(data[i:i + size], "little") for i in range(0, len(data), size)]
+		page = array(memory.typecode)
+		page.frombytes(self.take(page.itemsize << memory.page_bits))
+		if sys.byteorder == "big":
+			page.byteswap()
+		return page
+
+	def memory(self) -> tuple[PagedMemory, bool]:
+		addr_width, data_width, page_bits, imaged, pages = self.unpack("<BBBBI")
+		memory = PagedMemory(addr_width, data_width, page_bits)
+		for _ in range(pages):
+			number, flags = self.unpack("<IB")
+			memory.values[number] = self.page(memory)
+			if flags:
+				memory.unknowns[number] = self.page(memory)
+		return memory, bool(imaged)
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+# Appended, so that the pylogic at the root of the repository stays the one imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pylogic.simulator import Simulator, get_simulator, set_simulator  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def simulator():
+	"""A fresh simulator for every test, so no model sees the events of another."""
+	previous = get_simulator()
+	fresh = Simulator()
+	set_simulator(fresh)
+	yield fresh
+	set_simulator(previous)
@@ -0,0 +1,153 @@
+import os
+
+import pytest
+
+from pylogic import logisim
+from pylogic.base_components import Bus
+from pylogic.classes import State, PagedMemory
+from pylogic.components.memory import Counter
+from pylogic.components.wiring import Clock
+from pylogic.enums import BitState
+
+import cosim
+from display import TextDisplay
+from machine import Definition, Program, Lev32Machine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+LEV32 = os.path.join(ROOT, "LEV32")
+
+
+@pytest.fixture(scope="module")
+def hello() -> Program:
+	definition = Definition.load(os.path.join(LEV32, "AssemblX-deffile.axs"))
+	return Program.load(os.path.join(LEV32, "hello-world.ax"), definition)
+
+
+def engine(program: Program) -> cosim.Lev32Engine:
+	return cosim.Lev32Engine(Lev32Machine(program, TextDisplay()))
+
+
+class Corrupted(cosim.Lev32Engine):
+	"""A LEV32 engine whose register A reads wrong from instruction at on."""
+
+	def __init__(self, machine: Lev32Machine, at: int):
+		super().__init__(machine)
+		self.at = at
+
+	def state(self) -> dict:
+		state = super().state()
+		if self.instructions >= self.at:
+			state["A"] ^= 1
+		return state
+
+
+class Stalling(cosim.Lev32Engine):
+	"""A LEV32 engine that halts once it has run limit instructions."""
+
+	def __init__(self, machine: Lev32Machine, limit: int):
+		super().__init__(machine)
+		self.limit = limit
+
+	@property
+	def halted(self) -> bool:
+		return self.machine.halted or self.instructions >= self.limit
+
+	def run(self, count: int) -> int:
+		return super().run(min(count, self.limit - self.instructions))
+
+
+def test_compare_finds_the_first_difference():
+	assert cosim.compare({"A": 1, "B": 2}, {"A": 1, "B": 2}) is None
+	assert cosim.compare({"A": 1, "B": 2}, {"A": 1, "B": 3}) == ("B", 2, 3)
+	# Memories differ word by word, a word missing from one side reading as zero
+	assert cosim.compare({"RAM": {4: 7, 2: 1}}, {"RAM": {4: 7}}) == ("RAM[0x2]", 1, 0)
+	assert cosim.compare({"RAM": {4: 7}}, {"RAM": {4: 7, 9: 0}}) is None
+
+
+def test_compare_reports_a_location_the_candidate_lacks():
+	assert cosim.compare({"A": 1, "GRAM": {}}, {"A": 1}) == ("GRAM", {}, cosim.MISSING)
+	assert cosim.compare({"A": 1, "GRAM": {}}, {"A": 1}, {"GRAM"}) is None
+
+
+def test_memory_words_keeps_nonzero_and_unknown_words():
+	memory = PagedMemory(8, 32)
+	memory[3] = State.from_planes(32, 5)
+	memory[0x40] = State.from_planes(32, 0)
+	unknown = State(32, starter=BitState.FLOATING)
+	memory[0x41] = unknown
+	assert cosim.memory_words(memory) == {3: 5, 0x41: unknown}
+
+
+def test_identical_engines_do_not_diverge(hello):
+	reference = Lev32Machine(hello, TextDisplay())
+	candidate = engine(hello)
+	assert cosim.lockstep(reference, candidate, interval=3, checkpoint=8) is None
+	assert reference.halted and candidate.halted
+	assert candidate.instructions == reference.executed
+
+
+def test_the_divergence_is_pinned_to_its_instruction(hello):
+	simulation = cosim.Cosimulation(engine(hello), Corrupted(Lev32Machine(hello, TextDisplay()), 37), 5, 4)
+	divergence = simulation.run()
+	assert (divergence.instruction, divergence.location) == (37, "A")
+	assert divergence.actual == divergence.expected ^ 1
+	assert "after instruction 37 on A" in str(divergence)
+
+
+def test_a_limit_stops_before_the_divergence(hello):
+	simulation = cosim.Cosimulation(engine(hello), Corrupted(Lev32Machine(hello, TextDisplay()), 37))
+	assert simulation.run(36) is None
+	assert simulation.reference.instructions == 36
+
+
+def test_a_candidate_that_halts_early_diverges(hello):
+	simulation = cosim.Cosimulation(engine(hello), Stalling(Lev32Machine(hello, TextDisplay()), 20), 4)
+	divergence = simulation.run()
+	assert (divergence.instruction, divergence.location) == (21, "halted")
+	assert (divergence.expected, divergence.actual) == (False, True)
+
+
+def test_a_model_must_map_every_location():
+	with pytest.raises(ValueError, match="ALU-OB, RAM, GRAM"):
+		cosim.PylogicEngine([], Clock(1.0), {"IC": Bus(1)})
+
+
+def counter_engine() -> tuple[cosim.PylogicEngine, Bus]:
+	"""A pylogic counter standing in for the instruction counter of a CPU, enabled by the returned bus."""
+	clock = Clock(1000.0)
+	count = Counter(8)
+	enable = Bus(1)
+	enable.set_state(State(1, starter=BitState.HIGH))
+	count.CE.set_b(enable)
+	count.DS.set_b(enable)
+	wire = Bus(1)
+	clock.C.set_b(wire)
+	count.C.set_b(wire)
+	unchecked = (*cosim.REGISTERS, *cosim.MEMORIES)
+	return cosim.PylogicEngine([clock, count], clock, {"IC": count.O.get_b()}, limit=4, unchecked=unchecked), enable
+
+
+def test_a_model_halts_when_its_counter_stops():
+	model, enable = counter_engine()
+	assert model.run(3) == 3
+	saved = model.checkpoint()
+	assert model.state()["IC"] == 2
+	enable.set_state(State(1, starter=BitState.LOW))
+	assert model.run(3) == 0
+	assert model.halted and model.instructions == 3
+	model.restore(saved)
+	assert not model.halted
+	assert model.state()["IC"] == 2
+
+
+def test_the_virus32_model_runs_as_an_engine():
+	model = cosim.virus32_engine(logisim.import_circ(os.path.join(ROOT, "Circuit.circ")))
+	assert set(model.state()) == {*cosim.VIRUS32_LOCATIONS, *cosim.VIRUS32_MEMORIES}
+	saved = model.checkpoint()
+	assert model.run(5) == 5
+	state = model.state()
+	assert (state["A"], state["D"], state["IC"]) == (6, 0xAF, 5)
+	model.restore(saved)
+	assert model.state()["IC"] == 0
+	model.run(5)
+	assert model.state() == state
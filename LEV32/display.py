@@ -0,0 +1,54 @@
+import sys
+from typing import TextIO
+
+from memory import PagedWords, WORD_MASK
+
+# Moves the cursor home and wipes the screen and its scrollback, as clear does
+CLEAR = "\x1b[H\x1b[2J\x1b[3J"
+ENCODING = "utf-32-le" if sys.byteorder == "little" else "utf-32-be"
+
+
+class TextDisplay(PagedWords):
+	"""
+	The text GRAM and the screen it is drawn on.
+
+	A frame is the character of every nonzero word in address order. It is built once after GRAM changes and written
+	to the stream in a single write. Without a stream the display is headless and keeps the frames it renders in frames.
+	"""
+	__slots__ = ("stream", "frame", "frames")
+
+	def __init__(self, stream: TextIO = None):
+		super().__init__()
+		self.stream = stream
+		self.frame: str | None = None
+		self.frames: list[str] = []
+
+	def __setitem__(self, address: int, value: int):
+		if self[address] != value & WORD_MASK:
+			super().__setitem__(address, value)
+			self.frame = None
+
+	def read(self, data: memoryview) -> int:
+		self.frame = None
+		return super().read(data)
+
+	def text(self) -> str:
+		if self.frame is None:
+			try:
+				# Each page read as UTF-32 is its characters with a NUL for every empty cell
+				self.frame = "".join(self.pages[number].tobytes().decode(ENCODING) for number in sorted(self.pages)).replace("\0", "")
+			except UnicodeDecodeError:
+				self.frame = "".join(chr(value) for _, value in self.items())
+		return self.frame
+
+	def render(self):
+		if self.stream is None:
+			self.frames.append(self.text())
+			return
+		self.stream.write(self.text())
+		self.stream.flush()
+
+	def clear(self):
+		if self.stream is not None:
+			self.stream.write(CLEAR)
+			self.stream.flush()
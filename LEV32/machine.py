@@ -0,0 +1,823 @@
+import re
+import struct
+import sys
+import zlib
+from typing import Callable
+
+from display import TextDisplay
+from memory import PagedWords, register_file, WORD_MASK, ADDRESS_MASK, REGISTERS
+
+AXS_REGEX = re.compile(r"// ([A-Z]{2,5})\n((?:(?:EIS|DWE|DOE|AWE|AOE|ALU|GPU|ITR)(?: A(?: [AB])?| \d{1,2})?\n)+)")
+SI_REGEX = re.compile(r"(EIS|DWE|DOE|AWE|AOE|ALU|GPU|ITR) *(?:(A) *([AB])?|(\d{1,2}))?")
+ASSEMBLY_REGEX = re.compile(r"([A-Z]{2,5}) *([\d;$a-z]*(?:&.)?)")
+
+PLACEHOLDER_LOOKUP = {
+	"$a": 1,
+	"$b": 2,
+	"$c": 3,
+	"$d": 4,
+	"$ram": 10,
+	"$gram": 11,
+	"$alua": 5,
+	"$alub": 6,
+	"$aluc": 7,
+	"$aluoa": 8,
+	"$aluob": 9,
+	"$exi1": 12,
+	"$exi2": 13,
+	"$exi3": 14,
+	"$exi4": 15,
+	"$exo1": 16,
+	"$exo2": 17,
+	"$exo3": 18,
+	"$exo4": 19
+}
+
+DWE_LOOKUP = {
+	1: 0,
+	2: 1,
+	3: 2,
+	4: 3,
+	5: 4,
+	6: 10,
+	7: 5,
+	8: 6,
+	9: 7,
+	10: -1,
+	11: 11,
+	12: 12,
+	13: 13,
+	14: 14,
+	15: 15
+}
+
+DOE_LOOKUP = {
+	1: 0,
+	2: 1,
+	3: 2,
+	4: 3,
+	5: 4,
+	6: 10,
+	7: -1,
+	8: 8,
+	9: 9,
+	10: 16,
+	11: 17,
+	12: 18,
+	13: 19,
+}
+
+DWE_TARGETS = set(DWE_LOOKUP.values())
+DOE_TARGETS = set(DOE_LOOKUP.values())
+
+BLOCK_LIMIT = 256
+# Entries into a line before a block is compiled from it, as compiling costs far more than interpreting a line once
+BLOCK_THRESHOLD = 16
+
+# A snapshot is this header followed by RAM, the graphics GRAM and the text GRAM
+SNAPSHOT_MAGIC = b"LEV32S\x01"
+SNAPSHOT_HEADER = struct.Struct(f"<7sI{REGISTERS}IiIIq4?iiiQ")
+# The state of a machine besides its registers and memories, in the order of the snapshot header
+SNAPSHOT_FIELDS = (
+	"line_counter", "ram_addr", "gram_addr", "alu_mode", "alu_stale", "txt_gpu", "ad_mirror", "halted", "we_index", "oe_index",
+	"awe_index", "executed"
+)
+
+
+class Lev32Exception(Exception):
+	"""Stops a machine with one of the exit codes of the interpreter."""
+
+	def __init__(self, code: str):
+		self.code = code
+
+	def __str__(self):
+		return self.code
+
+
+def parse_arg_input(arg: str, trace: bool = False) -> int:
+	if trace:
+		print(f"Parsing argument '{arg}'")
+	if arg.startswith("b"):
+		out = int(arg[1:], 2)
+	elif arg.startswith("x"):
+		out = int(arg[1:], 16)
+	elif arg.startswith("o"):
+		out = int(arg[1:], 8)
+	elif arg.startswith("&"):
+		out = ord(arg[1])
+	else:
+		out = int(arg)
+	if trace:
+		print(f"Parsing argument '{arg}' to integer {out}")
+	return out
+
+
+def try_parse(arg: str):
+	# Placeholders and operand lists never parse, and raising is what makes decoding slow
+	if arg and (arg[0] == "$" or ";" in arg and arg[0] != "&"):
+		return None
+	try:
+		return parse_arg_input(arg)
+	except (ValueError, IndexError, TypeError, AttributeError):
+		return None
+
+
+def placeholder(arg: str, place):
+	if not arg.startswith("$"):
+		raise Lev32Exception("0x3")
+	return place if place is not None else PLACEHOLDER_LOOKUP[arg]
+
+
+def decode_si(si: str):
+	# (name, A flag, A/B selector, number) or None for lines that are no sub-instruction
+	m = SI_REGEX.match(si)
+	if m is None:
+		return None
+	return m.group(1), m.group(2), m.group(3), int(m.group(4)) if m.group(4) is not None else None
+
+
+def regular(sis: list) -> bool:
+	steps = [si for si in sis if si is not None]
+	return sis[-1] is None and bool(steps) and steps[-1][0] == "EIS" and steps[-1][3] is None
+
+
+class Definition:
+	"""An AssemblX language definition (.axs): the sub-instructions of every opcode, the last opcode halting."""
+
+	def __init__(self, text: str):
+		ld = {match.group(1): match.group(2).split("\n") for match in AXS_REGEX.finditer(text)}
+		self.build(ld, {key: [decode_si(si) for si in sis] for key, sis in ld.items()})
+
+	def build(self, ld: dict[str, list[str]], decoded: dict[str, list]):
+		"""Sets up the definition from the text and the decoded form of the sub-instructions of every opcode."""
+		self.ld = ld
+		self.decoded = decoded
+		self.halt_opcode = list(self.ld.keys())[-1] if self.ld else None
+		# Every opcode as the (handler, sub-instruction) pairs it runs
+		self.ops = {
+			key: [(Lev32Machine.si_skip if si is None else SI_HANDLERS.get(si[0], Lev32Machine.si_unknown), si) for si in sis]
+			for key, sis in self.decoded.items()
+		}
+		# Whether every opcode ends by resetting the enables with EIS, so that every line starts from the same state
+		self.regular = all(regular(sis) for sis in self.decoded.values())
+
+	@classmethod
+	def load(cls, path: str) -> "Definition":
+		with open(path) as f:
+			return cls(f.read())
+
+
+class Line:
+	"""A program line decoded once before execution. Operands that do not parse are left as None and parsed again when used, so errors surface where they always did."""
+	__slots__ = ("opcode", "args", "arg_s", "ops", "halt", "value", "values", "place", "places")
+
+	def __init__(self, opcode: str, args: str, definition: Definition):
+		self.opcode = opcode
+		self.args = args
+		self.arg_s = [arg.strip() for arg in args.split(";")]
+		self.halt = opcode == definition.halt_opcode
+		self.value = try_parse(args)
+		self.values = [try_parse(arg) for arg in self.arg_s] if len(self.arg_s) > 1 else [self.value]
+		self.place = PLACEHOLDER_LOOKUP.get(args)
+		self.places = [PLACEHOLDER_LOOKUP.get(arg) for arg in self.arg_s]
+		self.ops = [bind(handler, si, self) for handler, si in definition.ops.get(opcode, [(Lev32Machine.opcode_unknown, None)])]
+
+
+def bind(handler, si, line: Line):
+	"""Binds DWE and DOE to their location when the line already names a valid one, leaving the rest to fail at run time."""
+	if handler is Lev32Machine.si_dwe or handler is Lev32Machine.si_doe:
+		_, a, ab, number = si
+		if a is None:
+			loc = (DWE_LOOKUP if handler is Lev32Machine.si_dwe else DOE_LOOKUP).get(number)
+		elif ab is None:
+			loc = line.place
+		else:
+			index = 0 if ab == "A" else 1
+			loc = line.places[index] if index < len(line.places) else None
+		if handler is Lev32Machine.si_dwe and loc in DWE_TARGETS:
+			return Lev32Machine.si_dwe_to, loc
+		if handler is Lev32Machine.si_doe and loc in DOE_TARGETS:
+			return Lev32Machine.si_doe_to, loc
+	return handler, si
+
+
+class Program:
+	"""A decoded AssemblX program and the blocks compiled from it so far, shared by every machine running it."""
+
+	def __init__(self, text: list[str], definition: Definition, trace: bool = False, lines: list = None):
+		keys = len(definition.ld)
+		if keys != 16:
+			if trace:
+				print(f"{keys}/16 keys present")
+			raise Lev32Exception("0x1")
+		self.text = text
+		# Tells snapshots of this program from those of others
+		self.digest = zlib.crc32("".join(text).encode())
+		self.definition = definition
+		self.lines = lines if lines is not None else self.decode(text, definition)
+		self.blocks = [None] * len(self.lines)
+		self.entries = [0] * len(self.lines)
+
+	@staticmethod
+	def decode(text: list[str], definition: Definition) -> list:
+		lines = []
+		# Lines never change once decoded, so repeated lines share one
+		decoded = {}
+		for source in text:
+			match = ASSEMBLY_REGEX.match(source)
+			if match is None:
+				lines.append(None)
+				continue
+			line = decoded.get(match.group())
+			if line is None:
+				line = decoded[match.group()] = Line(match.group(1), match.group(2), definition)
+			lines.append(line)
+		return lines
+
+	@classmethod
+	def load(cls, path: str, definition: Definition, trace: bool = False) -> "Program":
+		with open(path) as f:
+			return cls(f.readlines(), definition, trace)
+
+	def block(self, start: int) -> tuple[Callable, int]:
+		"""
+		The block starting on line start, with the number of instructions it runs. Until the line has been entered
+		BLOCK_THRESHOLD times, this is a function interpreting just that line.
+		"""
+		block = self.blocks[start]
+		if block is not None:
+			return block
+		self.entries[start] += 1
+		if self.entries[start] >= BLOCK_THRESHOLD:
+			block = self.blocks[start] = compile_block(self.lines, start)
+			return block
+		line = self.lines[start]
+
+		def interpret(machine: Lev32Machine):
+			machine.line_counter = start
+			if line is not None:
+				machine.executed += 1
+				machine.execute(line)
+			return machine.halted
+
+		return interpret, int(line is not None)
+
+
+class LineCompiler:
+	"""
+	Compiles one line into Python statements, following the enables through its sub-instructions at compile time.
+
+	Whatever cannot be decided before running, like an operand that does not parse or an invalid location, is left to
+	its handler, after the enables followed so far were written back. The handler takes over until the next EIS.
+	"""
+
+	def __init__(self, line: Line, index: int, stale: bool | None = None):
+		self.line = line
+		self.name = f"l{index}"
+		self.code = []
+		self.we = -2
+		self.oe = -2
+		self.awe = -2
+		self.known = True
+		# Whether the ALU outputs are out of date, None when only known at run time
+		self.stale = stale
+		self.jumps = False
+
+	def emit(self, statement: str):
+		self.code.append(statement)
+
+	def compile(self) -> list[str]:
+		for k, (handler, si) in enumerate(self.line.ops):
+			if not self.known or not self.step(handler, si):
+				self.call(k, handler, si)
+		return self.code
+
+	def call(self, k: int, handler, si):
+		if self.known:
+			for variable, value in (("we_index", self.we), ("oe_index", self.oe), ("awe_index", self.awe)):
+				if value != -2:
+					self.emit(f"self.{variable} = {value}")
+			if self.stale:
+				self.emit("self.alu_stale = True")
+		self.emit(f"{self.name}.ops[{k}][0](self, {self.name}.ops[{k}][1], {self.name})")
+		self.jumps = True
+		self.stale = None
+		self.known = handler is Lev32Machine.si_eis and si[3] is None
+		if self.known:
+			self.we = self.oe = self.awe = -2
+
+	def step(self, handler, si) -> bool:
+		line = self.line
+		if handler is Lev32Machine.si_skip:
+			return True
+		if handler is Lev32Machine.si_eis:
+			if si[3] is None:
+				self.emit("registers[0] = 0")
+				self.we = self.oe = self.awe = -2
+			return True
+		if handler is Lev32Machine.si_dwe_to:
+			self.we = si
+		elif handler is Lev32Machine.si_doe_to:
+			self.oe = si
+		elif handler is Lev32Machine.si_awe:
+			if si[3] is None or not (0 < si[3] <= 4):
+				return False
+			self.awe = si[3]
+		elif handler is Lev32Machine.si_aoe:
+			if si[3] is None:
+				return False
+			self.emit(f"self.ad_mirror = {bool(si[3])}")
+		elif handler is Lev32Machine.si_alu:
+			mode = line.value if si[1] is not None else si[3]
+			if mode is None:
+				return False
+			self.emit(f"self.alu_mode = {mode}")
+			self.stale = True
+		elif handler is Lev32Machine.si_gpu:
+			if len(line.arg_s) != 3 or None in line.values:
+				return False
+			self.emit(f"self.txt_gpu = {bool(line.values[0])}")
+			if line.values[1]:
+				self.emit("self.gpu_render()")
+			if line.values[2]:
+				self.emit("self.gpu_clear()")
+		else:
+			return False
+		self.settle()
+		return True
+
+	def settle(self):
+		alu = [
+			"if self.alu_mode != 0:",
+			'\traise Lev32Exception("0x5")',
+			"aluoa = registers[5] + registers[6]",
+			f"registers[8] = aluoa & {WORD_MASK}",
+			"registers[9] = aluoa - 4294967296 if aluoa >= 4294967296 else 0"
+		]
+		if self.stale is None:
+			self.emit("if self.alu_stale:")
+			self.code.extend("\t" + statement for statement in alu + ["self.alu_stale = False"])
+		elif self.stale:
+			self.code.extend(alu)
+		self.stale = False
+
+		we, oe = self.we, self.oe
+		if we >= 0 and oe >= 0 and we != oe:
+			self.store(we, self.load(oe))
+		if we == -1 and oe >= 0:
+			mirrored = self.address(self.load(oe))
+			if mirrored:
+				self.emit("if self.ad_mirror:")
+				self.code.extend("\t" + statement for statement in mirrored)
+				direct = self.address(self.value())
+				if direct:
+					self.emit("else:")
+					self.code.extend("\t" + statement for statement in direct)
+				return
+		self.code.extend(self.address(self.value()))
+		if self.awe == 4 and oe == -1 and we >= 0:
+			self.store(we, f"{self.value()} & {WORD_MASK}")
+
+	def address(self, value: str) -> list[str]:
+		if self.awe == 1:
+			return [f"self.ram_addr = {value} & {ADDRESS_MASK}"]
+		if self.awe == 2:
+			return [f"self.gram_addr = {value} & {ADDRESS_MASK}"]
+		if self.awe == 3:
+			self.jumps = True
+			return [f"self.line_counter = {value} - 1"]
+		return []
+
+	def value(self) -> str:
+		if self.line.value is None:
+			return f"parse_arg_input({self.name}.args)"
+		return str(self.line.value)
+
+	@staticmethod
+	def load(oe: int) -> str:
+		return "self.ram[self.ram_addr]" if oe == 10 else f"registers[{oe}]"
+
+	def store(self, we: int, value: str):
+		if we == 10:
+			self.emit(f"self.ram[self.ram_addr] = {value}")
+		elif we == 11:
+			self.emit(f"self.gram[self.txt_gpu][self.gram_addr] = {value}")
+		else:
+			self.emit(f"registers[{we}] = {value}")
+			if we == 5 or we == 6:
+				self.stale = True
+
+
+def compile_block(lines: list, start: int) -> tuple[Callable, int]:
+	"""
+	Compiles the lines from start up to the first one that may jump or halt into a single function of the machine,
+	which leaves line_counter on the last line it ran like stepping does and returns True when the machine halted.
+	Like stepping, it counts the instructions it ran in executed, up to the one that raised if any. Returns it with
+	the number of instructions it runs.
+	"""
+	end = len(lines)
+	captures = []
+	body = []
+	size = 0
+	last = start
+	# The line of every instruction, and how many of them leave setting line_counter to the block when they raise
+	indices = []
+	placed = 0
+	# The ALU state is followed from line to line and only written back at the end of the block
+	stale = None
+	halts = False
+	for index in range(start, min(end, start + BLOCK_LIMIT)):
+		last = index
+		line = lines[index]
+		if line is None:
+			continue
+		size += 1
+		compiler = LineCompiler(line, index, stale)
+		code = compiler.compile()
+		stale = compiler.stale
+		captures.append(f"\tl{index} = lines[{index}]")
+		body.append(f"\t\t\tran = {size}")
+		indices.append(index)
+		if compiler.jumps or line.halt:
+			body.append(f"\t\t\tself.line_counter = {index}")
+			body.extend("\t\t\t" + statement for statement in code)
+			halts = line.halt
+			break
+		body.extend("\t\t\t" + statement for statement in code)
+		placed = size
+	else:
+		body.append(f"\t\t\tself.line_counter = {last}")
+	if stale:
+		body.append("\t\t\tself.alu_stale = True")
+	if halts:
+		body.append("\t\t\tself.halted = True")
+		body.append("\t\t\treturn True")
+	source = "\n".join([
+		"def make(lines):",
+		*captures,
+		f"\tat = {tuple(indices)!r}",
+		"\tdef block(self):",
+		"\t\tregisters = self.registers",
+		"\t\tran = 0",
+		"\t\ttry:",
+		*body,
+		"\t\t\tpass",
+		"\t\texcept BaseException:",
+		# Like stepping, an instruction that raises leaves line_counter on its own line
+		f"\t\t\tif ran <= {placed}:",
+		"\t\t\t\tself.line_counter = at[ran - 1]",
+		"\t\t\traise",
+		"\t\tfinally:",
+		"\t\t\tself.executed += ran",
+		"\treturn block",
+	]) + "\n"
+	namespace = {}
+	exec(compile(source, f"<LEV32 block {start}>", "exec"), globals(), namespace)
+	return namespace["make"](lines), size
+
+
+class Lev32Machine:
+	"""
+	A LEV32 processor running one AssemblX program.
+
+	Halting ends a run and sets halted; every other exit code of the interpreter is raised as a Lev32Exception. Runs
+	use the compiled blocks of the program when its definition allows, and step line by line otherwise.
+	"""
+	__slots__ = (
+		"program", "registers", "ram", "gram", "line_counter", "ram_addr", "gram_addr", "alu_mode", "alu_stale", "txt_gpu",
+		"ad_mirror", "we_index", "oe_index", "awe_index", "executed", "halted"
+	)
+	trace = False
+	compiled = True
+
+	def __init__(self, program: Program, display: TextDisplay = None):
+		self.program = program
+		self.registers = register_file()
+		self.ram = PagedWords()
+		# The graphics and the text GRAM, picked by txt_gpu
+		self.gram = (PagedWords(), display if display is not None else TextDisplay(sys.stdout))
+		self.line_counter = -1
+		self.ram_addr = 0
+		self.gram_addr = 0
+		self.alu_mode = 0
+		self.alu_stale = False
+		self.txt_gpu = True
+		self.ad_mirror = False
+		self.we_index = -2
+		self.oe_index = -2
+		self.awe_index = -2
+		self.executed = 0
+		self.halted = False
+
+	def step(self) -> bool:
+		"""Runs the next line. Returns whether the machine is still running."""
+		if self.halted:
+			return False
+		self.line_counter += 1
+		lines = self.program.lines
+		if self.line_counter >= len(lines):
+			raise Lev32Exception("0xE")
+		line = lines[self.line_counter]
+		if line is not None:
+			self.executed += 1
+			self.execute(line)
+		return not self.halted
+
+	def execute(self, line: Line):
+		for handler, si in line.ops:
+			handler(self, si, line)
+		if line.halt:
+			self.halted = True
+
+	def run(self, max_instructions: int | None = None) -> int:
+		"""Runs until the machine halts or max_instructions instructions have run. Returns the number that ran."""
+		if not self.compiled or not self.program.definition.regular:
+			return self.run_until(lambda machine: False, max_instructions)
+		program = self.program
+		blocks = program.blocks
+		end = len(blocks)
+		limit = max_instructions if max_instructions is not None else float("inf")
+		executed = self.executed
+		# Blocks count the instructions they ran themselves, so a block that raises partway counts only those
+		while not self.halted:
+			start = self.line_counter + 1
+			if start >= end:
+				raise Lev32Exception("0xE")
+			block, size = blocks[start] or program.block(start)
+			if self.executed - executed + size > limit:
+				break
+			if block(self):
+				break
+		count = self.executed - executed
+		if not self.halted and count < limit:
+			# The next block would run past the limit, so the remaining instructions are stepped
+			count += self.run_until(lambda machine: False, limit - count)
+		return count
+
+	def run_until(self, predicate: Callable[["Lev32Machine"], bool], limit: int | None = None) -> int:
+		"""Steps until predicate(machine) holds after an instruction, the machine halts or limit instructions have run."""
+		executed = self.executed
+		while not self.halted and (limit is None or self.executed - executed < limit):
+			self.step()
+			if predicate(self):
+				break
+		return self.executed - executed
+
+	def get_data(self, index: int) -> int:
+		if index == 10:
+			return self.ram[self.ram_addr]
+		return self.registers[index]
+
+	def set_data(self, index: int, value: int):
+		if index == 10:
+			self.ram[self.ram_addr] = value
+		elif index == 11:
+			self.gram[self.txt_gpu][self.gram_addr] = value
+		else:
+			self.registers[index] = value & WORD_MASK
+			if index == 5 or index == 6:
+				self.alu_stale = True
+
+	def dump(self) -> list:
+		"""The data bus locations as one list, RAM and GRAM as {address: word} of their nonzero words."""
+		registers = self.registers
+		return registers[:10] + [dict(self.ram.items()), [dict(gram.items()) for gram in self.gram]] + registers[12:]
+
+	def snapshot(self) -> bytes:
+		"""The state of the machine in the binary snapshot format, to be restored into a machine running the same program."""
+		fields = [getattr(self, name) for name in SNAPSHOT_FIELDS]
+		header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, self.program.digest, *self.registers, *fields)
+		return header + self.ram.to_bytes() + self.gram[0].to_bytes() + self.gram[1].to_bytes()
+
+	def restore(self, data: bytes):
+		fields = SNAPSHOT_HEADER.unpack_from(data)
+		if fields[0] != SNAPSHOT_MAGIC:
+			raise ValueError("Not a LEV32 snapshot")
+		if fields[1] != self.program.digest:
+			raise ValueError("The snapshot was taken from a different program")
+		self.registers[:] = fields[2:2 + REGISTERS]
+		for name, value in zip(SNAPSHOT_FIELDS, fields[2 + REGISTERS:]):
+			setattr(self, name, value)
+		view = memoryview(data)[SNAPSHOT_HEADER.size:]
+		for memory in (self.ram, *self.gram):
+			view = view[memory.read(view):]
+
+	def fork(self, display: TextDisplay = None) -> "Lev32Machine":
+		"""
+		A machine of the same kind in the same state, sharing the memory pages of this one until either writes to them.
+		The text GRAM goes to display, a headless one by default.
+		"""
+		machine = type(self)(self.program, display if display is not None else TextDisplay())
+		for name in SNAPSHOT_FIELDS:
+			setattr(machine, name, getattr(self, name))
+		machine.registers = self.registers[:]
+		machine.ram = self.ram.copy()
+		machine.gram = (self.gram[0].copy(), self.gram[1].copy(machine.gram[1]))
+		machine.gram[1].frame = None
+		return machine
+
+	def gpu_render(self):
+		if self.txt_gpu:
+			self.gram[1].render()
+		else:
+			raise Lev32Exception("0x7")
+
+	def gpu_clear(self):
+		self.gram[1].clear()
+
+	def update_alu(self):
+		if self.alu_mode != 0:
+			raise Lev32Exception("0x5")
+		registers = self.registers
+		aluoa = registers[5] + registers[6]
+		registers[8] = aluoa & WORD_MASK
+		registers[9] = aluoa - 2 ** 32 if aluoa >= 2 ** 32 else 0
+		self.alu_stale = False
+
+	def settle(self, line: Line):
+		"""Runs the ALU and moves data between the enabled locations, as happens after every sub-instruction but EIS."""
+		# The ALU only reads its inputs and its mode, so its outputs stay valid until one of them is written
+		if self.alu_stale:
+			self.update_alu()
+
+		we = self.we_index
+		oe = self.oe_index
+		awe = self.awe_index
+		if we >= 0 and oe >= 0:
+			self.set_data(we, self.get_data(oe))
+		if self.ad_mirror and we == -1 and oe >= 0:
+			value = self.ram[self.ram_addr] if oe == 10 else self.registers[oe]
+			if awe == 1:
+				self.ram_addr = value & ADDRESS_MASK
+			elif awe == 2:
+				self.gram_addr = value & ADDRESS_MASK
+			elif awe == 3:
+				self.line_counter = value - 1
+		elif awe > 0:
+			if awe == 1:
+				self.ram_addr = int(self.literal(line.args, line.value)) & ADDRESS_MASK
+			elif awe == 2:
+				self.gram_addr = int(self.literal(line.args, line.value)) & ADDRESS_MASK
+			elif awe == 3:
+				self.line_counter = int(self.literal(line.args, line.value)) - 1
+			elif oe == -1 and we >= 0:
+				self.set_data(we, self.literal(line.args, line.value))
+
+	@staticmethod
+	def literal(arg: str, value) -> int:
+		return value if value is not None else parse_arg_input(arg)
+
+	@staticmethod
+	def target(si, line: Line, lookup: dict, targets: set) -> int:
+		_, a, ab, number = si
+		if a is None:
+			loc = lookup[number]
+		elif ab == "A":
+			loc = placeholder(line.arg_s[0], line.places[0])
+		elif ab == "B":
+			loc = placeholder(line.arg_s[1], line.places[1])
+		else:
+			loc = placeholder(line.args, line.place)
+		if loc not in targets:
+			raise Lev32Exception("0x4")
+		return loc
+
+	def si_skip(self, si, line: Line):
+		pass
+
+	def si_eis(self, si, line: Line):
+		if si[3] is None:
+			self.registers[0] = 0
+			self.we_index = -2
+			self.oe_index = -2
+			self.awe_index = -2
+		else:
+			self.get_data(8)
+
+	def si_dwe(self, si, line: Line):
+		self.we_index = self.target(si, line, DWE_LOOKUP, DWE_TARGETS)
+		self.settle(line)
+
+	def si_doe(self, si, line: Line):
+		self.oe_index = self.target(si, line, DOE_LOOKUP, DOE_TARGETS)
+		self.settle(line)
+
+	def si_dwe_to(self, loc: int, line: Line):
+		self.we_index = loc
+		self.settle(line)
+
+	def si_doe_to(self, loc: int, line: Line):
+		self.oe_index = loc
+		self.settle(line)
+
+	def si_awe(self, si, line: Line):
+		self.awe_index = int(si[3])
+		if not (0 < self.awe_index <= 4):
+			if self.trace:
+				print(f"AWE failed: {si}")
+			raise Lev32Exception("0x1")
+		self.settle(line)
+
+	def si_aoe(self, si, line: Line):
+		self.ad_mirror = bool(int(si[3]))
+		self.settle(line)
+
+	def si_alu(self, si, line: Line):
+		if si[1] is not None:
+			self.alu_mode = int(self.literal(line.args, line.value))
+		else:
+			self.alu_mode = int(si[3])
+		self.alu_stale = True
+		self.settle(line)
+
+	def si_gpu(self, si, line: Line):
+		if len(line.arg_s) != 3:
+			raise Lev32Exception("0x6")
+		self.txt_gpu = bool(int(self.literal(line.arg_s[0], line.values[0])))
+		if bool(int(self.literal(line.arg_s[1], line.values[1]))):
+			self.gpu_render()
+		if bool(int(self.literal(line.arg_s[2], line.values[2]))):
+			self.gpu_clear()
+		self.settle(line)
+
+	def si_itr(self, si, line: Line):
+		raise Lev32Exception("0x7")
+
+	def si_unknown(self, si, line: Line):
+		if self.trace:
+			print(f"Unknown subcom: {si[0]}")
+		raise Lev32Exception("0x1")
+
+	def opcode_unknown(self, si, line: Line):
+		# The interpreter fails on the definition lookup, so this stays a KeyError rather than an exit code
+		raise KeyError(f"Unknown opcode {line.opcode!r} on line {self.line_counter}: {self.program.text[self.line_counter].strip()!r}")
+
+
+class TracedLev32Machine(Lev32Machine):
+	"""A machine that steps through its program, printing every line, sub-instruction and data access."""
+	__slots__ = ()
+	trace = True
+	compiled = False
+
+	def step(self) -> bool:
+		if self.halted:
+			return False
+		program = self.program
+		ld = program.definition.ld
+		self.line_counter += 1
+		print(f"\nRunning line {self.line_counter}: '{program.text[self.line_counter][:-1]}'")
+		print(f"Memory dump: {self.dump()}")
+		if self.line_counter >= len(program.lines):
+			raise Lev32Exception("0xE")
+		line = program.lines[self.line_counter]
+		if line is not None:
+			self.executed += 1
+			if line.opcode not in ld:
+				self.opcode_unknown(None, line)
+			print(f"Subinstructions: {ld[line.opcode]}")
+			for (handler, si), text in zip(line.ops, ld[line.opcode]):
+				print(f"Running subinstruction '{text}' ({line.args})")
+				if si is None:
+					print(f"Skipping non-instruction on line {self.line_counter}: '{text}'")
+				else:
+					print(SI_REGEX.match(text).groups())
+					print(f"'{line.args}': {line.arg_s}")
+				handler(self, si, line)
+			if line.halt:
+				self.halted = True
+		return not self.halted
+
+	@staticmethod
+	def literal(arg: str, value) -> int:
+		# Operands are parsed again, to trace them where they are used as the interpreter always did
+		return parse_arg_input(arg, True)
+
+	def get_data(self, index: int):
+		out = super().get_data(index)
+		print(f"Fetching data from index {index}: {out}")
+		return out
+
+	def set_data(self, index: int, value: int):
+		print(f"Setting data at {index} to {value}")
+		super().set_data(index, value)
+
+	def gpu_render(self):
+		print(f"Rendering")
+		if self.txt_gpu:
+			print(dict(self.gram[1].items()))
+		super().gpu_render()
+
+	def gpu_clear(self):
+		print("---")
+
+
+SI_HANDLERS = {
+	"EIS": Lev32Machine.si_eis,
+	"DWE": Lev32Machine.si_dwe,
+	"DOE": Lev32Machine.si_doe,
+	"AWE": Lev32Machine.si_awe,
+	"AOE": Lev32Machine.si_aoe,
+	"ALU": Lev32Machine.si_alu,
+	"GPU": Lev32Machine.si_gpu,
+	"ITR": Lev32Machine.si_itr
+}
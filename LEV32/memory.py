@@ -0,0 +1,98 @@
+import struct
+import sys
+from array import array
+from typing import Iterator
+
+WORD_MASK = 0xFFFFFFFF
+ADDRESS_MASK = 0xFFFFFF
+REGISTERS = 20
+PAGE_BITS = 12
+PAGE_MASK = (1 << PAGE_BITS) - 1
+# A memory in a snapshot is its page count followed by the number and the little endian words of every page
+PAGE_COUNT = struct.Struct("<I")
+
+
+def register_file() -> list[int]:
+	"""
+	The locations of the data bus, holding 32 bit words. RAM (10) and GRAM (11) only hold their place.
+
+	This is a list rather than an array, as CPython indexes lists several times faster and the machine does little
+	else; writers keep the words in range by masking.
+	"""
+	return [0] * REGISTERS
+
+
+class PagedWords:
+	"""
+	A memory of 32 bit words over 24 bit addresses, kept as array pages that are allocated when first written. Copies
+	share their pages until either side writes to one.
+	"""
+	__slots__ = ("pages", "shared")
+
+	def __init__(self):
+		self.pages: dict[int, array] = {}
+		# Pages that another copy may still hold
+		self.shared: set[int] = set()
+
+	def __getitem__(self, address: int) -> int:
+		page = self.pages.get(address >> PAGE_BITS)
+		return page[address & PAGE_MASK] if page is not None else 0
+
+	def __setitem__(self, address: int, value: int):
+		number = address >> PAGE_BITS
+		page = self.pages.get(number)
+		if page is None:
+			page = self.pages[number] = array("I", bytes(4 << PAGE_BITS))
+		elif number in self.shared:
+			self.shared.discard(number)
+			page = self.pages[number] = array("I", page)
+		page[address & PAGE_MASK] = value & WORD_MASK
+
+	def items(self) -> Iterator[tuple[int, int]]:
+		"""The address and value of every nonzero word, in address order."""
+		for number in sorted(self.pages):
+			base = number << PAGE_BITS
+			for offset, word in enumerate(self.pages[number]):
+				if word:
+					yield base + offset, word
+
+	def copy(self, memory: "PagedWords" = None) -> "PagedWords":
+		"""Gives memory, a new PagedWords by default, the contents of this one."""
+		memory = memory if memory is not None else PagedWords()
+		memory.pages = dict(self.pages)
+		self.shared |= self.pages.keys()
+		memory.shared = set(self.pages)
+		return memory
+
+	def to_bytes(self) -> bytes:
+		out = [PAGE_COUNT.pack(len(self.pages))]
+		for number in sorted(self.pages):
+			page = self.pages[number]
+			if sys.byteorder == "big":
+				page = array("I", page)
+				page.byteswap()
+			out.append(PAGE_COUNT.pack(number) + page.tobytes())
+		return b"".join(out)
+
+	def read(self, data: memoryview) -> int:
+		"""Replaces the contents with the memory encoded at the start of data. Returns the number of bytes it took."""
+		self.pages = {}
+		self.shared = set()
+		count, = PAGE_COUNT.unpack_from(data)
+		offset = PAGE_COUNT.size
+		size = 4 << PAGE_BITS
+		for _ in range(count):
+			number, = PAGE_COUNT.unpack_from(data, offset)
+			offset += PAGE_COUNT.size
+			page = self.pages[number] = array("I")
+			page.frombytes(data[offset:offset + size])
+			if sys.byteorder == "big":
+				page.byteswap()
+			offset += size
+		return offset
+
+	def __eq__(self, other):
+		return isinstance(other, PagedWords) and dict(self.items()) == dict(other.items())
+
+	def __repr__(self):
+		return repr(dict(self.items()))
@@ -0,0 +1,121 @@
+import re
+
+from machine import Definition, Program, Line, Lev32Machine, SI_HANDLERS, bind
+
+# The images written by the AssemblX compilers: a 63 bit word of up to seven 9 bit sub-instructions per opcode in the
+# definition (.hex) and a 36 bit word of a 4 bit opcode and a 32 bit argument per line in programs (.axb)
+RAW_HEADER = "v2.0 raw"
+RAW_TOKEN = re.compile(r"#[^\n]*|[^\s#]+")
+SI_NAMES = ("EIS", "DWE", "DOE", "AWE", "AOE", "ALU", "GPU", "ITR")
+SI_BITS = 9
+SI_SLOTS = 7
+OPCODES = ("NOP", "CD", "SD", "LD", "SMA", "SGMA", "CLD", "JMP", "DJMP", "JMPE", "IR", "GPU", "ALU", None, None, "HLT")
+
+# The hardware numbers the locations as AssemblX-Docs.md does; these give the number LEV32 uses for the same location
+HARDWARE_DWE = {1: 1, 2: 2, 3: 3, 4: 4, 5: 5, 6: 6, 7: 12, 8: 10, 9: 11, 10: 7, 11: 8, 12: 9}
+HARDWARE_DOE = {1: 1, 2: 2, 3: 3, 4: 4, 5: 5, 6: 6, 7: 10, 8: 7, 9: 8, 10: 9}
+HARDWARE_AWE = {1: 1, 2: 2, 3: 4, 4: 3}
+HARDWARE_NUMBERS = {"DWE": HARDWARE_DWE, "DOE": HARDWARE_DOE, "AWE": HARDWARE_AWE}
+
+
+def read_raw(path: str) -> list[int]:
+	"""The words of a Logisim v2.0 raw image, expanding run-length "N*value" words."""
+	with open(path) as f:
+		text = f.read()
+	if not text.startswith(RAW_HEADER):
+		raise ValueError(f"{path} is not a v2.0 raw image")
+	words = []
+	for token in RAW_TOKEN.findall(text, len(RAW_HEADER)):
+		if token.startswith("#"):
+			continue
+		count, _, word = token.rpartition("*")
+		words += [int(word, 16)] * (int(count) if count else 1)
+	return words
+
+
+def decode_microcode(word: int) -> list:
+	"""The sub-instructions of one definition word as (name, A flag, A/B selector, number), up to the first plain EIS."""
+	sis = []
+	for slot in range(SI_SLOTS):
+		field = (word >> (SI_BITS * (SI_SLOTS - 1 - slot))) & 0x1FF
+		a = "A" if field & 0x10 else None
+		ab = ("A" if field & 0x20 else "B") if a else None
+		sis.append((SI_NAMES[field >> 6], a, ab, field & 0xF or None))
+		if field == 0:
+			break
+	return sis
+
+
+def si_text(si) -> str:
+	name, a, ab, number = si
+	return " ".join(str(part) for part in (name, a, ab, number) if part is not None)
+
+
+def load_definition(path: str, names: tuple = OPCODES) -> Definition:
+	"""
+	A definition from a compiled .hex image. Its numbers stay those of the hardware, as they are only known once a line
+	supplies the argument its A and B fields select from.
+	"""
+	ld = {}
+	decoded = {}
+	for opcode, word in enumerate(read_raw(path)[:len(names)]):
+		name = names[opcode] or f"X{opcode:X}"
+		decoded[name] = decode_microcode(word) + [None]
+		ld[name] = [si_text(si) for si in decoded[name][:-1]] + [""]
+	definition = Definition.__new__(Definition)
+	definition.build(ld, decoded)
+	return definition
+
+
+def resolve(si, arg: int):
+	"""Puts the LEV32 number of the location si enables in place of its hardware number or its A or B field."""
+	name, a, ab, number = si
+	if a is not None and (name in HARDWARE_NUMBERS or name == "ALU"):
+		number = (arg >> 4) & 0xF if ab == "A" else arg & 0xF
+		if name == "ALU":
+			return name, None, None, number
+	if name not in HARDWARE_NUMBERS:
+		return si
+	number = HARDWARE_NUMBERS[name].get(number)
+	if number is None:
+		# A field without a placeholder fails with 0x3 like an invalid operand, AWE 0 with 0x1
+		return (name, None, None, 0) if name == "AWE" else (name, "A", ab, None)
+	return name, None, None, number
+
+
+def binary_line(opcode: int, arg: int, definition: Definition) -> Line:
+	"""A line of a compiled program, with the A and B fields of its sub-instructions resolved against its argument."""
+	name = list(definition.ld)[opcode]
+	line = Line.__new__(Line)
+	line.opcode = name
+	line.args = str(arg)
+	line.value = arg
+	# GPU takes the mode, render and clear bits of ABCD
+	line.values = [(arg >> 3) & 1, (arg >> 2) & 1, (arg >> 1) & 1]
+	line.arg_s = [str(value) for value in line.values]
+	line.place = None
+	line.places = [None] * 3
+	line.halt = name == definition.halt_opcode
+	line.ops = []
+	for si in definition.decoded[name]:
+		if si is None:
+			line.ops.append((Lev32Machine.si_skip, None))
+			continue
+		si = resolve(si, arg)
+		line.ops.append(bind(SI_HANDLERS.get(si[0], Lev32Machine.si_unknown), si, line))
+	return line
+
+
+def load_program(path: str, definition: Definition) -> Program:
+	"""A program from a compiled .axb image, its text being the disassembly of every line."""
+	text = []
+	lines = []
+	decoded = {}
+	for word in read_raw(path):
+		opcode, arg = word >> 32 & 0xF, word & 0xFFFFFFFF
+		line = decoded.get((opcode, arg))
+		if line is None:
+			line = decoded[opcode, arg] = binary_line(opcode, arg, definition)
+		lines.append(line)
+		text.append(f"{line.opcode} {arg}\n")
+	return Program(text, definition, lines=lines)
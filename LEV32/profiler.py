@@ -0,0 +1,106 @@
+from collections import Counter
+
+from machine import Lev32Machine, Program, Line, SI_REGEX
+from display import TextDisplay
+
+
+class Profile:
+	"""
+	Where a program spent its time: how often every line ran, the jumps between lines and the RAM and GRAM accesses.
+
+	Counts per opcode and per sub-instruction follow from the line counts and the definition, so counting costs
+	nothing beyond the lines themselves.
+	"""
+
+	def __init__(self, program: Program):
+		self.program = program
+		self.lines = [0] * len(program.lines)
+		# (from line, to line) -> count
+		self.jumps: Counter[tuple[int, int]] = Counter()
+		# (memory, "read" or "write") -> count
+		self.accesses: Counter[tuple[str, str]] = Counter()
+
+	def executed(self):
+		for index, count in enumerate(self.lines):
+			if count:
+				yield index, self.program.lines[index], count
+
+	def microcode(self, line: Line) -> list[str]:
+		return [text for text in self.program.definition.ld[line.opcode] if text]
+
+	def opcodes(self) -> Counter[str]:
+		counts = Counter()
+		for _, line, count in self.executed():
+			counts[line.opcode] += count
+		return counts
+
+	def sub_instructions(self) -> Counter[str]:
+		counts = Counter()
+		for _, line, count in self.executed():
+			for text in self.microcode(line):
+				counts[SI_REGEX.match(text).group(1)] += count
+		return counts
+
+	def report(self, top: int = 20) -> str:
+		total = sum(self.lines)
+		out = [f"{total} instructions"]
+
+		def table(title: str, counts: list[tuple[str, int]], whole: int = total):
+			out.append(f"\n{title}")
+			for name, count in counts:
+				out.append(f"{count:>12} {count / whole:>7.2%}  {name}")
+
+		text = self.program.text
+		hot = sorted(self.executed(), key=lambda item: item[2], reverse=True)[:top]
+		table("Lines", [(f"{index}: {text[index].strip()}", count) for index, _, count in hot])
+		table("Opcodes", self.opcodes().most_common())
+		sub_instructions = self.sub_instructions()
+		table("Sub-instructions", sub_instructions.most_common(), sum(sub_instructions.values()))
+		table("Jumps", [(f"{source} -> {target}", count) for (source, target), count in self.jumps.most_common(top)])
+		out.append("\nMemory accesses")
+		for (memory, kind), count in sorted(self.accesses.items()):
+			out.append(f"{count:>12}  {memory} {kind}s")
+		return "\n".join(out)
+
+	def folded(self) -> str:
+		"""The sub-instructions run as opcode;line;sub-instruction stacks, one per line of text, for flamegraph tools."""
+		out = []
+		for index, line, count in self.executed():
+			for text in self.microcode(line):
+				source = self.program.text[index].strip().replace(";", ",")
+				out.append(f"{line.opcode};{index}: {source};{text} {count}")
+		return "\n".join(out) + "\n"
+
+
+class ProfiledLev32Machine(Lev32Machine):
+	"""A machine that steps through its program, counting into profile as it goes."""
+	__slots__ = ("profile",)
+	compiled = False
+
+	def __init__(self, program: Program, display: TextDisplay = None):
+		super().__init__(program, display)
+		self.profile = Profile(program)
+
+	def step(self) -> bool:
+		following = self.line_counter + 1
+		try:
+			return super().step()
+		finally:
+			if self.line_counter != following:
+				self.profile.jumps[following, self.line_counter + 1] += 1
+
+	def execute(self, line: Line):
+		self.profile.lines[self.line_counter] += 1
+		super().execute(line)
+
+	def get_data(self, index: int) -> int:
+		if index == 10:
+			self.profile.accesses["RAM", "read"] += 1
+		return super().get_data(index)
+
+	def set_data(self, index: int, value: int):
+		if index == 10:
+			self.profile.accesses["RAM", "write"] += 1
+		elif index == 11:
+			self.profile.accesses["GRAM", "write"] += 1
+		super().set_data(index, value)
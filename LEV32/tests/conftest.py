@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+LEV32 = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, LEV32)
+
+from display import TextDisplay  # noqa: E402
+from machine import Definition, Program, Lev32Machine  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def definition() -> Definition:
+	return Definition.load(os.path.join(LEV32, "AssemblX-deffile.axs"))
+
+
+@pytest.fixture
+def assemble(definition):
+	"""Decodes a program from its lines of text."""
+	def assemble(*lines: str) -> Program:
+		return Program([line + "\n" for line in lines], definition)
+	return assemble
+
+
+@pytest.fixture
+def hello(definition) -> Program:
+	return Program.load(os.path.join(LEV32, "hello-world.ax"), definition)
+
+
+@pytest.fixture
+def machine():
+	"""A headless machine running a program."""
+	def machine(program: Program, kind: type = Lev32Machine) -> Lev32Machine:
+		return kind(program, TextDisplay())
+	return machine
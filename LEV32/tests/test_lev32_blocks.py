@@ -0,0 +1,54 @@
+import pytest
+
+from machine import BLOCK_THRESHOLD, Lev32Exception, Lev32Machine, compile_block
+
+# Adds one to $alua forever: line 4 runs the adder and line 5 jumps back to it
+LOOP = ("LD 0", "CD $a;$alua", "LD 1", "CD $a;$alub", "CD $aluoa;$alua", "JMP 4")
+
+
+class SteppedLev32Machine(Lev32Machine):
+	__slots__ = ()
+	compiled = False
+
+
+def test_lines_are_interpreted_until_entered_often_enough(assemble):
+	program = assemble(*LOOP)
+	for _ in range(BLOCK_THRESHOLD - 1):
+		block, size = program.block(4)
+		assert size == 1
+	assert program.blocks[4] is None
+	block, size = program.block(4)
+	assert program.blocks[4] == (block, size)
+	# The block ends on the jump
+	assert size == 2
+
+
+@pytest.mark.parametrize("limit", [1, 7, 100, 1001])
+def test_blocks_run_like_stepping(assemble, machine, limit):
+	program = assemble(*LOOP)
+	compiled, stepped = machine(program), machine(program, SteppedLev32Machine)
+	assert compiled.run(limit) == stepped.run(limit) == limit
+	assert compiled.dump() == stepped.dump()
+	assert (compiled.line_counter, compiled.alu_stale) == (stepped.line_counter, stepped.alu_stale)
+
+
+def test_a_block_that_raises_counts_and_stops_like_stepping(assemble, machine):
+	# Rendering the graphics GRAM is not supported
+	program = assemble("LD 1", "LD 2", "GPU 0;1;0", "LD 3")
+	block, size = compile_block(program.lines, 0)
+	assert size == 4
+	compiled, stepped = machine(program), machine(program, SteppedLev32Machine)
+	with pytest.raises(Lev32Exception, match="0x7"):
+		block(compiled)
+	with pytest.raises(Lev32Exception, match="0x7"):
+		stepped.run()
+	assert (compiled.executed, compiled.line_counter) == (stepped.executed, stepped.line_counter) == (3, 2)
+
+
+def test_a_halting_block_returns_true(assemble, machine, definition):
+	program = assemble("LD 5", definition.halt_opcode)
+	block, _ = compile_block(program.lines, 0)
+	m = machine(program)
+	assert block(m)
+	assert m.halted
+	assert m.registers[1] == 5
@@ -0,0 +1,47 @@
+import pytest
+
+from machine import Program, Lev32Exception, parse_arg_input, try_parse
+
+
+@pytest.mark.parametrize("text, value", [("42", 42), ("b101", 5), ("x1f", 31), ("o17", 15), ("&A", 65)])
+def test_operands_in_every_base(text, value):
+	assert parse_arg_input(text) == value
+	assert try_parse(text) == value
+
+
+@pytest.mark.parametrize("text", ["$a", "1;2", "$a;$b", "zz", ""])
+def test_operands_that_do_not_parse_are_left_for_later(text):
+	assert try_parse(text) is None
+
+
+def test_lines_are_decoded_once(assemble):
+	program = assemble("LD 7", "CD $a;$alub", "", "LD 7")
+	load, copy, blank, again = program.lines
+	assert (load.opcode, load.value) == ("LD", 7)
+	assert copy.arg_s == ["$a", "$alub"]
+	assert copy.places == [1, 6]
+	assert blank is None
+	# Identical lines share their decoded form
+	assert again is load
+
+
+def test_a_character_operand_may_be_a_semicolon(assemble):
+	line = assemble("LD &;").lines[0]
+	assert line.value == ord(";")
+
+
+def test_a_definition_needs_sixteen_opcodes(definition):
+	with pytest.raises(Lev32Exception) as info:
+		Program(["NOP\n"], type(definition)("// NOP\nEIS\n"))
+	assert info.value.code == "0x1"
+
+
+def test_decoded_programs_run_like_the_interpreter_stepped(hello, machine):
+	stepped = machine(hello)
+	while stepped.step():
+		pass
+	compiled = machine(hello)
+	compiled.run()
+	assert compiled.executed == stepped.executed
+	assert compiled.dump() == stepped.dump()
+	assert compiled.gram[1].frames == stepped.gram[1].frames == ["Hello World!\n"]
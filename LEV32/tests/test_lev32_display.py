@@ -0,0 +1,64 @@
+import io
+
+from display import TextDisplay, CLEAR
+
+
+class Stream(io.StringIO):
+	def __init__(self):
+		super().__init__()
+		self.writes = 0
+
+	def write(self, text: str) -> int:
+		self.writes += 1
+		return super().write(text)
+
+
+def test_a_frame_is_written_in_one_write():
+	stream = Stream()
+	display = TextDisplay(stream)
+	for address, character in enumerate("Hi there"):
+		display[address] = ord(character)
+	display.render()
+	assert stream.getvalue() == "Hi there"
+	assert stream.writes == 1
+
+
+def test_empty_cells_are_skipped_in_address_order():
+	display = TextDisplay()
+	display[0x2000] = ord("c")
+	display[5] = ord("b")
+	display[1] = ord("a")
+	assert display.text() == "abc"
+
+
+def test_the_frame_is_only_rebuilt_after_a_change():
+	display = TextDisplay()
+	display[0] = ord("a")
+	frame = display.text()
+	display[0] = ord("a")
+	assert display.text() is frame
+	display[0] = ord("b")
+	assert display.text() == "b"
+
+
+def test_characters_that_are_no_code_points_fall_back_to_chr():
+	display = TextDisplay()
+	display[0] = ord("x")
+	display[1] = 0xD800
+	assert display.text() == "x\ud800"
+
+
+def test_headless_displays_keep_their_frames():
+	display = TextDisplay()
+	display[0] = ord("1")
+	display.render()
+	display[0] = ord("2")
+	display.render()
+	display.clear()
+	assert display.frames == ["1", "2"]
+
+
+def test_clear_wipes_the_screen():
+	stream = Stream()
+	TextDisplay(stream).clear()
+	assert stream.getvalue() == CLEAR
@@ -0,0 +1,29 @@
+import pytest
+
+from machine import Lev32Exception, Lev32Machine, TracedLev32Machine
+
+
+def test_the_last_opcode_halts(assemble, machine, definition):
+	assert definition.halt_opcode == list(definition.ld)[-1]
+	m = machine(assemble("LD 1", definition.halt_opcode, "LD 2"))
+	assert m.run() == 2
+	assert m.halted
+	assert not m.step()
+	# LD loads into $a
+	assert m.registers[1] == 1
+
+
+@pytest.mark.parametrize("kind", [Lev32Machine, TracedLev32Machine])
+def test_an_unknown_opcode_is_a_key_error(assemble, machine, kind, capsys):
+	m = machine(assemble("LD 1", "FOO 2"), kind)
+	with pytest.raises(KeyError, match="FOO"):
+		m.run()
+	assert m.line_counter == 1
+
+
+def test_running_off_the_end_exits_with_0xe(assemble, machine):
+	m = machine(assemble("LD 1"))
+	with pytest.raises(Lev32Exception) as info:
+		m.run()
+	assert info.value.code == "0xE"
+	assert m.executed == 1
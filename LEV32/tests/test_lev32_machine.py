@@ -0,0 +1,52 @@
+import pytest
+
+from display import TextDisplay
+from machine import Lev32Exception, Lev32Machine
+
+
+def test_machines_on_one_program_are_independent(hello, machine):
+	first, second = machine(hello), machine(hello)
+	first.run()
+	assert first.halted and not second.halted
+	assert second.executed == 0
+	assert second.gram[1].frames == []
+	second.run()
+	assert second.gram[1].frames == first.gram[1].frames
+
+
+def test_a_run_stops_after_max_instructions_even_inside_a_block(hello, machine):
+	whole = machine(hello)
+	total = whole.run()
+	for limit in (1, 5, total // 2, total - 1):
+		partial = machine(hello)
+		# The first run compiles the blocks, so later ones stop inside them
+		assert partial.run(limit) == limit
+		assert partial.executed == limit
+		assert not partial.halted
+		assert partial.run() == total - limit
+		assert partial.dump() == whole.dump()
+
+
+def test_run_until_stops_on_the_predicate(hello, machine):
+	m = machine(hello)
+	count = m.run_until(lambda machine: machine.registers[1] == ord("l"))
+	assert m.registers[1] == ord("l")
+	assert m.executed == count
+
+
+def test_exit_codes_are_raised_not_exited(assemble, machine):
+	m = machine(assemble("XYZ 1"))
+	with pytest.raises(KeyError):
+		m.run()
+	m = machine(assemble("GPU 1;2"))
+	with pytest.raises(Lev32Exception) as info:
+		m.run()
+	assert info.value.code == "0x6"
+
+
+def test_the_display_is_the_text_gram(hello):
+	display = TextDisplay()
+	m = Lev32Machine(hello, display)
+	m.run()
+	assert m.gram[1] is display
+	assert display.frames == ["Hello World!\n"]
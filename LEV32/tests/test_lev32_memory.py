@@ -0,0 +1,45 @@
+from memory import PagedWords, register_file, REGISTERS, PAGE_BITS, WORD_MASK
+
+
+def test_the_register_file_is_a_list_of_words():
+	registers = register_file()
+	assert registers == [0] * REGISTERS
+	assert isinstance(registers, list)
+
+
+def test_register_writes_wrap_to_32_bits(assemble, machine):
+	m = machine(assemble("LD 0"))
+	m.set_data(1, -1)
+	assert m.registers[1] == WORD_MASK
+	m.set_data(10, 1 << 32 | 5)
+	assert m.ram[0] == 5
+
+
+def test_pages_are_allocated_on_the_first_write():
+	memory = PagedWords()
+	assert memory[0xFFFFFF] == 0
+	assert memory.pages == {}
+	memory[0xFFFFFF] = 7
+	assert list(memory.pages) == [0xFFFFFF >> PAGE_BITS]
+	assert list(memory.items()) == [(0xFFFFFF, 7)]
+
+
+def test_copies_share_pages_until_written():
+	memory = PagedWords()
+	memory[1] = 1
+	copy = memory.copy()
+	assert copy.pages[0] is memory.pages[0]
+	copy[1] = 2
+	memory[2] = 3
+	assert dict(memory.items()) == {1: 1, 2: 3}
+	assert dict(copy.items()) == {1: 2}
+
+
+def test_the_binary_form_round_trips():
+	memory = PagedWords()
+	memory[3] = 0xDEADBEEF
+	memory[0x123456] = 1
+	data = memory.to_bytes() + b"rest"
+	copy = PagedWords()
+	assert copy.read(memoryview(data)) == len(data) - 4
+	assert copy == memory
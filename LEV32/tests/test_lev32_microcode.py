@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+from machine import Lev32Machine
+from microcode import OPCODES, decode_microcode, load_definition, load_program, read_raw
+
+ASSEMBLX = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "AssemblX")
+DEFINITION = os.path.join(ASSEMBLX, "AssemblX-definition.hex")
+EXAMPLE = os.path.join(ASSEMBLX, "example.axb")
+
+needs_images = pytest.mark.skipif(not os.path.exists(DEFINITION), reason="the AssemblX images are not there")
+
+
+class SteppedLev32Machine(Lev32Machine):
+	__slots__ = ()
+	compiled = False
+
+
+def test_raw_images_expand_runs(tmp_path):
+	path = tmp_path / "words.hex"
+	path.write_text("v2.0 raw\n# comment 5\n1 2*f\n")
+	assert read_raw(str(path)) == [1, 0xF, 0xF]
+	path.write_text("1 2")
+	with pytest.raises(ValueError):
+		read_raw(str(path))
+
+
+def test_a_word_holds_up_to_seven_sub_instructions():
+	# DOE with its A field, DWE 2, then a plain EIS that ends the opcode
+	word = (0b010 << 6 | 0x30) << 54 | (0b001 << 6 | 2) << 45
+	assert decode_microcode(word) == [("DOE", "A", "A", None), ("DWE", None, None, 2), ("EIS", None, None, None)]
+
+
+@needs_images
+def test_the_compiled_definition_has_every_opcode():
+	definition = load_definition(DEFINITION)
+	assert len(definition.ld) == len(OPCODES)
+	assert definition.halt_opcode == "HLT"
+
+
+@needs_images
+@pytest.mark.parametrize("kind", [Lev32Machine, SteppedLev32Machine])
+def test_the_example_runs_on_the_compiled_definition(machine, kind):
+	m = machine(load_program(EXAMPLE, load_definition(DEFINITION)), kind)
+	assert m.run() == 8
+	assert m.halted
+	# LD xaf, then CD copies $a into $d, whose hardware number is 5
+	assert m.registers[4] == 0xAF
+	# LD b0110, SMA 1, then CD copies $a into RAM
+	assert m.ram[1] == 6
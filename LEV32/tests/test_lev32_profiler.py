@@ -0,0 +1,40 @@
+from profiler import ProfiledLev32Machine
+
+
+def test_line_counts_add_up_to_the_instructions_run(hello, machine):
+	m = machine(hello, ProfiledLev32Machine)
+	count = m.run()
+	profile = m.profile
+	assert sum(profile.lines) == count == machine(hello).run()
+	assert sum(profile.opcodes().values()) == count
+	assert profile.opcodes()["LD"] == sum(1 for line in hello.lines if line is not None and line.opcode == "LD")
+
+
+def test_sub_instructions_follow_from_the_definition(hello, machine, definition):
+	m = machine(hello, ProfiledLev32Machine)
+	m.run()
+	expected = sum(
+		len([text for text in definition.ld[opcode] if text]) * count for opcode, count in m.profile.opcodes().items()
+	)
+	assert sum(m.profile.sub_instructions().values()) == expected
+
+
+def test_jumps_and_memory_accesses(assemble, machine):
+	# Line 3 jumps back to line 2 until the run stops
+	m = machine(assemble("LD 1", "CD $a;$gram", "CD $a;$ram", "JMP 2"), ProfiledLev32Machine)
+	m.run(9)
+	profile = m.profile
+	assert profile.jumps == {(3, 2): 3}
+	assert profile.accesses == {("GRAM", "write"): 1, ("RAM", "write"): 4}
+
+
+def test_report_and_folded_stacks(hello, machine):
+	m = machine(hello, ProfiledLev32Machine)
+	m.run()
+	report = m.profile.report(top=3)
+	assert report.startswith(f"{m.executed} instructions")
+	for title in ("Lines", "Opcodes", "Sub-instructions", "Jumps", "Memory accesses"):
+		assert f"\n{title}" in report
+	stacks = m.profile.folded().splitlines()
+	assert all(stack.count(";") == 2 for stack in stacks)
+	assert sum(int(stack.rsplit(" ", 1)[1]) for stack in stacks) == sum(m.profile.sub_instructions().values())
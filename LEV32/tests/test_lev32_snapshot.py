@@ -0,0 +1,39 @@
+import pytest
+
+from machine import SNAPSHOT_FIELDS
+
+
+def state(m) -> list:
+	return [getattr(m, name) for name in SNAPSHOT_FIELDS] + [m.dump(), m.gram[1].frames]
+
+
+def test_a_restored_machine_runs_on_as_before(hello, machine):
+	m = machine(hello)
+	m.run(20)
+	snapshot = m.snapshot()
+	m.run()
+	expected = state(m)
+	restored = machine(hello)
+	restored.restore(snapshot)
+	restored.run()
+	assert state(restored) == expected
+
+
+def test_a_snapshot_fits_only_its_program(hello, assemble, machine):
+	m = machine(hello)
+	m.run(10)
+	with pytest.raises(ValueError):
+		machine(assemble("LD 1")).restore(m.snapshot())
+	with pytest.raises(ValueError):
+		machine(hello).restore(b"LEV32X" + m.snapshot()[6:])
+
+
+def test_forks_share_nothing_they_write(hello, machine):
+	m = machine(hello)
+	m.run(20)
+	fork = m.fork()
+	fork.run()
+	assert not m.halted
+	assert m.gram[1].frames == []
+	m.run()
+	assert state(m) == state(fork)
@@ -0,0 +1,379 @@
+"""
+Benchmarks for pylogic and LEV32, stored as JSON so that two versions can be compared.
+
+	python benchmarks/bench.py [-k pattern] [-o results.json] [-c baseline.json] [-t threshold]
+
+Every benchmark repeats one operation: an event on a bus of a pylogic component, a State conversion, a clock cycle of
+the Virus32 model, event-driven or compiled, or a LEV32 instruction. It reports the best time per operation out of
+several runs, which is the least disturbed by the rest of the system. With -c every result is compared to the
+baseline file and the run fails when one got slower by more than the threshold.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+from typing import Callable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.append(os.path.join(ROOT, "LEV32"))
+
+from pylogic.base_components import Bus  # noqa: E402
+from pylogic.classes import State  # noqa: E402
+from pylogic.components.arithmatic import ALU  # noqa: E402
+from pylogic.components.gates import And, Or, Xor, Not  # noqa: E402
+from pylogic.components.memory import Register, Counter, RAM  # noqa: E402
+from pylogic.components.plexers import Multiplexer  # noqa: E402
+from pylogic.components.wiring import Splitter  # noqa: E402
+from pylogic.enums import Edge  # noqa: E402
+
+RESULTS_VERSION = 1
+REPEAT = 5
+MIN_TIME = 0.05
+GATE_WIDTHS = (1, 8, 16, 32)
+GATE_INPUTS = (2, 4, 8)
+DEPTHS = (1, 8, 64)
+VIRUS32_START = "/Button(320, 310)"
+VIRUS32_COUNTER = "/Counter(410, 2090)"
+VIRUS32_WARMUP = 20
+VIRUS32_COMPILED_CYCLES = 100
+
+# name -> setup returning a step function and the number of operations one step performs
+BENCHMARKS: dict[str, Callable[[], tuple[Callable[[], None], int]]] = {}
+
+
+def benchmark(name: str):
+	def register(setup):
+		BENCHMARKS[name] = setup
+		return setup
+	return register
+
+
+def ones(width: int) -> State:
+	return State.from_planes(width, (1 << width) - 1)
+
+
+def zeros(width: int) -> State:
+	return State.from_planes(width, 0)
+
+
+def toggle(bus: Bus, first: State, second: State) -> tuple[Callable[[], None], int]:
+	"""A step that drives bus to first and then to second, two events."""
+	def step():
+		bus.set_state(first)
+		bus.set_state(second)
+	return step, 2
+
+
+def wire(port, state: State = None) -> Bus:
+	bus = Bus(port.width)
+	port.set_b(bus)
+	if state is not None:
+		bus.set_state(state)
+	return bus
+
+
+# Components
+
+
+def gate_setup(kind: type, width: int, inputs: int):
+	def setup():
+		gate = kind(width)
+		buses = [wire(gate.add_input(), ones(width)) for _ in range(inputs)]
+		wire(gate.O)
+		# Every event on the first input changes the output of all three kinds of gate
+		return toggle(buses[0], zeros(width), ones(width))
+	return setup
+
+
+for _kind in (And, Or, Xor):
+	for _width in GATE_WIDTHS:
+		for _inputs in GATE_INPUTS:
+			benchmark(f"gate/{_kind.__name__}/w{_width}/n{_inputs}")(gate_setup(_kind, _width, _inputs))
+
+
+@benchmark("component/Multiplexer")
+def multiplexer():
+	mux = Multiplexer(32, 3)
+	for i, port in enumerate(mux.inputs):
+		wire(port, State.from_planes(32, i))
+	selector = wire(mux.S, zeros(3))
+	wire(mux.O)
+	return toggle(selector, State.from_planes(3, 5), zeros(3))
+
+
+@benchmark("component/Splitter")
+def splitter():
+	split = Splitter(32)
+	source = wire(split.add_input(list(range(32))))
+	for start in range(0, 32, 8):
+		wire(split.add_output(list(range(start, start + 8))))
+	return toggle(source, State.from_planes(32, 0x12345678), State.from_planes(32, 0x87654321))
+
+
+@benchmark("component/Register")
+def register():
+	reg = Register(32, Edge.RISING)
+	data = wire(reg.D)
+	wire(reg.WE, ones(1))
+	wire(reg.OE, ones(1))
+	clock = wire(reg.C, zeros(1))
+	wire(reg.Q)
+	values = [State.from_planes(32, 0x12345678), State.from_planes(32, 0x87654321)]
+
+	def step():
+		for value in values:
+			data.set_state(value)
+			clock.set_state(ones(1))
+			clock.set_state(zeros(1))
+	return step, 6
+
+
+@benchmark("component/Counter")
+def counter():
+	count = Counter(32)
+	wire(count.CE, ones(1))
+	wire(count.DS, ones(1))
+	clock = wire(count.C, zeros(1))
+	wire(count.O)
+	return toggle(clock, ones(1), zeros(1))
+
+
+@benchmark("component/RAM")
+def ram():
+	memory = RAM(16, 32)
+	address = wire(memory.A, zeros(16))
+	data = wire(memory.IN)
+	wire(memory.WE, ones(1))
+	wire(memory.OE, ones(1))
+	clock = wire(memory.C, zeros(1))
+	wire(memory.OUT)
+	addresses = [State.from_planes(16, i * 0x101) for i in range(64)]
+	words = [State.from_planes(32, i * 0x1010101) for i in range(64)]
+
+	def step():
+		for a, word in zip(addresses, words):
+			address.set_state(a)
+			data.set_state(word)
+			clock.set_state(ones(1))
+			clock.set_state(zeros(1))
+	return step, 4 * len(addresses)
+
+
+@benchmark("component/ALU")
+def alu():
+	unit = ALU(32)
+	a = wire(unit.IA)
+	wire(unit.IB, State.from_planes(32, 0x9ABCDEF0))
+	wire(unit.IC, zeros(32))
+	wire(unit.M, zeros(1))
+	wire(unit.OA)
+	wire(unit.OB)
+	return toggle(a, State.from_planes(32, 0x12345678), State.from_planes(32, 0x76543210))
+
+
+def depth_setup(depth: int):
+	def setup():
+		source = Bus(1)
+		bus = source
+		for _ in range(depth):
+			gate = Not(1)
+			gate.I.set_b(bus)
+			bus = wire(gate.O)
+		return toggle(source, ones(1), zeros(1))
+	return setup
+
+
+for _depth in DEPTHS:
+	benchmark(f"propagation/depth{_depth}")(depth_setup(_depth))
+
+
+# State
+
+
+@benchmark("state/from_int")
+def state_from_int():
+	state = State(32)
+	values = list(range(-500, 500, 7))
+
+	def step():
+		for value in values:
+			state.from_int(value)
+	return step, len(values)
+
+
+@benchmark("state/__int__")
+def state_int():
+	states = [State.from_planes(32, value * 0x10001) for value in range(128)]
+
+	def step():
+		for state in states:
+			int(state)
+	return step, len(states)
+
+
+@benchmark("state/__neg__")
+def state_neg():
+	states = [State.from_planes(32, value * 0x10001) for value in range(128)]
+
+	def step():
+		for state in states:
+			-state
+	return step, len(states)
+
+
+# Whole machines
+
+
+def virus32_circuit():
+	"""The Virus32 model, started and warmed up, with its instruction counter."""
+	from pylogic import logisim
+
+	circuit = logisim.import_circ(os.path.join(ROOT, "Circuit.circ"))
+	# The clock only reaches the CPU once Start is pressed
+	start = circuit.pins[VIRUS32_START]
+	start.set_state(ones(1))
+	start.set_state(zeros(1))
+	ports = next(ports for _, where, _, ports in circuit.netlist.components if where == VIRUS32_COUNTER)
+	counter = circuit.buses[ports["O"]]
+	step, _ = toggle(circuit.clock, ones(1), zeros(1))
+	before = counter.state
+	for _ in range(VIRUS32_WARMUP):
+		step()
+	# A model that does not run would be timed idling, so it fails the benchmark instead
+	if counter.state == before:
+		raise RuntimeError(f"The Virus32 model does not run, its instruction counter stayed at {before}")
+	return circuit, counter
+
+
+@benchmark("virus32/cycle")
+def virus32():
+	circuit, _ = virus32_circuit()
+	step, _ = toggle(circuit.clock, ones(1), zeros(1))
+	return step, 1
+
+
+@benchmark("virus32/compiled")
+def virus32_compiled():
+	from pylogic.compiler import compile_circuit
+
+	circuit, _ = virus32_circuit()
+	compiled = compile_circuit(circuit.components, circuit.clock)
+
+	# Every call to run copies the state in and out, so one step runs many cycles
+	def step():
+		compiled.run(VIRUS32_COMPILED_CYCLES)
+	return step, VIRUS32_COMPILED_CYCLES
+
+
+@benchmark("lev32/hello-world")
+def lev32():
+	from display import TextDisplay
+	from machine import Definition, Program, Lev32Machine
+
+	with open(os.path.join(ROOT, "LEV32", "AssemblX-deffile.axs")) as f:
+		definition = Definition(f.read())
+	with open(os.path.join(ROOT, "LEV32", "hello-world.ax")) as f:
+		program = Program(f.readlines(), definition)
+	count = Lev32Machine(program, TextDisplay()).run()
+
+	def step():
+		Lev32Machine(program, TextDisplay()).run()
+	return step, count
+
+
+def measure(step: Callable[[], None], operations: int, min_time: float = MIN_TIME) -> dict:
+	"""Times step, called often enough to take at least min_time a run, and returns the best of REPEAT runs."""
+	calls = 1
+	while True:
+		started = time.perf_counter()
+		for _ in range(calls):
+			step()
+		elapsed = time.perf_counter() - started
+		if elapsed >= min_time:
+			break
+		calls *= 2 if elapsed <= 0 else max(2, min(100, int(min_time / elapsed * 1.2)))
+	best = elapsed
+	for _ in range(REPEAT - 1):
+		started = time.perf_counter()
+		for _ in range(calls):
+			step()
+		best = min(best, time.perf_counter() - started)
+	seconds = best / (calls * operations)
+	return {"ns_per_op": seconds * 1e9, "ops_per_s": 1 / seconds, "operations": calls * operations}
+
+
+def commit() -> str | None:
+	try:
+		return subprocess.run(
+			["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+		).stdout.strip()
+	except (OSError, subprocess.CalledProcessError):
+		return None
+
+
+def run(pattern: str = "", min_time: float = MIN_TIME) -> dict:
+	matcher = re.compile(pattern)
+	results = {}
+	for name, setup in BENCHMARKS.items():
+		if not matcher.search(name):
+			continue
+		step, operations = setup()
+		results[name] = measure(step, operations, min_time)
+		print(f"{name:<32} {results[name]['ns_per_op']:>12.1f} ns {results[name]['ops_per_s']:>14,.0f}/s", file=sys.stderr)
+	return {
+		"version": RESULTS_VERSION,
+		"commit": commit(),
+		"date": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+		"python": platform.python_version(),
+		"machine": platform.machine(),
+		"results": results,
+	}
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+	"""Prints the change of every benchmark both have and returns those that got slower by more than threshold."""
+	regressions = []
+	for name, result in current["results"].items():
+		before = baseline["results"].get(name)
+		if before is None:
+			continue
+		ratio = result["ns_per_op"] / before["ns_per_op"]
+		slower = ratio > 1 + threshold
+		if slower:
+			regressions.append(name)
+		print(f"{name:<32} {before['ns_per_op']:>12.1f} {result['ns_per_op']:>12.1f} ns {ratio:>7.2f}x{'  slower' if slower else ''}")
+	return regressions
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmarks pylogic and LEV32")
+	parser.add_argument("-k", "--pattern", default="", help="only run benchmarks whose name matches this regex")
+	parser.add_argument("-o", "--output", help="write the results to this JSON file")
+	parser.add_argument("-c", "--compare", help="compare the results to those in this JSON file")
+	parser.add_argument("-t", "--threshold", type=float, default=0.1, help="slowdown counted as a regression")
+	parser.add_argument("--min-time", type=float, default=MIN_TIME, help="seconds every timed run takes at least")
+	args = parser.parse_args()
+
+	results = run(args.pattern, args.min_time)
+	if args.output:
+		with open(args.output, "w") as f:
+			json.dump(results, f, indent="\t")
+	if args.compare:
+		with open(args.compare) as f:
+			baseline = json.load(f)
+		if baseline.get("version") != RESULTS_VERSION:
+			raise ValueError(f"{args.compare} holds results of another format")
+		regressions = compare(baseline, results, args.threshold)
+		if regressions:
+			print(f"{len(regressions)} benchmarks got slower: {', '.join(regressions)}")
+			sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
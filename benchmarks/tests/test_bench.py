@@ -0,0 +1,51 @@
+import pytest
+
+import bench
+
+
+@pytest.mark.parametrize("name", list(bench.BENCHMARKS))
+def test_every_benchmark_sets_up_and_steps(name):
+	step, operations = bench.BENCHMARKS[name]()
+	assert operations > 0
+	step()
+
+
+def test_measure_times_enough_calls_and_keeps_the_best():
+	calls = []
+
+	def step():
+		calls.append(None)
+	result = bench.measure(step, 3, min_time=0.001)
+	# At least one call per run, and the calibrating run is one of the REPEAT
+	assert len(calls) >= bench.REPEAT
+	assert result["operations"] % 3 == 0
+	assert result["ns_per_op"] > 0
+	assert result["ops_per_s"] == pytest.approx(1e9 / result["ns_per_op"])
+
+
+def results(**times: float) -> dict:
+	return {"version": bench.RESULTS_VERSION, "results": {name: {"ns_per_op": ns} for name, ns in times.items()}}
+
+
+def test_compare_returns_the_benchmarks_slower_than_the_threshold(capsys):
+	baseline = results(a=100.0, b=100.0, c=100.0)
+	current = results(a=105.0, b=125.0, c=50.0, new=1.0)
+	assert bench.compare(baseline, current, 0.1) == ["b"]
+	assert bench.compare(baseline, current, 0.01) == ["a", "b"]
+	out = capsys.readouterr().out
+	assert "slower" in out
+	# A benchmark the baseline does not have is not compared
+	assert "new" not in out
+
+
+def test_run_selects_benchmarks_by_pattern():
+	results = bench.run("^state/", min_time=0.001)
+	assert results["version"] == bench.RESULTS_VERSION
+	assert set(results["results"]) == {"state/from_int", "state/__int__", "state/__neg__"}
+	assert all({"ns_per_op", "ops_per_s", "operations"} <= result.keys() for result in results["results"].values())
+
+
+def test_the_virus32_model_runs_once_warmed_up():
+	circuit, counter = bench.virus32_circuit()
+	assert not counter.state.unknown
+	assert counter.state.value > 0
@@ -3,5 +3,4 @@
 """
 
 from .enums import BitState, Edge
-
-
+from .simulator import Simulator, get_simulator, set_simulator
@@ -4,6 +4,7 @@ from typing import Callable, Any
 from .classes import State
 from .enums import BitState, Edge
 from .errors import WidthMismatchException
+from .simulator import get_simulator
 
 
 class Bus:
@@ -13,15 +14,70 @@ class Bus:
 		self.width = width
 		self.state = State(width)
 		self.callbacks = []
+		# Only drivers that currently drive at least one bit are kept, so a tri-state bus
+		# with many disabled drivers resolves over the one or two that are active.
+		self.drivers: dict[Any, State] = {}
+		self.pull = BitState.FLOATING
 
 	def add_callback(self, callback: Callable[[State], None]):
 		self.callbacks.append(callback)
 
-	def set_state(self, state: State):
-		if self.state != State(self.state.width):
-			self.state.set_all(BitState.ERROR)
+	def set_pull(self, pull: BitState):
+		self.pull = pull
+		self.update(self.resolve())
+
+	def drive(self, driver: Any, state: State) -> bool:
+		if state.floating == state.mask:
+			if self.drivers.pop(driver, None) is None:
+				return False
+		elif self.drivers.get(driver) == state:
+			return False
+		else:
+			self.drivers[driver] = state
+		return self.update(self.resolve())
+
+	def resolve(self) -> State:
+		if not self.drivers:
+			state = State(self.width)
+		elif len(self.drivers) == 1:
+			state = next(iter(self.drivers.values()))
+		else:
+			low = 0
+			high = 0
+			error = 0
+			for s in self.drivers.values():
+				low |= ~(s.value | s.unknown)
+				high |= s.value & ~s.unknown
+				error |= s.value & s.unknown
+			error |= low & high
+			state = State.from_planes(self.width, high | error, error | ~(low | high))
+		if self.pull != BitState.FLOATING and state.floating:
+			floating = state.floating
+			if self.pull == BitState.HIGH:
+				state = State.from_planes(self.width, state.value | floating, state.unknown & ~floating)
+			elif self.pull == BitState.LOW:
+				state = State.from_planes(self.width, state.value, state.unknown & ~floating)
+			else:
+				state = State.from_planes(self.width, state.value | floating, state.unknown)
+		return state
+
+	def update(self, state: State) -> bool:
+		if state == self.state:
+			return False
+		self.state = state
+		simulator = get_simulator()
+		if simulator.settling:
+			for callback in self.callbacks:
+				callback(state)
 		else:
-			self.state = state
+			# A direct poke must reach every reader before the circuit settles
+			with simulator.batch():
+				for callback in self.callbacks:
+					callback(state)
+		return True
+
+	def set_state(self, state: State) -> bool:
+		return self.drive(None, state)
 
 
 class Port(ABC):
@@ -36,6 +92,7 @@ class InputPort(Port):
 	def __init__(self, width: int):
 		super().__init__(width)
 		self.callback = None
+		self.bus = None
 
 	def set_callback(self, callback: Callable[[State, Port], None]):
 		self.callback = callback
@@ -43,20 +100,24 @@ class InputPort(Port):
 	def set_state(self, state: State):
 		self.state = state
 		if self.callback is not None:
-			self.callback(self.state, self)
+			get_simulator().mark(self.callback, state, self)
 
 	def set_b(self, bus: Bus):
 		if bus.width != self.width:
 			raise WidthMismatchException(bus, self)
+		self.bus = bus
 		bus.add_callback(self.set_state)
+		if bus.state != self.state:
+			self.set_state(bus.state)
 
 	def get_b(self):
-		b = Bus(self.width)
-		b.add_callback(self.set_state)
-		return
+		if self.bus is None:
+			self.bus = Bus(self.width)
+			self.bus.add_callback(self.set_state)
+		return self.bus
 
 	def __bool__(self):
-		return bool(self.state.get(0))
+		return self.state.get(0) == BitState.HIGH
 
 	@property
 	def nonzero(self):
@@ -77,10 +138,12 @@ class OutputPort(Port):
 			s.set_all(state)
 		else:
 			s = state
-		self.bus.set_state(s)
+		self.state = s
+		if self.bus is not None:
+			get_simulator().post(self, s)
 
 	def set_b(self, bus: Bus):
-		if bus.width > 0:
+		if bus.width != self.width:
 			raise WidthMismatchException(bus, self)
 		self.bus = bus
 
@@ -94,21 +157,19 @@ class TriggerPort(InputPort):
 	def __init__(self, edge: Edge):
 		super().__init__(1)
 		self.edge = edge
-		self.trigger_cb = None
-		self.state = State(1)
-		self.triggered = False
-		super().set_callback(self.on_trigger)
+		self.edge_delta = -1
 
 	def set_edge(self, edge: Edge):
 		self.edge = edge
 
-	def on_trigger(self, state: State):
-		self.triggered = not self.is_ranged
-		if (self.edge == Edge.RISING or self.edge == Edge.HIGH) and state.get(0) == BitState.HIGH:
-			self.trigger_cb()
-		elif (self.edge == Edge.FALLING or self.edge == Edge.LOW) and state.get(0) == BitState.LOW:
-			self.trigger_cb()
-		self.triggered = False
+	def set_state(self, state: State):
+		previous = self.state.get(0)
+		current = state.get(0)
+		if self.edge == Edge.RISING and previous == BitState.LOW and current == BitState.HIGH:
+			self.edge_delta = get_simulator().delta
+		elif self.edge == Edge.FALLING and previous == BitState.HIGH and current == BitState.LOW:
+			self.edge_delta = get_simulator().delta
+		super().set_state(state)
 
 	@property
 	def is_ranged(self):
@@ -116,18 +177,12 @@ class TriggerPort(InputPort):
 
 	@property
 	def is_active(self):
-		if self.edge == Edge.HIGH and self.state.get(0) == BitState.HIGH:
-			return True
-		elif self.edge == Edge.LOW and self.state.get(0) == BitState.LOW:
-			return True
+		if self.edge == Edge.HIGH:
+			return self.state.get(0) == BitState.HIGH
+		elif self.edge == Edge.LOW:
+			return self.state.get(0) == BitState.LOW
 		else:
-			return self.triggered
-
-	def set_callback(self, callback: Callable[[Any], None]):
-		self.trigger_cb = callback
+			return self.edge_delta == get_simulator().delta
 
 	def get_state(self):
 		return self.state
-
-	def __bool__(self):
-		return bool(self.state.get(0))
@@ -0,0 +1,486 @@
+from typing import Any, Callable
+
+from .base_components import Bus
+from .classes import State, PagedMemory
+from .enums import BitState, OverflowSetting
+from .errors import UnsupportedComponentException
+from .compiler import CompiledCircuit, Node, EMITTERS, state_of, set_state_of, flip_flop_inputs
+from .components.gates import ControlledBuffer
+from .components.plexers import Multiplexer, Demultiplexer, BitSelector
+from .components.arithmatic import ALU
+from .components.memory import DFlipFlop, TFlipFlop, JKFlipFlop, SRFlipFlop, Register, Counter, ShiftRegister, RAM, ROM
+
+
+class LaneMemory:
+	"""The contents of one RAM or ROM in every lane. Lanes read through to the component until they write or reset."""
+
+	def __init__(self, circuit: "BatchedCircuit", memory: RAM | ROM):
+		self.circuit = circuit
+		self.memory = memory
+		self.written: list[dict[int, State]] = [{} for _ in range(circuit.lanes)]
+		self.cleared = [False] * circuit.lanes
+
+	def get(self, lane: int, address: int) -> State:
+		state = self.written[lane].get(address)
+		if state is not None:
+			return state
+		if self.cleared[lane]:
+			return State(self.memory.data_width, starter=BitState.LOW)
+		return self.memory.read(State.from_planes(self.memory.addr_width, address))
+
+	def read(self, av: int, au: int) -> tuple[int, int]:
+		values = []
+		unknowns = []
+		for lane, (address, unknown) in enumerate(zip(self.circuit.unpack(av), self.circuit.unpack(au))):
+			if unknown:
+				state = State(self.memory.data_width, starter=BitState.ERROR)
+			else:
+				state = self.get(lane, address)
+			values.append(state.value)
+			unknowns.append(state.unknown)
+		return self.circuit.pack(values), self.circuit.pack(unknowns)
+
+	def write(self, lanes: int, av: int, au: int, dv: int, du: int):
+		unpack = self.circuit.unpack
+		for lane, (enabled, address, unknown, value, undefined) in enumerate(zip(unpack(lanes), unpack(av), unpack(au), unpack(dv), unpack(du))):
+			if enabled and not unknown:
+				self.written[lane][address] = State.from_planes(self.memory.data_width, value, undefined)
+
+	def reset(self, lanes: int):
+		for lane, enabled in enumerate(self.circuit.unpack(lanes)):
+			if enabled:
+				self.written[lane] = {}
+				self.cleared[lane] = True
+
+
+class BatchedCircuit(CompiledCircuit):
+	"""
+	A compiled circuit that simulates many independent copies of itself in lockstep.
+
+	Every net holds one value/unknown pair per lane, packed into a single integer with a fixed stride per lane, so
+	the bitwise logic of a gate evaluates all lanes in one operation. Components with control flow are emitted as
+	per-lane masks instead of branches. The stride leaves two guard bits above the widest net, which keeps the carries
+	of additions and comparisons inside their own lane. All lanes start from the state of the event-driven objects;
+	set_net gives every lane its own inputs.
+	"""
+
+	def __init__(self, components: list, clock: Bus, lanes: int):
+		if lanes < 1:
+			raise ValueError("A batch needs at least one lane")
+		self.lanes = lanes
+		self.stride = 8
+		self.one = 1
+		self.replicated: dict[int, str] = {}
+		self.memories: dict[Any, LaneMemory] = {}
+		self.states: dict[Node, list[tuple[str, str, int]]] = {}
+		self.emitted: list[tuple[str, str, int]] = []
+		super().__init__(components, clock)
+
+	def emitter(self, component: Any) -> Callable[[CompiledCircuit, Any], Node] | None:
+		emit = BATCH_EMITTERS.get(type(component))
+		if emit is None:
+			return None
+
+		def emit_with_states(c: BatchedCircuit, component: Any) -> Node:
+			# Remembers the states of the node, which only the lanes that saw an edge on its clock may change
+			self.emitted = []
+			node = emit(c, component)
+			self.states[node] = self.emitted
+			return node
+		return emit_with_states
+
+	def state(self, width: int, getter: Callable[[], State], setter: Callable[[State], None]) -> tuple[str, str]:
+		names = super().state(width, getter, setter)
+		self.emitted.append((*names, width))
+		return names
+
+	def clocked(self, node: Node, condition: str) -> list[str]:
+		# The edge code sees the lanes with an edge as el; lanes without one keep their states
+		states = [(v, u, width, self.fresh("p")) for v, u, width in self.states[node]]
+		code = [f"{p}v = {v}; {p}u = {u}" for v, u, _, p in states] + node.edge
+		for v, u, width, p in states:
+			code.append(f"m = {self.spread('el', width)}; {v} = ({v} & m) | ({p}v & ~m); {u} = ({u} & m) | ({p}u & ~m)")
+		return [f"el = {condition}", "if el:"] + ["\t" + line for line in code]
+
+	def literal(self, value: int) -> str:
+		# Replicated constants are filled in once the stride is known
+		if value == 0:
+			return "0"
+		if value not in self.replicated:
+			self.replicated[value] = self.fresh("r")
+		return self.replicated[value]
+
+	def generate(self) -> str:
+		source = super().generate()
+		width = max((width for _, _, width, _, _ in self.pairs), default=0)
+		self.stride = (width + 2 + 7) // 8 * 8
+		self.one = int.from_bytes((b"\x01" + bytes(self.stride // 8 - 1)) * self.lanes, "little")
+		for value, name in self.replicated.items():
+			if value >> self.stride:
+				raise UnsupportedComponentException(value, "does not fit into a lane")
+			self.env[name] = value * self.one
+		return source
+
+	# Lane helpers used by the emitters; a lane condition holds one bit at the bottom of every lane
+
+	def spread(self, condition: str, width: int) -> str:
+		return f"({condition}) * {(1 << width) - 1}"
+
+	def any(self, planes: str, width: int) -> str:
+		return f"((({planes}) + {self.literal((1 << width) - 1)}) >> {width} & {self.literal(1)})"
+
+	def equal(self, planes: str, value: int, width: int) -> str:
+		return f"({self.any(f'{planes} ^ {self.literal(value)}', width)} ^ {self.literal(1)})"
+
+	def at_most(self, a: str, b: str, width: int) -> str:
+		# Both sides may use one bit more than width
+		return f"((({b}) + {self.literal(1 << (width + 1))} - ({a})) >> {width + 1} & {self.literal(1)})"
+
+	def memory(self, memory: RAM | ROM) -> str:
+		self.memories[memory] = LaneMemory(self, memory)
+		return self.const(self.memories[memory])
+
+	# Packing
+
+	def unpack(self, planes: int) -> list[int]:
+		size = self.stride // 8
+		data = planes.to_bytes(size * self.lanes, "little")
+		return [int.from_bytes(data[i:i + size], "little") for i in range(0, len(data), size)]
+
+	def pack(self, values: list[int]) -> int:
+		size = self.stride // 8
+		return int.from_bytes(b"".join(value.to_bytes(size, "little") for value in values), "little")
+
+	def load(self):
+		for i, (_, _, _, getter, _) in enumerate(self.pairs):
+			state = getter()
+			self.slots[2 * i] = state.value * self.one
+			self.slots[2 * i + 1] = state.unknown * self.one
+
+	def lane_state(self, i: int, width: int, lane: int) -> State:
+		shift = lane * self.stride
+		return State.from_planes(width, self.slots[2 * i] >> shift, self.slots[2 * i + 1] >> shift)
+
+	def store(self, lane: int = 0):
+		"""Writes the state of one lane back to the event-driven objects."""
+		for i, (_, _, width, _, setter) in enumerate(self.pairs):
+			if setter is not None:
+				setter(self.lane_state(i, width, lane))
+
+	def net_state(self, bus: Bus, lane: int = 0) -> State:
+		return self.lane_state(self.index[self.names[id(bus)][0]], bus.width, lane)
+
+	def net_states(self, bus: Bus) -> list[State]:
+		i = self.index[self.names[id(bus)][0]]
+		values = self.unpack(self.slots[2 * i])
+		unknowns = self.unpack(self.slots[2 * i + 1])
+		return [State.from_planes(bus.width, value, unknown) for value, unknown in zip(values, unknowns)]
+
+	def set_net(self, bus: Bus, states: State | list[State]):
+		"""Sets a net driven from outside the circuit, to one state for all lanes or one state per lane. run(0) settles it."""
+		if bus not in self.external or bus is self.clock:
+			raise ValueError("Only nets driven from outside the circuit can be set")
+		v = self.external[bus][0]
+		if isinstance(states, State):
+			states = [states] * self.lanes
+		if len(states) != self.lanes:
+			raise ValueError(f"Expected {self.lanes} states, got {len(states)}")
+		i = self.index[v]
+		self.slots[2 * i] = self.pack([state.value for state in states])
+		self.slots[2 * i + 1] = self.pack([state.unknown for state in states])
+		self.posted.add(self.resolvers[v])
+
+	def read_memory(self, memory: RAM | ROM, lane: int, address: int) -> State:
+		return self.memories[memory].get(lane, address)
+
+	def contents(self, memory: RAM, shadow: PagedMemory) -> PagedMemory:
+		# The lanes write into their own dictionaries rather than into the memory, so lane 0 is compared
+		lanes = self.memories[memory]
+		contents = PagedMemory(memory.addr_width, memory.data_width) if lanes.cleared[0] else shadow.copy()
+		for address, state in lanes.written[0].items():
+			contents[address] = state
+		return contents
+
+
+def compile_batched(components: list, clock: Bus, lanes: int) -> BatchedCircuit:
+	return BatchedCircuit(components, clock, lanes)
+
+
+# Emitters for the components whose compiled form branches; gates, splitters and constants are bitwise already
+
+def emit_controlled_buffer(c: BatchedCircuit, g: ControlledBuffer) -> Node:
+	node = Node(g, [g.I, g.E], [g.O])
+	iv, iu = c.read(g.I)
+	ev, eu = c.read(g.E)
+	ov, ou = c.drive(g.O)
+	mask = c.literal((1 << g.width) - 1)
+	node.comb = [
+		f"me = {c.spread(c.high(g.E), g.width)}; md = {c.spread(f'~({ev} | {eu}) & {c.literal(1)}', g.width)}",
+		f"{ov} = (({iv} | {iu}) & me) | ({mask} & ~me & ~md); {ou} = ({iu} & me) | ({mask} & ~me)",
+	]
+	return node
+
+
+def emit_multiplexer(c: BatchedCircuit, g: Multiplexer) -> Node:
+	node = Node(g, [g.S] + list(g.inputs), [g.O])
+	sv, su = c.read(g.S)
+	ov, ou = c.drive(g.O)
+	mask = c.literal((1 << g.width) - 1)
+	node.comb = [
+		f"fl = {c.any(f'{su} & ~{sv}', g.S.width)} * {(1 << g.width) - 1}; er = {c.spread(c.any(su, g.S.width), g.width)}",
+		"xv = 0; xu = 0",
+	]
+	for i, port in enumerate(g.inputs):
+		pv, pu = c.read(port)
+		node.comb.append(f"m = {c.spread(c.equal(sv, i, g.S.width), g.width)}; xv |= {pv} & m; xu |= {pu} & m")
+	node.comb.append(f"{ov} = (xv & ~er) | ({mask} & er & ~fl); {ou} = (xu & ~er) | ({mask} & er)")
+	return node
+
+
+def emit_demultiplexer(c: BatchedCircuit, g: Demultiplexer) -> Node:
+	node = Node(g, [g.S, g.I], list(g.outputs))
+	sv, su = c.read(g.S)
+	iv, iu = c.read(g.I)
+	mask = c.literal((1 << g.width) - 1)
+	idle = mask if g.threestate else "0"
+	node.comb = [f"fl = {c.any(f'{su} & ~{sv}', g.S.width)} * {(1 << g.width) - 1}; er = {c.spread(c.any(su, g.S.width), g.width)}"]
+	for i, port in enumerate(g.outputs):
+		ov, ou = c.drive(port)
+		node.comb += [
+			f"m = {c.spread(c.equal(sv, i, g.S.width), g.width)}",
+			f"{ov} = ({iv} & m & ~er) | ({mask} & er & ~fl); {ou} = ((({iu} & m) | ({idle} & ~m)) & ~er) | ({mask} & er)",
+		]
+	return node
+
+
+def emit_bit_selector(c: BatchedCircuit, g: BitSelector) -> Node:
+	node = Node(g, [g.S, g.I], [g.O])
+	sv, su = c.read(g.S)
+	iv, iu = c.read(g.I)
+	ov, ou = c.drive(g.O)
+	mask = (1 << g.o_width) - 1
+	# A select past the last group raises in the other engines; here it only marks its own lane as an error
+	node.comb = [f"er = {c.any(su, g.S.width)}; ok = 0; xv = 0; xu = 0"]
+	for i in range(-(-g.i_width // g.o_width)):
+		shift = i * g.o_width
+		group = c.literal((mask << shift) & ((1 << g.i_width) - 1))
+		node.comb += [
+			f"q = {c.equal(sv, i, g.S.width)}; ok |= q; m = q * {mask}",
+			f"xv |= (({iv} & {group}) >> {shift}) & m; xu |= (({iu} & {group}) >> {shift}) & m",
+		]
+	node.comb.append(f"er = (er | (ok ^ {c.literal(1)})) * {mask}; {ov} = (xv & ~er) | er; {ou} = (xu & ~er) | er")
+	return node
+
+
+def emit_alu(c: BatchedCircuit, g: ALU) -> Node:
+	node = Node(g, [g.IA, g.IB, g.IC, g.M], [g.OA, g.OB])
+	av, au = c.read(g.IA)
+	bv, bu = c.read(g.IB)
+	mv, mu = c.read(g.M)
+	oav, oau = c.drive(g.OA)
+	obv, obu = c.drive(g.OB)
+	one = c.literal(1)
+	mask = c.literal((1 << g.width) - 1)
+	# Subtraction is a + ~b + ~c, whose carry out is the inverted borrow
+	node.comb = [
+		f"ci = {c.high(g.IC)}; m = ({mv} & {one}) * {(1 << (g.width + 1)) - 1}",
+		f"o = (({av} + {bv} + ci) & ~m) | (({av} + ({mask} ^ {bv}) + (ci ^ {one})) & m)",
+		f"er = {c.any(f'{au} | {bu}', g.width)} | ({mu} & {one}); me = er * {(1 << g.width) - 1}",
+		f"{oav} = (o & {mask} & ~me) | me; {oau} = me; {obv} = (((o >> {g.width}) ^ {mv}) & {one} & ~er) | er; {obu} = er",
+	]
+	return node
+
+
+def emit_register(c: BatchedCircuit, g: Register) -> Node:
+	node = Node(g, [g.R, g.OE, g.WE, g.D], [g.Q])
+	node.clock = g.C
+	sv, su = c.state(g.width, state_of(g, "state"), set_state_of(g, "state"))
+	dv, du = c.read(g.D)
+	qv, qu = c.drive(g.Q)
+	node.comb = [
+		f"m = {c.spread(c.high(g.R), g.width)}; {sv} &= ~m; {su} &= ~m",
+		f"m = {c.spread(c.high(g.OE), g.width)}; {qv} = {sv} & m; {qu} = {su} & m",
+	]
+	node.edge = [
+		f"m = {c.spread(c.high(g.R), g.width)}; {sv} &= ~m; {su} &= ~m",
+		f"m = {c.spread(c.high(g.WE), g.width)}; {sv} = ({dv} & m) | ({sv} & ~m); {su} = ({du} & m) | ({su} & ~m)",
+	]
+	node.split = 1
+	return node
+
+
+def emit_counter(c: BatchedCircuit, g: Counter) -> Node:
+	node = Node(g, [g.R, g.DS], [g.O, g.OF])
+	node.clock = g.C
+	sv, su = c.state(g.width, state_of(g, "state"), set_state_of(g, "state"))
+	dv, du = c.read(g.D)
+	ov, ou = c.drive(g.O)
+	fv, fu = c.drive(g.OF)
+	one = c.literal(1)
+	mask = c.literal((1 << g.width) - 1)
+	top = c.literal(g.max_value)
+	node.comb = [
+		f"m = {c.spread(c.high(g.R), g.width)}; {sv} &= ~m; {su} &= ~m",
+		f"{ov} = {sv}; {ou} = {su}",
+		f"er = {c.any(su, g.width)}; m = {c.spread(c.nonzero(g.DS), g.width)}",
+		f"{fv} = (({c.any(f'{sv} ^ ({top} & m)', g.width)} ^ {one}) & ~er) | er; {fu} = er",
+	]
+	overflow = {
+		OverflowSetting.WRAP: f"lv = {top} & ~m; lu = 0",
+		OverflowSetting.STAY: f"lv = {sv}; lu = 0",
+		OverflowSetting.CONTINUE: "lv = nx; lu = 0",
+		OverflowSetting.LOAD: f"lv = {dv}; lu = {du}",
+	}[g.overflow_setting]
+	# Counter.count per lane: the next value where it stays within [0, max_value], the overflow behaviour elsewhere
+	node.edge = [
+		f"up = {c.nonzero(g.DS)}; m = up * {(1 << g.width) - 1}",
+		f"nu = {sv} + {one}; nd = {sv} + {mask}; nx = ((nu & m) | (nd & ~m)) & {mask}",
+		f"ok = (up & {c.at_most('nu', top, g.width)}) | (~up & {one} & (nd >> {g.width}) & {c.at_most(f'(nd & {mask})', top, g.width)})",
+		overflow,
+		f"ok *= {(1 << g.width) - 1}; cv = (nx & ok) | (lv & ~ok); cu = lu & ~ok",
+		f"ue = {c.spread(c.any(su, g.width), g.width)}; cv = (cv & ~ue) | ue; cu = (cu & ~ue) | ue",
+		f"r = {c.high(g.R)}; ms = {c.high(g.MS)} & ~r; ce = {c.nonzero(g.CE)} & ~r & ~ms",
+		f"ms *= {(1 << g.width) - 1}; ce *= {(1 << g.width) - 1}; keep = ~((r * {(1 << g.width) - 1}) | ms | ce)",
+		f"{sv} = ({dv} & ms) | (cv & ce) | ({sv} & keep); {su} = ({du} & ms) | (cu & ce) | ({su} & keep)",
+	]
+	node.split = 1
+	return node
+
+
+def emit_flip_flop(c: BatchedCircuit, g: DFlipFlop | TFlipFlop | JKFlipFlop) -> Node:
+	if g.C.is_ranged:
+		raise UnsupportedComponentException(g, "is level triggered")
+	node = Node(g, flip_flop_inputs(g), [g.Q, g.Qi])
+	node.clock = g.C
+	fv, fu = c.state(1, state_of(g, "state"), set_state_of(g, "state"))
+	qv, qu = c.drive(g.Q)
+	iv, iu = c.drive(g.Qi)
+	one = c.literal(1)
+	node.comb = [
+		f"r = {c.high(g.R)}; {fv} &= ~r; {fu} &= ~r",
+		f"{qv} = {fv}; {qu} = {fu}; {iv} = (~{fv} | {fu}) & {one}; {iu} = {fu}",
+	]
+	if isinstance(g, DFlipFlop):
+		dv, du = c.read(g.D)
+		change = [f"cv = {dv} & {one}; cu = {du} & {one}"]
+	elif isinstance(g, TFlipFlop):
+		change = [f"t = {c.high(g.T)}; cv = ((~{fv} | {fu}) & {one} & t) | ({fv} & ~t); cu = {fu}"]
+	elif isinstance(g, JKFlipFlop):
+		change = [
+			f"j = {c.high(g.J)}; k = {c.high(g.K)}",
+			f"cv = ((~{fv} | {fu}) & {one} & j & k) | (j & ~k) | ({fv} & ~(j | k)); cu = {fu} & ~(j ^ k)",
+		]
+	else:
+		change = [f"cv = {fv}; cu = {fu}"]
+	node.edge = [f"r = {c.high(g.R)}; {fv} &= ~r; {fu} &= ~r"] + change + [
+		f"se = {c.high(g.S)}; {fv} = se | (cv & ~se); {fu} = cu & ~se",
+	]
+	node.split = 1
+	return node
+
+
+def emit_sr_flip_flop(c: BatchedCircuit, g: SRFlipFlop) -> Node:
+	node = Node(g, [g.AR, g.AS], [g.Q, g.Qi])
+	node.clock = g.C
+	fv, fu = c.state(1, state_of(g, "state"), set_state_of(g, "state"))
+	qv, qu = c.drive(g.Q)
+	iv, iu = c.drive(g.Qi)
+	one = c.literal(1)
+	# AR goes before AS, which goes before S, which goes before R
+	node.comb = [
+		f"r = {c.high(g.AR)}; s = {c.high(g.AS)} & ~r; {fv} = s | ({fv} & ~r); {fu} &= ~(s | r)",
+		f"{qv} = {fv}; {qu} = {fu}; {iv} = (~{fv} | {fu}) & {one}; {iu} = {fu}",
+	]
+	node.edge = [
+		f"r = {c.high(g.AR)}; s = ({c.high(g.AS)} | {c.high(g.S)}) & ~r; r |= {c.high(g.R)} & ~s",
+		f"{fv} = s | ({fv} & ~r); {fu} &= ~(s | r)",
+	]
+	node.split = 1
+	return node
+
+
+def emit_shift_register(c: BatchedCircuit, g: ShiftRegister) -> Node:
+	node = Node(g, [g.R], list(g.outputs))
+	node.clock = g.C
+	stages = []
+	for i in range(g.stage_count):
+		getter = lambda i=i: g.stages[i]
+		setter = lambda s, i=i: g.stages.__setitem__(i, s)
+		stages.append(c.state(g.width, getter, setter))
+	node.comb = [f"m = {c.spread(c.high(g.R), g.width)}"] + [f"{v} &= ~m; {u} &= ~m" for v, u in stages]
+	for (v, u), port in zip(stages, g.outputs):
+		ov, ou = c.drive(port)
+		node.comb.append(f"{ov} = {v}; {ou} = {u}")
+	node.edge = [
+		f"mr = {c.spread(c.high(g.R), g.width)}; ml = {c.spread(c.high(g.L), g.width)} & ~mr",
+		f"ms = {c.spread(c.nonzero(g.S), g.width)} & ~mr & ~ml; keep = ~(mr | ml | ms)",
+	]
+	sources = [c.read(g.S_IN)] + stages[:-1]
+	for i in range(g.stage_count - 1, -1, -1):
+		v, u = stages[i]
+		pv, pu = c.read(g.inputs[i])
+		sv, su = sources[i]
+		node.edge.append(f"{v} = ({pv} & ml) | ({sv} & ms) | ({v} & keep); {u} = ({pu} & ml) | ({su} & ms) | ({u} & keep)")
+	node.split = 1 + g.stage_count
+	return node
+
+
+def emit_ram(c: BatchedCircuit, g: RAM) -> Node:
+	node = Node(g, [g.R, g.A, g.OE], [g.OUT])
+	node.clock = g.C
+	ram = c.memory(g)
+	av, au = c.read(g.A)
+	dv, du = c.read(g.IN)
+	ov, ou = c.drive(g.OUT)
+	read = [
+		"if m:",
+		f"\txv, xu = {ram}.read({av}, {au}); m *= {(1 << g.data_width) - 1}",
+		f"\t{ov} = (xv & m) | ({ov} & ~m); {ou} = (xu & m) | ({ou} & ~m)",
+	]
+	node.comb = [f"r = {c.high(g.R)}", "if r:", f"\t{ram}.reset(r)"]
+	node.split = len(node.comb)
+	if g.async_read:
+		node.comb += [f"m = {c.high(g.OE)} & ~r"] + read
+	# Only the lanes that saw an edge, el, read or write on it
+	node.edge = [f"r = {c.high(g.R)}"]
+	if not g.async_read:
+		node.edge += [f"m = {c.high(g.OE)} & ~r & el"] + read
+	node.edge += [
+		f"m = {c.high(g.WE)} & ~r & el",
+		"if m:",
+		f"\t{ram}.write(m, {av}, {au}, {dv}, {du})",
+	]
+	return node
+
+
+def emit_rom(c: BatchedCircuit, g: ROM) -> Node:
+	node = Node(g, [g.A, g.OE], [g.O])
+	rom = c.memory(g)
+	av, au = c.read(g.A)
+	ov, ou = c.drive(g.O)
+	node.comb = [
+		f"m = {c.high(g.OE)}",
+		"if m:",
+		f"\txv, xu = {rom}.read({av}, {au}); m *= {(1 << g.data_width) - 1}",
+		f"\t{ov} = (xv & m) | ({ov} & ~m); {ou} = (xu & m) | ({ou} & ~m)",
+	]
+	return node
+
+
+BATCH_EMITTERS = {
+	**EMITTERS,
+	ControlledBuffer: emit_controlled_buffer,
+	Multiplexer: emit_multiplexer,
+	Demultiplexer: emit_demultiplexer,
+	BitSelector: emit_bit_selector,
+	ALU: emit_alu,
+	Register: emit_register,
+	Counter: emit_counter,
+	DFlipFlop: emit_flip_flop,
+	TFlipFlop: emit_flip_flop,
+	JKFlipFlop: emit_flip_flop,
+	SRFlipFlop: emit_sr_flip_flop,
+	ShiftRegister: emit_shift_register,
+	RAM: emit_ram,
+	ROM: emit_rom,
+}
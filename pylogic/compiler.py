@@ -0,0 +1,809 @@
+import re
+from typing import Any, Callable
+
+from .base_components import Bus, InputPort, OutputPort, TriggerPort
+from .classes import State, PagedMemory
+from .simulator import get_simulator
+from .enums import BitState, Edge, BufferSetting
+from .errors import UnsupportedComponentException, DivergenceException, OscillationException
+from .components.gates import Not, Buffer, Gate, And, Or, Nand, Nor, Xor, Xnor, ControlledBuffer
+from .components.plexers import Multiplexer, Demultiplexer, BitSelector
+from .components.wiring import Splitter, Constant, Readout, PullResistor
+from .components.arithmatic import ALU
+from .components.memory import FlipFlop, DFlipFlop, TFlipFlop, JKFlipFlop, SRFlipFlop, Register, Counter, ShiftRegister, RAM, ROM
+
+# The names of the value and unknown planes that constant folding replaces, and of all the state of the generated code
+FOLDED = re.compile(r"\b[on]\d+[vu]\b")
+CELL = re.compile(r"\b[nosxt]\d+[vu]?\b")
+
+
+class Node:
+	def __init__(self, component: Any, inputs: list[InputPort], outputs: list[OutputPort]):
+		self.component = component
+		self.inputs = inputs
+		self.outputs = outputs
+		self.comb: list[str] = []
+		self.edge: list[str] = []
+		self.clock: TriggerPort | None = None
+		# Where in comb the on_change of the component runs its edge code
+		self.split = 0
+
+
+class CompiledCircuit:
+	"""
+	A circuit flattened into generated Python code.
+
+	Every component becomes a function mirroring its on_change and every net one resolving it from its drivers, all
+	working on the value/unknown planes of the nets and element states they share in one closure. They are scheduled
+	in delta cycles like the event-driven kernel: a net that changes runs its readers in the same delta cycle and a
+	changed output resolves its net in the next one. Glitches, gated and derived clocks and loops through the logic
+	therefore behave as they do there, while one call to run evaluates whole clock cycles (rising then falling edge)
+	of the given clock bus without any State objects or callback dispatch. The compiled engine keeps its own copy of
+	all nets and element states: load() pulls them from the event-driven objects, store() writes them back.
+	"""
+
+	def __init__(self, components: list, clock: Bus):
+		self.components = components
+		self.clock = clock
+		self.env: dict[str, Any] = {"State": State, "OscillationException": OscillationException}
+		self.pairs: list[tuple[str, str, int, Callable[[], State], Callable[[State], None] | None]] = []
+		self.names: dict[int, tuple[str, str]] = {}
+		self.nodes: list[Node] = []
+		self.nets: dict[Bus, list[OutputPort]] = {}
+		self.folded: dict[str, str] = {}
+		self.external: dict[Bus, tuple[str, str]] = {}
+		self.counter = 0
+
+		for component in components:
+			# A pull resistor only sets the pull of its bus, which resolving the bus takes into account
+			if isinstance(component, (Readout, PullResistor)):
+				continue
+			emitter = self.emitter(component)
+			if emitter is None:
+				raise UnsupportedComponentException(component)
+			self.nodes.append(emitter(self, component))
+
+		self.owned = {port for node in self.nodes for port in node.outputs}
+		for node in self.nodes:
+			for port in node.outputs:
+				if port.bus is not None:
+					self.nets.setdefault(port.bus, []).append(port)
+		if self.nets.get(self.clock):
+			raise UnsupportedComponentException(self.nets[self.clock][0], "drives the clock bus")
+
+		self.source = self.generate()
+		exec(compile(self.source, "<pylogic compiled circuit>", "exec"), self.env)
+		self.function, self.posted, self.resolvers = self.env["build"]()
+		self.slots = [0] * (2 * len(self.pairs))
+		self.index = {pair[0]: i for i, pair in enumerate(self.pairs)}
+		self.load()
+
+	def emitter(self, component: Any) -> Callable[["CompiledCircuit", Any], Node] | None:
+		return EMITTERS.get(type(component))
+
+	# Naming helpers used by the emitters
+
+	def fresh(self, prefix: str) -> str:
+		self.counter += 1
+		return f"{prefix}{self.counter}"
+
+	def const(self, obj: Any) -> str:
+		name = self.fresh("k")
+		self.env[name] = obj
+		return name
+
+	def literal(self, value: int) -> str:
+		return str(value)
+
+	def persist(self, prefix: str, width: int, getter: Callable[[], State], setter: Callable[[State], None] | None):
+		v = self.fresh(prefix) + "v"
+		u = v[:-1] + "u"
+		self.pairs.append((v, u, width, getter, setter))
+		return v, u
+
+	def net(self, bus: Bus) -> tuple[str, str]:
+		if id(bus) not in self.names:
+			self.names[id(bus)] = self.persist("n", bus.width, lambda: bus.state, lambda s: self.store_net(bus, s))
+			self.nets.setdefault(bus, [])
+		return self.names[id(bus)]
+
+	def read(self, port: InputPort) -> tuple[str, str]:
+		if port.bus is None:
+			return "0", self.literal((1 << port.width) - 1)
+		return self.net(port.bus)
+
+	def drive(self, port: OutputPort) -> tuple[str, str]:
+		if id(port) not in self.names:
+			self.names[id(port)] = self.persist("o", port.width, lambda: self.driver_state(port), lambda s: self.store_driver(port, s))
+			if port.bus is not None:
+				self.net(port.bus)
+		return self.names[id(port)]
+
+	def state(self, width: int, getter: Callable[[], State], setter: Callable[[State], None]) -> tuple[str, str]:
+		return self.persist("s", width, getter, setter)
+
+	def high(self, port: InputPort) -> str:
+		v, u = self.read(port)
+		return f"({v} & ~{u} & {self.literal(1)})"
+
+	def nonzero(self, port: InputPort) -> str:
+		v, u = self.read(port)
+		return f"(({v} | {u}) & {self.literal(1)})"
+
+	# Code generation
+
+	def generate(self) -> str:
+		one = self.literal(1)
+		# The nodes a net runs when it changes, and the delta cycle and lanes of the last edge it made for a clock
+		readers: dict[Bus, list[Node]] = {}
+		edges: dict[tuple[Bus, Edge], tuple[str, str]] = {}
+		for node in self.nodes:
+			ports = list(node.inputs)
+			clock = node.clock
+			if node.edge and clock is not None and clock.bus is not None:
+				ports.append(clock)
+				if not clock.is_ranged:
+					edges.setdefault((clock.bus, clock.edge), (self.fresh("t"), self.fresh("t")))
+			for port in ports:
+				if port.bus is not None:
+					self.net(port.bus)
+					if node not in readers.setdefault(port.bus, []):
+						readers[port.bus].append(node)
+		self.net(self.clock)
+
+		# Nets the circuit does not drive itself, the clock among them, are driven from outside
+		self.external = external = {}
+		for bus in list(self.nets):
+			if bus is self.clock or not self.nets[bus] or any(driver not in self.owned for driver in bus.drivers):
+				external[bus] = self.persist("x", bus.width, lambda b=bus: self.external_state(b), None)
+
+		# Constant outputs, and nets driven by nothing but one constant, become literals in the generated code
+		for node in self.nodes:
+			if isinstance(node.component, Constant):
+				port = node.component.O
+				names = [self.drive(port)]
+				bus = port.bus
+				if bus is not None and len(self.nets[bus]) == 1 and bus not in external and bus.pull == BitState.FLOATING:
+					names.append(self.net(bus))
+				for v, u in names:
+					self.folded[v] = self.literal(port.state.value)
+					self.folded[u] = self.literal(port.state.unknown)
+
+		live = [(i, v, u) for i, (v, u, *_) in enumerate(self.pairs) if v not in self.folded]
+		stamps = [name for pair in edges.values() for name in pair]
+		cells = {name for _, v, u in live for name in (v, u)} | set(stamps)
+		resolvers = {bus: self.fresh("g") for bus in self.nets if self.names[id(bus)][0] not in self.folded}
+		functions = {}
+		code = []
+		for node in self.nodes:
+			body = self.event(node, edges)
+			if not body:
+				continue
+			watched = []
+			for port in node.outputs:
+				v, u = self.drive(port)
+				if port.bus in resolvers and v not in self.folded:
+					watched.append((v, u, resolvers[port.bus]))
+			before = [f"w{i}v = {v}; w{i}u = {u}" for i, (v, u, _) in enumerate(watched)]
+			after = [line for i, (v, u, g) in enumerate(watched) for line in (f"if {v} != w{i}v or {u} != w{i}u:", f"\tpost({g})")]
+			functions[node] = self.fresh("f")
+			code += self.function(functions[node], before + body + after, cells)
+		for bus, g in resolvers.items():
+			v, u = self.net(bus)
+			body = self.resolve(bus, external.get(bus)) + [f"if rv != {v} or ru != {u}:"]
+			for (clock, edge), (stamp, lanes) in edges.items():
+				if clock is bus:
+					if edge == Edge.RISING:
+						body.append(f"\ted = ~({v} | {u}) & rv & ~ru & {one}")
+					else:
+						body.append(f"\ted = {v} & ~{u} & ~(rv | ru) & {one}")
+					body += ["\tif ed:", f"\t\t{stamp} = d; {lanes} = ed"]
+			body.append(f"\t{v} = rv; {u} = ru")
+			woken = [functions[node] for node in readers.get(bus, []) if node in functions]
+			if woken:
+				code.append(f"{g}q = ({', '.join(woken)},)")
+				body.append(f"\twake({g}q)")
+			code += self.function(g, body, cells)
+
+		limit = get_simulator().sim_limit
+		xv, xu = external[self.clock]
+		names = [name for _, v, u in live for name in (v, u)]
+		lines = ["def build():"]
+		lines += [f"\t{' = '.join(names[i:i + 64])} = 0" for i in range(0, len(names), 64)]
+		lines += [f"\t{name} = -1" for name in stamps]
+		lines += ["\td = 0", "\tposted = set()", "\tdirty = set()", "\tpost = posted.add", "\twake = dirty.update"]
+		lines += ["\t" + line for line in code]
+		lines += [
+			"\tdef settle():",
+			"\t\tnonlocal d",
+			f"\t\tlast = d + {limit}",
+			"\t\twhile posted or dirty:",
+			"\t\t\tif d >= last:",
+			"\t\t\t\tposted.clear()",
+			"\t\t\t\tdirty.clear()",
+			f"\t\t\t\traise OscillationException({limit})",
+			# Like Simulator.settle: the nets posted in the last delta cycle resolve, then their readers run
+			"\t\t\tfor resolve in posted:",
+			"\t\t\t\tresolve()",
+			"\t\t\tposted.clear()",
+			"\t\t\tfor change in dirty:",
+			"\t\t\t\tchange()",
+			"\t\t\tdirty.clear()",
+			"\t\t\td += 1",
+			"\tdef run(cycles, s):",
+			f"\t\tnonlocal {', '.join(names)}",
+		]
+		lines += [f"\t\t{v} = s[{2 * i}]; {u} = s[{2 * i + 1}]" for i, v, u in live]
+		lines += ["\t\tsettle()", "\t\tfor _ in range(cycles):"]
+		for level in (1, 0):
+			lines += [f"\t\t\t{xv} = {self.literal(level)}; {xu} = 0", f"\t\t\tposted.add({resolvers[self.clock]})", "\t\t\tsettle()"]
+		lines += [f"\t\ts[{2 * i}] = {v}; s[{2 * i + 1}] = {u}" for i, v, u in live]
+		inputs = ", ".join(f"{external[bus][0]!r}: {g}" for bus, g in resolvers.items() if bus in external)
+		lines.append(f"\treturn run, posted, {{{inputs}}}")
+		return "\n".join(lines) + "\n"
+
+	def event(self, node: Node, edges: dict[tuple[Bus, Edge], tuple[str, str]]) -> list[str]:
+		"""The code of the node's on_change, running its edge code where its clock made its edge in this delta cycle."""
+		clock = node.clock
+		if not node.edge or clock is None or clock.bus is None:
+			return node.comb
+		if clock.edge == Edge.HIGH:
+			condition = self.high(clock)
+		elif clock.edge == Edge.LOW:
+			v, u = self.read(clock)
+			condition = f"(~({v} | {u}) & {self.literal(1)})"
+		else:
+			stamp, lanes = edges[(clock.bus, clock.edge)]
+			condition = f"({lanes} if {stamp} == d else 0)"
+		return node.comb[:node.split] + self.clocked(node, condition) + node.comb[node.split:]
+
+	def clocked(self, node: Node, condition: str) -> list[str]:
+		return [f"if {condition}:"] + ["\t" + line for line in node.edge]
+
+	def function(self, name: str, body: list[str], cells: set[str]) -> list[str]:
+		"""A function of the closure of build, declaring the state it uses nonlocal once the constants are folded in."""
+		body = [FOLDED.sub(lambda m: self.folded.get(m.group(0), m.group(0)), line) for line in body]
+		used = list(dict.fromkeys(word for line in body for word in CELL.findall(line) if word in cells))
+		lines = [f"def {name}():"]
+		if used:
+			lines.append(f"\tnonlocal {', '.join(used)}")
+		return lines + ["\t" + line for line in body]
+
+	def resolve(self, bus: Bus, external: tuple[str, str] | None) -> list[str]:
+		"""Code resolving the drivers of a net into rv and ru, like Bus.resolve."""
+		mask = self.literal((1 << bus.width) - 1)
+		contributions = [self.drive(port) for port in self.nets[bus]]
+		if external is not None:
+			contributions.append(external)
+		if len(contributions) == 1:
+			lines = [f"rv = {contributions[0][0]}; ru = {contributions[0][1]}"]
+		else:
+			low = " | ".join(f"~({cv} | {cu})" for cv, cu in contributions)
+			high = " | ".join(f"({cv} & ~{cu})" for cv, cu in contributions)
+			error = " | ".join(f"({cv} & {cu})" for cv, cu in contributions)
+			lines = [
+				f"lo = {low}",
+				f"hi = {high}",
+				f"er = {error} | (lo & hi)",
+				f"rv = (hi | er) & {mask}; ru = (er | ~(lo | hi)) & {mask}",
+			]
+		if bus.pull != BitState.FLOATING:
+			lines.append("fl = ru & ~rv")
+			if bus.pull == BitState.HIGH:
+				lines.append("rv |= fl; ru &= ~fl")
+			elif bus.pull == BitState.LOW:
+				lines.append("ru &= ~fl")
+			else:
+				lines.append("rv |= fl")
+		return lines
+
+	# Synchronisation with the event-driven objects
+
+	def external_state(self, bus: Bus) -> State:
+		outside = Bus(bus.width)
+		outside.drivers = {driver: state for driver, state in bus.drivers.items() if driver not in self.owned}
+		return outside.resolve()
+
+	def store_net(self, bus: Bus, state: State):
+		bus.state = state
+		for callback in bus.callbacks:
+			port = getattr(callback, "__self__", None)
+			if isinstance(port, InputPort):
+				port.state = state
+
+	def driver_state(self, port: OutputPort) -> State:
+		# A port set before it was wired holds a state its bus never saw
+		if port.bus is None:
+			return port.state
+		return port.bus.drivers.get(port, State(port.width))
+
+	def store_driver(self, port: OutputPort, state: State):
+		port.state = state
+		if port.bus is not None:
+			if state.floating == state.mask:
+				port.bus.drivers.pop(port, None)
+			else:
+				port.bus.drivers[port] = state
+
+	def load(self):
+		for i, (_, _, _, getter, _) in enumerate(self.pairs):
+			state = getter()
+			self.slots[2 * i] = state.value
+			self.slots[2 * i + 1] = state.unknown
+
+	def store(self):
+		for i, (_, _, width, _, setter) in enumerate(self.pairs):
+			if setter is not None:
+				setter(State.from_planes(width, self.slots[2 * i], self.slots[2 * i + 1]))
+
+	def run(self, cycles: int = 1):
+		self.function(cycles, self.slots)
+
+	def net_state(self, bus: Bus) -> State:
+		i = self.index[self.names[id(bus)][0]]
+		return State.from_planes(bus.width, self.slots[2 * i], self.slots[2 * i + 1])
+
+	def toggle(self, level: BitState):
+		"""Drives the clock net of the event-driven objects through its driver, or as the only one if it has none."""
+		drivers = list(self.clock.drivers)
+		if len(drivers) > 1:
+			raise ValueError("A clock net with more than one driver cannot be toggled")
+		driver = drivers[0] if drivers else self
+		state = State(1, starter=level)
+		if isinstance(driver, OutputPort):
+			driver.set_state(state)
+		else:
+			self.clock.drive(driver, state)
+
+	def contents(self, memory: RAM, shadow: PagedMemory) -> PagedMemory:
+		"""The contents of a memory in the compiled engine, which cross_check lets it write into shadow."""
+		return shadow
+
+	def cross_check(self, cycles: int):
+		"""Runs both engines cycle by cycle from the current state and raises DivergenceException on the first net that differs."""
+		self.toggle(BitState.LOW)
+		self.load()
+		self.run(0)
+		self.store()
+		nets = [bus for bus in self.nets if id(bus) in self.names]
+		# Both engines share the memory objects, so the compiled one works on its own copy of their contents
+		memories = [component for component in self.components if isinstance(component, RAM)]
+		shadows = [memory.locs.copy() for memory in memories]
+		for cycle in range(cycles):
+			self.toggle(BitState.HIGH)
+			self.toggle(BitState.LOW)
+			for i, memory in enumerate(memories):
+				memory.locs, shadows[i] = shadows[i], memory.locs
+			self.run(1)
+			for i, memory in enumerate(memories):
+				memory.locs, shadows[i] = shadows[i], memory.locs
+			for memory, shadow in zip(memories, shadows):
+				contents = self.contents(memory, shadow)
+				address = memory.locs.first_difference(contents)
+				if address is not None:
+					raise DivergenceException(cycle, f"{type(memory).__name__} address {address:#x}", memory.locs[address], contents[address])
+			for bus in nets:
+				actual = self.net_state(bus)
+				if bus.state != actual:
+					raise DivergenceException(cycle, f"a {bus.width} bit bus", bus.state, actual)
+
+
+def compile_circuit(components: list, clock: Bus) -> CompiledCircuit:
+	return CompiledCircuit(components, clock)
+
+
+def state_of(component: Any, attribute: str):
+	return lambda: getattr(component, attribute)
+
+
+def set_state_of(component: Any, attribute: str):
+	return lambda s: setattr(component, attribute, s)
+
+
+def flip_flop_inputs(g: FlipFlop) -> list[InputPort]:
+	# Any event runs on_change, which resets a flip-flop the edge set while R is high
+	data = [getattr(g, name) for name in ("D", "T", "J", "K") if hasattr(g, name)]
+	return [g.R, g.S] + data
+
+
+def gather(source: str, mapping: list[tuple[int, int]], literal: Callable[[int], str] = str) -> str:
+	# Moves bit source[i] to position j for every (i, j), merging runs of consecutive bits into one shift
+	parts = []
+	mapping = sorted(mapping)
+	start = 0
+	while start < len(mapping):
+		end = start + 1
+		while end < len(mapping) and mapping[end][0] == mapping[end - 1][0] + 1 and mapping[end][1] == mapping[end - 1][1] + 1:
+			end += 1
+		i, j = mapping[start]
+		run = (1 << (end - start)) - 1
+		shift = f"<< {j - i}" if j >= i else f">> {i - j}"
+		parts.append(f"(({source} & {literal(run << i)}) {shift})")
+		start = end
+	return " | ".join(parts) if parts else "0"
+
+
+# Emitters: one per component class, mirroring the component's on_change
+
+def emit_not(c: CompiledCircuit, g: Not) -> Node:
+	node = Node(g, [g.I], [g.O])
+	iv, iu = c.read(g.I)
+	ov, ou = c.drive(g.O)
+	node.comb = [f"{ov} = (~{iv} | {iu}) & {c.literal((1 << g.width) - 1)}; {ou} = {iu}"]
+	return node
+
+
+def emit_buffer(c: CompiledCircuit, g: Buffer) -> Node:
+	node = Node(g, [g.I], [g.O])
+	iv, iu = c.read(g.I)
+	ov, ou = c.drive(g.O)
+	mask = c.literal((1 << g.width) - 1)
+	if g.setting == BufferSetting.LOW_HIGH:
+		node.comb = [f"{ov} = {iv}; {ou} = {iu}"]
+	elif g.setting == BufferSetting.LOW_FLOATING:
+		node.comb = [f"{ov} = {iv} & {iu}; {ou} = {iu} | {iv}"]
+	else:
+		node.comb = [f"{ov} = {iv}; {ou} = ({iu} | ~{iv}) & {mask}"]
+	return node
+
+
+def emit_gate(c: CompiledCircuit, g: Gate) -> Node:
+	node = Node(g, list(g.inputs), [g.O])
+	ov, ou = c.drive(g.O)
+	mask = c.literal((1 << g.width) - 1)
+	planes = [c.read(p) for p in g.inputs]
+	any_unknown = " | ".join([u for _, u in planes] or ["0"])
+	all_high = " & ".join([f"{v} & ~{u}" for v, u in planes] + [str(mask)])
+	all_low = " & ".join([f"~({v} | {u})" for v, u in planes] + [str(mask)])
+	any_high = " | ".join([f"{v} & ~{u}" for v, u in planes] or ["0"])
+	any_low = " | ".join([f"~({v} | {u})" for v, u in planes] or ["0"])
+	if isinstance(g, (Xor, Xnor)):
+		node.comb = ["once = 0; twice = 0"]
+		for v, u in planes:
+			node.comb.append(f"high = {v} & ~{u}; twice |= once & high; once |= high")
+		node.comb.append(f"er = {any_unknown}")
+		invert = "~" if isinstance(g, Xnor) else ""
+		node.comb.append(f"{ov} = ({invert}(once & ~twice) | er) & {mask}; {ou} = er")
+	elif isinstance(g, (And, Nand)):
+		invert = "~" if isinstance(g, Nand) else ""
+		node.comb = [f"er = ({any_unknown}) & ~({any_low}) & {mask}", f"{ov} = ({invert}({all_high}) | er) & {mask}; {ou} = er"]
+	else:
+		invert = "~" if isinstance(g, Or) else ""
+		node.comb = [f"er = ({any_unknown}) & ~({any_high})", f"{ov} = ({invert}({all_low}) | er) & {mask}; {ou} = er"]
+	return node
+
+
+def emit_controlled_buffer(c: CompiledCircuit, g: ControlledBuffer) -> Node:
+	node = Node(g, [g.I, g.E], [g.O])
+	iv, iu = c.read(g.I)
+	ev, eu = c.read(g.E)
+	ov, ou = c.drive(g.O)
+	mask = (1 << g.width) - 1
+	node.comb = [
+		f"if {ev} & ~{eu} & 1:",
+		f"\t{ov} = {iv} | {iu}; {ou} = {iu}",
+		f"elif not (({ev} | {eu}) & 1):",
+		f"\t{ov} = 0; {ou} = {mask}",
+		"else:",
+		f"\t{ov} = {mask}; {ou} = {mask}",
+	]
+	return node
+
+
+def emit_constant(c: CompiledCircuit, g: Constant) -> Node:
+	c.drive(g.O)
+	return Node(g, [], [g.O])
+
+
+def emit_splitter(c: CompiledCircuit, g: Splitter) -> Node:
+	node = Node(g, list(g.inputs), list(g.outputs.values()))
+	covered = 0
+	values = []
+	unknowns = []
+	for port, indices in g.inputs.items():
+		pv, pu = c.read(port)
+		mapping = list(enumerate(indices))
+		values.append(gather(pv, mapping, c.literal))
+		unknowns.append(gather(pu, mapping, c.literal))
+		for index in indices:
+			covered |= 1 << index
+	floating = ((1 << g.width) - 1) & ~covered
+	node.comb = [f"sv = {' | '.join(values) or '0'}; su = {' | '.join(unknowns + [c.literal(floating)])}"]
+	for indices, port in g.outputs.items():
+		ov, ou = c.drive(port)
+		mapping = [(index, i) for i, index in enumerate(indices)]
+		node.comb.append(f"{ov} = {gather('sv', mapping, c.literal)}; {ou} = {gather('su', mapping, c.literal)}")
+	return node
+
+
+def emit_multiplexer(c: CompiledCircuit, g: Multiplexer) -> Node:
+	node = Node(g, [g.S] + list(g.inputs), [g.O])
+	sv, su = c.read(g.S)
+	ov, ou = c.drive(g.O)
+	mask = (1 << g.width) - 1
+	table = ", ".join("(%s, %s)" % c.read(p) for p in g.inputs)
+	node.comb = [
+		f"if {su} & ~{sv}:",
+		f"\t{ov} = 0; {ou} = {mask}",
+		f"elif {su}:",
+		f"\t{ov} = {mask}; {ou} = {mask}",
+		"else:",
+		f"\t{ov}, {ou} = ({table},)[{sv}]",
+	]
+	return node
+
+
+def emit_demultiplexer(c: CompiledCircuit, g: Demultiplexer) -> Node:
+	node = Node(g, [g.S, g.I], list(g.outputs))
+	sv, su = c.read(g.S)
+	iv, iu = c.read(g.I)
+	mask = (1 << g.width) - 1
+	idle = f"0, {mask}" if g.threestate else "0, 0"
+	for i, port in enumerate(g.outputs):
+		ov, ou = c.drive(port)
+		node.comb += [
+			f"if {su} & ~{sv}:",
+			f"\t{ov} = 0; {ou} = {mask}",
+			f"elif {su}:",
+			f"\t{ov} = {mask}; {ou} = {mask}",
+			f"elif {sv} == {i}:",
+			f"\t{ov} = {iv}; {ou} = {iu}",
+			"else:",
+			f"\t{ov}, {ou} = {idle}",
+		]
+	return node
+
+
+def emit_bit_selector(c: CompiledCircuit, g: BitSelector) -> Node:
+	node = Node(g, [g.S, g.I], [g.O])
+	sv, su = c.read(g.S)
+	iv, iu = c.read(g.I)
+	ov, ou = c.drive(g.O)
+	mask = (1 << g.o_width) - 1
+	node.comb = [
+		f"if {su}:",
+		f"\t{ov} = {mask}; {ou} = {mask}",
+		f"elif {sv} >= {g.i_width / g.o_width}:",
+		"\traise ValueError",
+		"else:",
+		f"\t{ov} = ({iv} >> ({sv} * {g.o_width})) & {mask}; {ou} = ({iu} >> ({sv} * {g.o_width})) & {mask}",
+	]
+	return node
+
+
+def emit_alu(c: CompiledCircuit, g: ALU) -> Node:
+	node = Node(g, [g.IA, g.IB, g.IC, g.M], [g.OA, g.OB])
+	av, au = c.read(g.IA)
+	bv, bu = c.read(g.IB)
+	mv, mu = c.read(g.M)
+	oav, oau = c.drive(g.OA)
+	obv, obu = c.drive(g.OB)
+	alu = c.const(g)
+	mask = (1 << g.width) - 1
+	# OB holds the carry or borrow, or the error, in bit 0 only
+	node.comb = [
+		f"if {au} or {bu} or {mu}:",
+		f"\t{oav} = {mask}; {oau} = {mask}; {obv} = 1; {obu} = 1",
+		"else:",
+		# Inlined ALU.compute
+		f"\tif not {mv}:",
+		f"\t\to = {av} + {bv} + {c.high(g.IC)}",
+		f"\telif {mv} == 1:",
+		f"\t\to = {av} - {bv} - {c.high(g.IC)}",
+		"\telse:",
+		f"\t\to = {alu}.compute({av}, {bv}, {c.high(g.IC)}, {mv})",
+		"\tif o is not None:",
+		f"\t\t{oav} = o & {mask}; {oau} = 0; {obv} = 1 if o >> {g.width} else 0; {obu} = 0",
+	]
+	return node
+
+
+def emit_register(c: CompiledCircuit, g: Register) -> Node:
+	# Any event runs on_change, which resets a register the edge wrote while R is high
+	node = Node(g, [g.R, g.OE, g.WE, g.D], [g.Q])
+	node.clock = g.C
+	sv, su = c.state(g.width, state_of(g, "state"), set_state_of(g, "state"))
+	dv, du = c.read(g.D)
+	qv, qu = c.drive(g.Q)
+	node.comb = [
+		f"if {c.high(g.R)}:",
+		f"\t{sv} = 0; {su} = 0",
+		f"if {c.high(g.OE)}:",
+		f"\t{qv} = {sv}; {qu} = {su}",
+		"else:",
+		f"\t{qv} = 0; {qu} = 0",
+	]
+	node.edge = [
+		f"if {c.high(g.R)}:",
+		f"\t{sv} = 0; {su} = 0",
+		f"if {c.high(g.WE)}:",
+		f"\t{sv} = {dv}; {su} = {du}",
+	]
+	node.split = 2
+	return node
+
+
+def emit_counter(c: CompiledCircuit, g: Counter) -> Node:
+	node = Node(g, [g.R, g.DS], [g.O, g.OF])
+	node.clock = g.C
+	sv, su = c.state(g.width, state_of(g, "state"), set_state_of(g, "state"))
+	dv, du = c.read(g.D)
+	ov, ou = c.drive(g.O)
+	fv, fu = c.drive(g.OF)
+	counter = c.const(g)
+	mask = (1 << g.width) - 1
+	node.comb = [
+		f"if {c.high(g.R)}:",
+		f"\t{sv} = 0; {su} = 0",
+		f"{ov} = {sv}; {ou} = {su}",
+		f"if {su}:",
+		f"\t{fv} = 1; {fu} = 1",
+		"else:",
+		f"\t{fv} = 1 if {sv} == ({g.max_value} if {c.nonzero(g.DS)} else 0) else 0; {fu} = 0",
+	]
+	node.edge = [
+		f"if {c.high(g.R)}:",
+		f"\t{sv} = 0; {su} = 0",
+		f"elif {c.high(g.MS)}:",
+		f"\t{sv} = {dv}; {su} = {du}",
+		f"elif {c.nonzero(g.CE)}:",
+		f"\tif {su}:",
+		f"\t\t{sv} = {mask}; {su} = {mask}",
+		"\telse:",
+		f"\t\tn = {counter}.count({sv}, {c.nonzero(g.DS)})",
+		"\t\tif n is None:",
+		f"\t\t\t{sv} = {dv}; {su} = {du}",
+		"\t\telse:",
+		f"\t\t\t{sv} = n; {su} = 0",
+	]
+	node.split = 2
+	return node
+
+
+def emit_flip_flop(c: CompiledCircuit, g: FlipFlop) -> Node:
+	if g.C.is_ranged:
+		raise UnsupportedComponentException(g, "is level triggered")
+	node = Node(g, flip_flop_inputs(g), [g.Q, g.Qi])
+	node.clock = g.C
+	fv, fu = c.state(1, state_of(g, "state"), set_state_of(g, "state"))
+	qv, qu = c.drive(g.Q)
+	iv, iu = c.drive(g.Qi)
+	node.comb = [
+		f"if {c.high(g.R)}:",
+		f"\t{fv} = 0; {fu} = 0",
+		f"{qv} = {fv}; {qu} = {fu}; {iv} = (~{fv} | {fu}) & 1; {iu} = {fu}",
+	]
+	if isinstance(g, DFlipFlop):
+		dv, du = c.read(g.D)
+		change = [f"\t{fv} = {dv} & 1; {fu} = {du} & 1"]
+	elif isinstance(g, TFlipFlop):
+		change = [f"\tif {c.high(g.T)}:", f"\t\t{fv} = (~{fv} | {fu}) & 1"]
+	elif isinstance(g, JKFlipFlop):
+		change = [
+			f"\tif {c.high(g.J)} and {c.high(g.K)}:",
+			f"\t\t{fv} = (~{fv} | {fu}) & 1",
+			f"\telif {c.high(g.J)}:",
+			f"\t\t{fv} = 1; {fu} = 0",
+			f"\telif {c.high(g.K)}:",
+			f"\t\t{fv} = 0; {fu} = 0",
+		]
+	else:
+		raise UnsupportedComponentException(g)
+	node.edge = [
+		f"if {c.high(g.R)}:",
+		f"\t{fv} = 0; {fu} = 0",
+		f"if {c.high(g.S)}:",
+		f"\t{fv} = 1; {fu} = 0",
+		"else:",
+	] + change
+	node.split = 2
+	return node
+
+
+def emit_sr_flip_flop(c: CompiledCircuit, g: SRFlipFlop) -> Node:
+	node = Node(g, [g.AR, g.AS], [g.Q, g.Qi])
+	node.clock = g.C
+	fv, fu = c.state(1, state_of(g, "state"), set_state_of(g, "state"))
+	qv, qu = c.drive(g.Q)
+	iv, iu = c.drive(g.Qi)
+	asynchronous = [f"if {c.high(g.AR)}:", f"\t{fv} = 0; {fu} = 0", f"elif {c.high(g.AS)}:", f"\t{fv} = 1; {fu} = 0"]
+	node.comb = asynchronous + [f"{qv} = {fv}; {qu} = {fu}; {iv} = (~{fv} | {fu}) & 1; {iu} = {fu}"]
+	node.edge = asynchronous + [
+		f"elif {c.high(g.S)}:",
+		f"\t{fv} = 1; {fu} = 0",
+		f"elif {c.high(g.R)}:",
+		f"\t{fv} = 0; {fu} = 0",
+	]
+	node.split = len(asynchronous)
+	return node
+
+
+def emit_shift_register(c: CompiledCircuit, g: ShiftRegister) -> Node:
+	node = Node(g, [g.R], list(g.outputs))
+	node.clock = g.C
+	stages = []
+	for i in range(g.stage_count):
+		getter = lambda i=i: g.stages[i]
+		setter = lambda s, i=i: g.stages.__setitem__(i, s)
+		stages.append(c.state(g.width, getter, setter))
+	node.comb = [f"if {c.high(g.R)}:"] + [f"\t{v} = 0; {u} = 0" for v, u in stages]
+	for (v, u), port in zip(stages, g.outputs):
+		ov, ou = c.drive(port)
+		node.comb.append(f"{ov} = {v}; {ou} = {u}")
+	node.edge = [f"if {c.high(g.R)}:"] + [f"\t{v} = 0; {u} = 0" for v, u in stages]
+	node.edge.append(f"elif {c.high(g.L)}:")
+	for (v, u), port in zip(stages, g.inputs):
+		pv, pu = c.read(port)
+		node.edge.append(f"\t{v} = {pv}; {u} = {pu}")
+	node.edge.append(f"elif {c.nonzero(g.S)}:")
+	for i in range(g.stage_count - 1, 0, -1):
+		node.edge.append(f"\t{stages[i][0]} = {stages[i - 1][0]}; {stages[i][1]} = {stages[i - 1][1]}")
+	sv, su = c.read(g.S_IN)
+	node.edge.append(f"\t{stages[0][0]} = {sv}; {stages[0][1]} = {su}")
+	node.split = 1 + g.stage_count
+	return node
+
+
+def emit_ram(c: CompiledCircuit, g: RAM) -> Node:
+	node = Node(g, [g.R, g.A, g.OE], [g.OUT])
+	node.clock = g.C
+	ram = c.const(g)
+	av, au = c.read(g.A)
+	dv, du = c.read(g.IN)
+	ov, ou = c.drive(g.OUT)
+	read = [f"st = {ram}.read(State.from_planes({g.addr_width}, {av}, {au}))", f"{ov} = st.value; {ou} = st.unknown"]
+	node.comb = [f"if {c.high(g.R)}:", f"\t{ram}.reset()"]
+	# An asynchronous read sees what the edge code wrote
+	node.split = len(node.comb)
+	if g.async_read:
+		node.comb += [f"if {c.high(g.OE)} and not {c.high(g.R)}:"] + ["\t" + line for line in read]
+	node.edge = [f"if not {c.high(g.R)}:"]
+	if not g.async_read:
+		node.edge += [f"\tif {c.high(g.OE)}:"] + ["\t\t" + line for line in read]
+	node.edge += [
+		f"\tif {c.high(g.WE)}:",
+		f"\t\t{ram}.write(State.from_planes({g.addr_width}, {av}, {au}), State.from_planes({g.data_width}, {dv}, {du}))",
+		"\tpass",
+	]
+	return node
+
+
+def emit_rom(c: CompiledCircuit, g: ROM) -> Node:
+	node = Node(g, [g.A, g.OE], [g.O])
+	rom = c.const(g)
+	av, au = c.read(g.A)
+	ov, ou = c.drive(g.O)
+	node.comb = [
+		f"if {c.high(g.OE)}:",
+		f"\tst = {rom}.read(State.from_planes({g.addr_width}, {av}, {au}))",
+		f"\t{ov} = st.value; {ou} = st.unknown",
+	]
+	return node
+
+
+EMITTERS = {
+	Not: emit_not,
+	Buffer: emit_buffer,
+	And: emit_gate,
+	Or: emit_gate,
+	Nand: emit_gate,
+	Nor: emit_gate,
+	Xor: emit_gate,
+	Xnor: emit_gate,
+	ControlledBuffer: emit_controlled_buffer,
+	Constant: emit_constant,
+	Splitter: emit_splitter,
+	Multiplexer: emit_multiplexer,
+	Demultiplexer: emit_demultiplexer,
+	BitSelector: emit_bit_selector,
+	ALU: emit_alu,
+	Register: emit_register,
+	Counter: emit_counter,
+	DFlipFlop: emit_flip_flop,
+	TFlipFlop: emit_flip_flop,
+	JKFlipFlop: emit_flip_flop,
+	SRFlipFlop: emit_sr_flip_flop,
+	ShiftRegister: emit_shift_register,
+	RAM: emit_ram,
+	ROM: emit_rom,
+}
@@ -18,26 +18,25 @@ class ALU:
 		self.IA.set_callback(self.on_change)
 		self.IB.set_callback(self.on_change)
 		self.IC.set_callback(self.on_change)
+		self.M.set_callback(self.on_change)
 
-	def on_change(self, state: State, port: Port):
-		mode = int(self.M.state)
+	def compute(self, a: int, b: int, c: int, mode: int) -> int | None:
 		if mode == 0:  # Addition
-			o = int(self.IA.state) + int(self.IB.state) + (1 if self.IC.state.get(0) == BitState.HIGH else 0)
-			if o > 2**(self.width / 2) - 1:
-				o -= 2**(self.width / 2) - 1
-				self.OB.state.set(0, BitState.HIGH)
-			else:
-				self.OB.state.set(0, BitState.LOW)
-			self.OA.set_state(State(self.width).from_int(o))
-			self.OB.set_state(self.OB.state)
+			return a + b + c
 		elif mode == 1:  # Subtraction
-			o = int(self.IA.state) - int(self.IB.state) - (1 if self.IC.state.get(0) == BitState.HIGH else 0)
-			if o < -(2**(self.width / 2)):
-				o += 2**(self.width / 2)
-				self.OB.state.set(0, BitState.HIGH)
-			else:
-				self.OB.state.set(0, BitState.LOW)
-			self.OA.set_state(State(self.width).from_int(o))
-			self.OB.set_state(self.OB.state)
-		else:
+			return a - b - c
+		return None
+
+	def on_change(self, state: State, port: Port):
+		if self.IA.state.unknown or self.IB.state.unknown or self.M.state.unknown:
+			self.OA.set_state(BitState.ERROR)
+			# OB carries the carry or borrow in bit 0 only
+			self.OB.set_state(State.from_planes(self.width, 1, 1))
+			return
+		carry = 1 if self.IC.state.get(0) == BitState.HIGH else 0
+		o = self.compute(self.IA.state.value, self.IB.state.value, carry, self.M.state.value)
+		if o is None:
 			print("Mode not (yet) supported/implemented.")
+			return
+		self.OA.set_state(State.from_planes(self.width, o))
+		self.OB.set_state(State.from_planes(self.width, o >> self.width & 1))
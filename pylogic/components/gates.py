@@ -1,3 +1,5 @@
+from abc import ABC, abstractmethod
+
 from ..classes import State
 from ..base_components import InputPort, OutputPort, Bus, TriggerPort, Port
 from ..enums import BitState, Edge, BufferSetting
@@ -13,15 +15,8 @@ class Not:
 		self.state = State(width)
 
 	def on_change(self, state: State, _):
-		for i in range(self.width):
-			if state.get(i) == BitState.FLOATING:
-				self.state.set(i, BitState.ERROR)
-			elif state.get(i) == BitState.ERROR:
-				self.state.set(i, BitState.ERROR)
-			elif state.get(i) == BitState.LOW:
-				self.state.set(i, BitState.HIGH)
-			elif state.get(i) == BitState.HIGH:
-				self.state.set(i, BitState.LOW)
+		# Inverting the value plane of an unknown bit turns FLOATING into ERROR
+		self.state = -state
 		self.O.set_state(self.state)
 
 
@@ -35,28 +30,16 @@ class Buffer:
 		self.setting = setting
 
 	def on_change(self, state: State, _):
-		for i in range(self.width):
-			if state.get(i) == BitState.FLOATING:
-				self.state.set(i, BitState.FLOATING)
-			elif state.get(i) == BitState.ERROR:
-				self.state.set(i, BitState.ERROR)
-			else:
-				if self.setting == BufferSetting.LOW_HIGH:
-					self.state.set(i, state.get(i))
-				elif self.setting == BufferSetting.LOW_FLOATING:
-					if state.get(i) == BitState.LOW:
-						self.state.set(i, BitState.LOW)
-					elif state.get(i) == BitState.HIGH:
-						self.state.set(i, BitState.FLOATING)
-				elif self.setting == BufferSetting.FLOATING_HIGH:
-					if state.get(i) == BitState.LOW:
-						self.state.set(i, BitState.FLOATING)
-					elif state.get(i) == BitState.HIGH:
-						self.state.set(i, BitState.HIGH)
+		if self.setting == BufferSetting.LOW_HIGH:
+			self.state = state.copy()
+		elif self.setting == BufferSetting.LOW_FLOATING:
+			self.state = State.from_planes(self.width, state.value & state.unknown, state.unknown | state.value)
+		elif self.setting == BufferSetting.FLOATING_HIGH:
+			self.state = State.from_planes(self.width, state.value, state.unknown | ~state.value)
 		self.O.set_state(self.state)
 
 
-class And:
+class Gate(ABC):
 	def __init__(self, width: int):
 		self.width = width
 		self.O = OutputPort(width)
@@ -66,132 +49,93 @@ class And:
 	def add_input(self):
 		ip = InputPort(self.width)
 		ip.set_callback(self.on_change)
+		self.inputs.append(ip)
 		return ip
 
 	def on_change(self, state: State, port: Port):
-		for i in range(self.width):
-			if all(p.state.get(i) == BitState.FLOATING or p.state.get(i) == BitState.ERROR for p in self.inputs):
-				self.state.set(i, BitState.ERROR)
-			elif all(p.state.get(i) == BitState.HIGH for p in self.inputs):
-				self.state.set(i, BitState.HIGH)
-			else:
-				self.state.set(i, BitState.LOW)
+		self.state = self.evaluate()
 		self.O.set_state(self.state)
 
+	@abstractmethod
+	def evaluate(self) -> State:
+		pass
 
-class Or:
-	def __init__(self, width: int):
-		self.width = width
-		self.O = OutputPort(width)
-		self.inputs: list[InputPort] = []
-		self.state = State(width)
+	def any_unknown(self) -> int:
+		out = 0
+		for p in self.inputs:
+			out |= p.state.unknown
+		return out
 
-	def add_input(self):
-		ip = InputPort(self.width)
-		ip.set_callback(self.on_change)
-		return ip
+	def any_high(self) -> int:
+		out = 0
+		for p in self.inputs:
+			out |= p.state.value & ~p.state.unknown
+		return out
 
-	def on_change(self, state: State, port: Port):
-		for i in range(self.width):
-			if any(p.state.get(i) == BitState.FLOATING or p.state.get(i) == BitState.ERROR for p in self.inputs):
-				self.state.set(i, BitState.ERROR)
-			elif all(p.state.get(i) == BitState.LOW for p in self.inputs):
-				self.state.set(i, BitState.LOW)
-			else:
-				self.state.set(i, BitState.HIGH)
-		self.O.set_state(self.state)
+	def all_high(self) -> int:
+		out = (1 << self.width) - 1
+		for p in self.inputs:
+			out &= p.state.value & ~p.state.unknown
+		return out
 
+	def any_low(self) -> int:
+		out = 0
+		for p in self.inputs:
+			out |= ~(p.state.value | p.state.unknown)
+		return out & ((1 << self.width) - 1)
 
-class Nand:
-	def __init__(self, width: int):
-		self.width = width
-		self.O = OutputPort(width)
-		self.inputs: list[InputPort] = []
-		self.state = State(width)
-
-	def add_input(self):
-		ip = InputPort(self.width)
-		ip.set_callback(self.on_change)
-		return ip
+	def all_low(self) -> int:
+		out = (1 << self.width) - 1
+		for p in self.inputs:
+			out &= ~(p.state.value | p.state.unknown)
+		return out
 
-	def on_change(self, state: State, port: Port):
-		for i in range(self.width):
-			if all(p.state.get(i) == BitState.FLOATING or p.state.get(i) == BitState.ERROR for p in self.inputs):
-				self.state.set(i, BitState.ERROR)
-			elif all(p.state.get(i) == BitState.HIGH for p in self.inputs):
-				self.state.set(i, BitState.LOW)
-			else:
-				self.state.set(i, BitState.HIGH)
-		self.O.set_state(self.state)
+	def one_high(self) -> int:
+		once = 0
+		twice = 0
+		for p in self.inputs:
+			high = p.state.value & ~p.state.unknown
+			twice |= once & high
+			once |= high
+		return once & ~twice
 
 
-class Nor:
-	def __init__(self, width: int):
-		self.width = width
-		self.O = OutputPort(width)
-		self.inputs: list[InputPort] = []
-		self.state = State(width)
+class And(Gate):
+	def evaluate(self) -> State:
+		# A low input decides the output, whatever the others are, as in Logisim
+		error = self.any_unknown() & ~self.any_low()
+		return State.from_planes(self.width, self.all_high() | error, error)
 
-	def add_input(self):
-		ip = InputPort(self.width)
-		ip.set_callback(self.on_change)
-		return ip
 
-	def on_change(self, state: State, port: Port):
-		for i in range(self.width):
-			if any(p.state.get(i) == BitState.FLOATING or p.state.get(i) == BitState.ERROR for p in self.inputs):
-				self.state.set(i, BitState.ERROR)
-			elif all(p.state.get(i) == BitState.LOW for p in self.inputs):
-				self.state.set(i, BitState.HIGH)
-			else:
-				self.state.set(i, BitState.LOW)
-		self.O.set_state(self.state)
+class Or(Gate):
+	def evaluate(self) -> State:
+		# A high input decides the output, whatever the others are, as in Logisim
+		error = self.any_unknown() & ~self.any_high()
+		return State.from_planes(self.width, ~self.all_low() | error, error)
 
 
-class Xor:
-	def __init__(self, width: int):
-		self.width = width
-		self.O = OutputPort(width)
-		self.inputs: list[InputPort] = []
-		self.state = State(width)
+class Nand(Gate):
+	def evaluate(self) -> State:
+		error = self.any_unknown() & ~self.any_low()
+		return State.from_planes(self.width, ~self.all_high() | error, error)
 
-	def add_input(self):
-		ip = InputPort(self.width)
-		ip.set_callback(self.on_change)
-		return ip
 
-	def on_change(self, state: State, port: Port):
-		for i in range(self.width):
-			if any(p.state.get(i) == BitState.FLOATING or p.state.get(i) == BitState.ERROR for p in self.inputs):
-				self.state.set(i, BitState.ERROR)
-			elif [p.state.get(i) for p in self.inputs].count(BitState.HIGH) == 1:
-				self.state.set(i, BitState.HIGH)
-			else:
-				self.state.set(i, BitState.LOW)
-		self.O.set_state(self.state)
+class Nor(Gate):
+	def evaluate(self) -> State:
+		error = self.any_unknown() & ~self.any_high()
+		return State.from_planes(self.width, self.all_low() | error, error)
 
 
-class Xor:
-	def __init__(self, width: int):
-		self.width = width
-		self.O = OutputPort(width)
-		self.inputs: list[InputPort] = []
-		self.state = State(width)
+class Xor(Gate):
+	def evaluate(self) -> State:
+		error = self.any_unknown()
+		return State.from_planes(self.width, self.one_high() | error, error)
 
-	def add_input(self):
-		ip = InputPort(self.width)
-		ip.set_callback(self.on_change)
-		return ip
 
-	def on_change(self, state: State, port: Port):
-		for i in range(self.width):
-			if any(p.state.get(i) == BitState.FLOATING or p.state.get(i) == BitState.ERROR for p in self.inputs):
-				self.state.set(i, BitState.ERROR)
-			elif [p.state.get(i) for p in self.inputs].count(BitState.HIGH) == 1:
-				self.state.set(i, BitState.LOW)
-			else:
-				self.state.set(i, BitState.HIGH)
-		self.O.set_state(self.state)
+class Xnor(Gate):
+	def evaluate(self) -> State:
+		error = self.any_unknown()
+		return State.from_planes(self.width, ~self.one_high() | error, error)
 
 
 class ControlledBuffer:
@@ -202,21 +146,15 @@ class ControlledBuffer:
 		self.E = InputPort(1)
 		self.O = OutputPort(width)
 		self.I.set_callback(self.on_change)
-		self.E.set_callback(self.on_e_change)
+		self.E.set_callback(self.on_change)
 
 	def on_change(self, state: State, _):
-		for i in range(self.width):
-			if state.get(i) == BitState.FLOATING or state.get(i) == BitState.ERROR:
-				self.state.set(i, BitState.ERROR)
-			else:
-				self.state.set(i, state.get(i))
-		if self.E.state.get(0) == BitState.HIGH:
-			self.O.set_state(self.state)
-
-	def on_e_change(self, state: State, _):
-		if state.get(0) == BitState.HIGH:
-			self.O.set_state(self.state)
-		elif state.get(0) == BitState.LOW:
-			self.O.set_state(State(self.width))
+		enable = self.E.state.get(0)
+		if enable == BitState.HIGH:
+			i = self.I.state
+			self.state = State.from_planes(self.width, i.value | i.unknown, i.unknown)
+		elif enable == BitState.LOW:
+			self.state = State(self.width)
 		else:
-			self.O.set_state(State(self.width, starter=BitState.ERROR))
+			self.state = State(self.width, starter=BitState.ERROR)
+		self.O.set_state(self.state)
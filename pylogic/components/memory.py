@@ -1,10 +1,13 @@
+import atexit
+import json
 from abc import ABC
 from operator import xor
 from typing import Callable
 import math
+import weakref
 
 from ..util import *
-from ..classes import State
+from ..classes import State, PagedMemory
 from ..base_components import InputPort, OutputPort, Bus, TriggerPort, Port
 from ..enums import BitState, Edge, BufferSetting, OverflowSetting
 from ..errors import WidthMismatchException
@@ -21,20 +24,22 @@ class FlipFlop(ABC):
 		self.change_cb: Callable[[None], BitState] = lambda: BitState.FLOATING
 		self.S.set_callback(self.on_change)
 		self.R.set_callback(self.on_change)
+		self.C.set_callback(self.on_change)
 
 	def set_change_callback(self, callback: Callable[[None], BitState]):
 		self.change_cb = callback
 
 	def on_change(self, state: State, port: Port):
+		# States are shared with the buses they are posted to, so never modify one in place
 		if self.R:
-			self.state.set(0, BitState.LOW)
-		if self.C.is_active():
+			self.state = State(1, starter=BitState.LOW)
+		if self.C.is_active:
 			if self.S:
-				self.state.set(0, BitState.HIGH)
+				self.state = State(1, starter=BitState.HIGH)
 			else:
-				self.state.set(0, self.change_cb())
-			self.Q.set_state(self.state)
-			self.Qi.set_state(-self.state)
+				self.state = State(1, starter=self.change_cb())
+		self.Q.set_state(self.state)
+		self.Qi.set_state(-self.state)
 
 
 class DFlipFlop(FlipFlop):
@@ -56,8 +61,9 @@ class TFlipFlop(FlipFlop):
 		self.set_change_callback(self.change)
 
 	def change(self):
-		if self.T.state.get(0):
+		if self.T.state.get(0) == BitState.HIGH:
 			return -self.state.get(0)
+		return self.state.get(0)
 
 
 class JKFlipFlop(FlipFlop):
@@ -70,12 +76,15 @@ class JKFlipFlop(FlipFlop):
 		self.set_change_callback(self.change)
 
 	def change(self):
-		if self.J.state.get(0) and self.K.state.get(0):
+		j = self.J.state.get(0) == BitState.HIGH
+		k = self.K.state.get(0) == BitState.HIGH
+		if j and k:
 			return -self.state.get(0)
-		elif self.J.state.get(0):
+		elif j:
 			return BitState.HIGH
-		elif self.J.state.get(0):
+		elif k:
 			return BitState.LOW
+		return self.state.get(0)
 
 
 class SRFlipFlop(FlipFlop):
@@ -83,15 +92,31 @@ class SRFlipFlop(FlipFlop):
 		super().__init__(clock_edge)
 		self.S = InputPort(1)
 		self.R = InputPort(1)
+		# S and R are clocked, so setting and resetting at once have ports of their own
+		self.AS = TriggerPort(Edge.HIGH)
+		self.AR = TriggerPort(Edge.HIGH)
 		self.S.set_callback(self.on_change)
 		self.R.set_callback(self.on_change)
+		self.AS.set_callback(self.on_change)
+		self.AR.set_callback(self.on_change)
 		self.set_change_callback(self.change)
 
+	def on_change(self, state: State, port: Port):
+		if self.AR:
+			self.state = State(1, starter=BitState.LOW)
+		elif self.AS:
+			self.state = State(1, starter=BitState.HIGH)
+		elif self.C.is_active:
+			self.state = State(1, starter=self.change())
+		self.Q.set_state(self.state)
+		self.Qi.set_state(-self.state)
+
 	def change(self):
-		if self.S.state.get(0):
-			return BitState.LOW
-		elif self.S.state.get(0):
+		if self.S.state.get(0) == BitState.HIGH:
 			return BitState.HIGH
+		elif self.R.state.get(0) == BitState.HIGH:
+			return BitState.LOW
+		return self.state.get(0)
 
 
 class Register:
@@ -110,12 +135,13 @@ class Register:
 		self.WE.set_callback(self.on_change)
 		self.OE.set_callback(self.on_change)
 		self.R.set_callback(self.on_change)
+		self.C.set_callback(self.on_change)
 		self.Q.set_state(self.state)
 
-	def on_change(self):
+	def on_change(self, state: State, port: Port):
 		if self.R:
 			self.state = State(self.width, starter=BitState.LOW)
-		if self.C.is_active():
+		if self.C.is_active:
 			if self.WE:
 				self.state = self.D.state
 		if self.OE:
@@ -157,33 +183,42 @@ class Counter:
 		self.OF = OutputPort(1)
 		self.O = OutputPort(width)
 
+	def count(self, value: int, up: bool) -> int | None:
+		# Returns the next counter value, or None when the D input should be loaded
+		new_int = value + (1 if up else -1)
+		if 0 <= new_int <= self.max_value:
+			return new_int
+		if self.overflow_setting == OverflowSetting.WRAP:
+			return 0 if up else self.max_value
+		elif self.overflow_setting == OverflowSetting.STAY:
+			return value
+		elif self.overflow_setting == OverflowSetting.LOAD:
+			return None
+		else:
+			return new_int & ((1 << self.width) - 1)
+
+	def overflows(self, value: int, up: bool) -> bool:
+		return value == (self.max_value if up else 0)
+
 	def on_change(self, state: State, port: Port):
 		if self.R:
 			self.state = State(self.width, starter=BitState.LOW)
-		elif (not self.C) and self.MS:
-			self.state = self.D.state
-		elif self.C.is_active() and not self.MS:
-			new_int = int(self.state) + (1 if self.DS else -1)
-
-			if (self.DS and new_int > self.max_value) or ((not self.DS) and new_int < 0):
-				upper_end = new_int > self.max_value
-				if self.overflow_setting == OverflowSetting.WRAP:
-					self.state = State(self.width).from_int(0 if upper_end else self.max_value)
-				elif self.overflow_setting == OverflowSetting.STAY:
-					return
-				elif self.overflow_setting == OverflowSetting.LOAD:
-					self.state = self.D.state
+		elif self.C.is_active:
+			if self.MS:
+				self.state = self.D.state
+			elif self.CE.nonzero:
+				if self.state.unknown:
+					self.state = State(self.width, starter=BitState.ERROR)
 				else:
-					if new_int > (2 ** self.width) - 1:
-						new_int = 0
-			else:
-				self.state = State(self.width).from_int(new_int)
-			self.O.set_state(self.state)
-
-			if (self.DS and new_int == self.max_value) or ((not self.DS) and new_int == 0):
-				self.OF.set_state(BitState.HIGH)
-			else:
-				self.OF.set_state(BitState.LOW)
+					new_int = self.count(self.state.value, self.DS.nonzero)
+					self.state = self.D.state if new_int is None else State.from_planes(self.width, new_int)
+		self.O.set_state(self.state)
+		if self.state.unknown:
+			self.OF.set_state(BitState.ERROR)
+		elif self.overflows(self.state.value, self.DS.nonzero):
+			self.OF.set_state(BitState.HIGH)
+		else:
+			self.OF.set_state(BitState.LOW)
 
 
 class ShiftRegister:
@@ -231,6 +266,18 @@ class ShiftRegister:
 
 # Random generator left out, maybe later
 
+# The non-volatile RAMs alive in this process by the path of their store, so that two cannot share one file
+STORES: "weakref.WeakValueDictionary[str, RAM]" = weakref.WeakValueDictionary()
+
+
+def checkpoint_at_exit(ram: "weakref.ref[RAM]") -> Callable[[], None]:
+	"""An exit hook that checkpoints a RAM without keeping it alive."""
+	def hook():
+		memory = ram()
+		if memory is not None:
+			memory.checkpoint()
+	return hook
+
 
 class RAM:
 	def __init__(
@@ -240,10 +287,16 @@ class RAM:
 			volatile: bool = True,
 			edge: Edge = Edge.RISING,
 			async_read: bool = False,
+			name: str = None,
+			image_path: str = None,
 	):
 		self.addr_width = addr_width
 		self.data_width = data_width
+		self.volatile = volatile
 		self.async_read = async_read
+		self.name = name
+		self.store: RamStore | None = None
+		self.exit_hook: Callable[[], None] | None = None
 
 		self.R = TriggerPort(Edge.HIGH)
 		self.A = InputPort(addr_width)
@@ -254,11 +307,24 @@ class RAM:
 		self.IN = InputPort(data_width)
 		self.OUT = OutputPort(data_width)
 
-		self.locs: list[State] = [State(data_width, starter=BitState.LOW) for _ in range(2**addr_width)]
+		self.locs = PagedMemory(addr_width, data_width)
+		if image_path is not None:
+			self.locs.image = open_image(image_path, data_width)
 
 		if not volatile:
-			dump = fetch_ram_dump(self.__name__)
-			self.locs = [State(data_width).from_int(point) for point in dump]
+			# The name is the file the contents are kept in, so a default one would mix up the contents of two RAMs
+			if name is None:
+				raise ValueError("A non-volatile RAM needs a name for its store")
+			self.store = RamStore(name, addr_width, data_width)
+			if self.store.path in STORES:
+				raise ValueError(f"Another RAM already keeps its contents in {self.store.path}")
+			STORES[self.store.path] = self
+			for page, cells in self.store.load().items():
+				start = page << self.store.page_bits
+				for i, (value, unknown) in enumerate(cells):
+					self.locs.set(start + i, value, unknown)
+			self.exit_hook = checkpoint_at_exit(weakref.ref(self))
+			atexit.register(self.exit_hook)
 
 		self.R.set_callback(self.on_change)
 		self.A.set_callback(self.on_change)
@@ -267,15 +333,51 @@ class RAM:
 		self.C.set_callback(self.on_change)
 		self.IN.set_callback(self.on_change)
 
+	def read(self, address: State) -> State:
+		if address.unknown:
+			return State(self.data_width, starter=BitState.ERROR)
+		return self.locs[address.value]
+
+	def write(self, address: State, state: State):
+		if not address.unknown:
+			self.locs[address.value] = state
+			if self.store is not None:
+				self.store.touch(address.value)
+
+	def reset(self):
+		self.locs.clear()
+		if self.store is not None:
+			self.store.clear()
+
+	def flush(self, block: bool = True):
+		if self.store is not None:
+			self.store.flush(self.locs, block)
+
+	def checkpoint(self):
+		if self.store is not None:
+			self.store.checkpoint(self.locs)
+
+	def close(self):
+		"""Checkpoints a non-volatile RAM and releases its store; the RAM keeps its contents but no longer saves them."""
+		if self.store is None:
+			return
+		self.checkpoint()
+		atexit.unregister(self.exit_hook)
+		STORES.pop(self.store.path, None)
+		self.store = None
+		self.exit_hook = None
+
 	def on_change(self, state: State, port: Port):
 		if self.R:
-			self.locs: list[State] = [State(self.data_width, starter=BitState.LOW) for _ in range(2**self.addr_width)]
+			self.reset()
 		else:
-			if (self.async_read or self.C.is_active) and self.OE:
-				self.OUT.set_state(self.locs[int(self.A.state)])
-			if self.WE and self.C.is_active:
-				self.locs[int(self.A.state)] = self.IN.state
-		update_ram_dump(self.__name__, [int(point) for point in self.locs])
+			if self.C.is_active:
+				if self.OE and not self.async_read:
+					self.OUT.set_state(self.read(self.A.state))
+				if self.WE:
+					self.write(self.A.state, self.IN.state)
+			if self.OE and self.async_read:
+				self.OUT.set_state(self.read(self.A.state))
 
 
 class ROM:
@@ -292,13 +394,26 @@ class ROM:
 		self.OE = TriggerPort(Edge.HIGH)
 		self.O = OutputPort(data_width)
 
-		if start_data_path is None:
-			self.locs: list[State] = [State(data_width, starter=BitState.LOW) for _ in range(2 ** addr_width)]
-		else:
+		self.A.set_callback(self.on_change)
+		self.OE.set_callback(self.on_change)
+
+		self.locs = PagedMemory(addr_width, data_width)
+		if start_data_path is not None and start_data_path.endswith(".json"):
 			with open(start_data_path) as f:
 				data = json.load(f)
-			self.locs: list[State] = [State(data_width).from_int(point) for point in data]
+			mask = (1 << data_width) - 1
+			for address, point in enumerate(data):
+				# Words are stored two's complement, so negative ones wrap like State.from_int
+				self.locs.set(address, point & mask)
+		elif start_data_path is not None:
+			# Raw binary and v2.0 raw images are mapped and decoded per word on first read
+			self.locs.image = open_image(start_data_path, data_width)
+
+	def read(self, address: State) -> State:
+		if address.unknown:
+			return State(self.data_width, starter=BitState.ERROR)
+		return self.locs[address.value]
 
 	def on_change(self, state: State, port: Port):
 		if self.OE:
-			self.O.set_state(self.locs[int(self.A.state)])
+			self.O.set_state(self.read(self.A.state))
@@ -1,9 +1,11 @@
 import time
+from typing import Callable
 
 from ..classes import State
 from ..base_components import InputPort, OutputPort, Bus, TriggerPort, Port
 from ..enums import BitState, Edge
 from ..errors import WidthMismatchException
+from ..simulator import get_simulator
 
 
 class Splitter:
@@ -11,9 +13,10 @@ class Splitter:
 		self.width = width
 		self.state = State(width)
 		self.inputs: dict[InputPort, list[int]] = {}
-		self.outputs: dict[list[int], OutputPort] = {}
+		self.outputs: dict[tuple[int, ...], OutputPort] = {}
 
 	def add_output(self, indices: list[int]):
+		indices = tuple(indices)
 		self.outputs[indices] = OutputPort(len(indices))
 		return self.outputs[indices]
 
@@ -31,9 +34,13 @@ class Splitter:
 	def on_input_change(self, state: State, ip: Port):
 		if not isinstance(ip, InputPort):
 			raise TypeError(type(ip))
-		indices = self.inputs[ip]
-		for i in range(len(indices)):
-			self.state.set(indices[i], state.get(i))
+		# Several inputs may have changed within one delta, so rebuild from all of them, into a new State since
+		# snapshots keep the old one
+		state = self.state.copy()
+		for port, indices in self.inputs.items():
+			for i in range(len(indices)):
+				state.set(indices[i], port.state.get(i))
+		self.state = state
 		for k, v in self.outputs.items():
 			s = State(len(k))
 			for i in range(len(k)):
@@ -45,49 +52,73 @@ class PullResistor:
 	def __init__(self, width: int, setting: BitState):
 		self.width = width
 		self.setting = setting
-		self._I = InputPort(width)
-		self._I.set_callback(self.on_input_change)
-		self._O = OutputPort(width)
-
-	def on_input_change(self, state):
-		n_state = State(self.width)
-		if self.setting == BitState.FLOATING:
-			n_state = state
-		elif self.setting == BitState.ERROR:
-			n_state.set_all(BitState.ERROR)
-		else:
-			for i in range(self.width):
-				if state.get(i) == BitState.FLOATING:
-					n_state.set(i, self.setting)
-		self._O.set_state(n_state)
 
 	def set_b(self, bus: Bus):
 		if bus.width > self.width:
-			raise WidthMismatchException(bus, self._O)
-		self._I.set_b(bus)
-		self._O.set_b(bus)
+			raise WidthMismatchException(bus, self)
+		bus.set_pull(self.setting)
 
 
 class Clock:
-	def __init__(self, frequency: int):
-		super().__init__()
+	"""
+	A clock running on simulated time: every half period advances the simulator's time instead of sleeping.
+
+	Driving it is up to run, run_until or run_free, which return once their cycles are done or the I input stops
+	the clock. With realtime set, it waits whenever simulated time gets ahead of wall-clock time.
+	"""
+
+	def __init__(self, frequency: float, realtime: bool = False):
 		self.frequency = frequency
-		self.running = True
+		self.realtime = realtime
+		self.running = False
+		self.cycles = 0
+		self.epoch = (0.0, 0.0)
 		self.T = TriggerPort(Edge.RISING)
 		self.I = TriggerPort(Edge.RISING)
 		self.T.set_callback(self.start)
 		self.I.set_callback(self.stop)
 		self.C = OutputPort(1)
 
-	def start(self):
-		while self.running:
-			self.C.set_state(BitState.HIGH)
-			time.sleep(1 / (self.frequency / 2))
-			self.C.set_state(BitState.LOW)
-			time.sleep(1 / (self.frequency / 2))
+	def start(self, state: State = None, port: Port = None):
+		if port is None or self.T.is_active:
+			self.running = True
+
+	def stop(self, state: State = None, port: Port = None):
+		if port is None or self.I.is_active:
+			self.running = False
+
+	def half_cycle(self, level: BitState):
+		simulator = get_simulator()
+		simulator.advance(1 / (self.frequency * 2))
+		self.C.set_state(level)
+		if self.realtime:
+			wall, simulated = self.epoch
+			ahead = (simulator.time - simulated) - (time.perf_counter() - wall)
+			if ahead > 0:
+				time.sleep(ahead)
+
+	def cycle(self):
+		self.half_cycle(BitState.HIGH)
+		self.half_cycle(BitState.LOW)
+		self.cycles += 1
+
+	def run_until(self, condition: Callable[[], bool], limit: int | None = None) -> int:
+		"""Runs whole cycles until condition() holds after one of them, the clock is stopped or limit cycles have run."""
+		self.running = True
+		self.epoch = (time.perf_counter(), get_simulator().time)
+		count = 0
+		while self.running and (limit is None or count < limit):
+			self.cycle()
+			count += 1
+			if condition():
+				break
+		return count
+
+	def run(self, cycles: int) -> int:
+		return self.run_until(lambda: False, cycles)
 
-	def stop(self):
-		self.running = False
+	def run_free(self) -> int:
+		return self.run_until(lambda: False)
 
 
 class Constant:
@@ -107,7 +138,7 @@ class Constant:
 		self.push()
 
 	def push(self):
-		self.O.set_state(self.state)
+		self.O.set_state(self.state.copy())
 
 
 class Readout:
@@ -117,5 +148,5 @@ class Readout:
 		self.I.set_callback(self.on_input_change)
 		self.name = name
 
-	def on_input_change(self, state: State):
+	def on_input_change(self, state: State, port: Port):
 		print(f"{self.name}: {state}")
\ No newline at end of file
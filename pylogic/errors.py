@@ -1,10 +1,59 @@
-from .base_components import *
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+	from .base_components import Port, Bus
 
 
 class WidthMismatchException(Exception):
-	def __init__(self, p1: Port | Bus, p2: Port | Bus):
+	def __init__(self, p1: "Port | Bus", p2: "Port | Bus"):
 		self.p1 = p1
 		self.p2 = p2
 
 	def __str__(self):
-		return f"Width {self.p1.width} of {self.p1.__name__} does not match width {self.p2.width} of {self.p2.__name__}"
+		return f"Width {self.p1.width} of {type(self.p1).__name__} does not match width {self.p2.width} of {type(self.p2).__name__}"
+
+
+class WidthConflictException(Exception):
+	def __init__(self, where: str, port_width: int, net_width: int):
+		self.where = where
+		self.port_width = port_width
+		self.net_width = net_width
+
+	def __str__(self):
+		return f"{self.where}: {self.port_width} bit port on a {self.net_width} bit net"
+
+
+class OscillationException(Exception):
+	def __init__(self, sim_limit: int):
+		self.sim_limit = sim_limit
+
+	def __str__(self):
+		return f"Circuit did not settle within {self.sim_limit} delta cycles (oscillation apparent)"
+
+
+class UnsupportedComponentException(Exception):
+	def __init__(self, component, reason: str = "has no compiled equivalent"):
+		self.component = component
+		self.reason = reason
+
+	def __str__(self):
+		return f"{type(self.component).__name__} {self.reason}"
+
+
+class CombinationalLoopException(Exception):
+	def __init__(self, components: list):
+		self.components = components
+
+	def __str__(self):
+		return f"Combinational loop through {', '.join(type(c).__name__ for c in self.components)}"
+
+
+class DivergenceException(Exception):
+	def __init__(self, cycle: int, location: str, expected, actual):
+		self.cycle = cycle
+		self.location = location
+		self.expected = expected
+		self.actual = actual
+
+	def __str__(self):
+		return f"Engines diverged in cycle {self.cycle} on {self.location}: event-driven {self.expected}, compiled {self.actual}"
@@ -0,0 +1,166 @@
+"""Small circuits shared by the engine tests, each built from fresh objects and returning its clock and components."""
+import os
+
+from pylogic.base_components import Bus
+from pylogic.components.arithmatic import ALU
+from pylogic.components.gates import And, Nand, Or, Nor, Xor, Xnor, Not, ControlledBuffer
+from pylogic.components.memory import TFlipFlop, Counter, Register, RAM
+from pylogic.components.plexers import Demultiplexer
+from pylogic.components.wiring import Constant, Splitter
+from pylogic.enums import Edge
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CIRCUIT = os.path.join(ROOT, "Circuit.circ")
+
+
+class Builder:
+	def __init__(self):
+		self.clock = Bus(1)
+		self.components = []
+
+	def add(self, component):
+		self.components.append(component)
+		return component
+
+	def const(self, width: int, value: int) -> Bus:
+		bus = Bus(width)
+		self.add(Constant(width, value)).set_b(bus)
+		return bus
+
+	def counter(self, width: int) -> tuple[Bus, list[Bus]]:
+		"""A free-running counter and a bus for every one of its bits."""
+		count = self.add(Counter(width))
+		high = self.const(1, 1)
+		count.CE.set_b(high)
+		count.DS.set_b(high)
+		count.C.set_b(self.clock)
+		split = self.add(Splitter(width))
+		split.add_input(list(range(width))).set_b(count.O.get_b())
+		return count.O.bus, [split.add_output([i]).get_b() for i in range(width)]
+
+
+def gates() -> tuple[Bus, list, list[Bus]]:
+	"""Every kind of gate on inputs a counter drives low, high, floating and in conflict through tri-state buffers."""
+	b = Builder()
+	_, bits = b.counter(6)
+	inputs = []
+	for a, first, second in (bits[0:3], bits[3:6]):
+		x = Bus(1)
+		buffer = b.add(ControlledBuffer(1))
+		buffer.I.set_b(a)
+		buffer.E.set_b(first)
+		buffer.O.set_b(x)
+		inverter = b.add(Not(1))
+		inverter.I.set_b(a)
+		buffer = b.add(ControlledBuffer(1))
+		buffer.I.set_b(inverter.O.get_b())
+		buffer.E.set_b(second)
+		buffer.O.set_b(x)
+		inputs.append(x)
+	outputs = []
+	for kind in (And, Nand, Or, Nor, Xor, Xnor):
+		gate = b.add(kind(1))
+		for x in inputs:
+			gate.add_input().set_b(x)
+		outputs.append(gate.O.get_b())
+	return b.clock, b.components, inputs + outputs
+
+
+def derived() -> tuple[Bus, list, list[Bus]]:
+	"""A ripple counter, a counter on a gated clock and a register clocked by a decoder output."""
+	b = Builder()
+	high = b.const(1, 1)
+	source, bits = b.clock, []
+	for _ in range(3):
+		flip_flop = b.add(TFlipFlop(Edge.FALLING))
+		flip_flop.T.set_b(high)
+		flip_flop.C.set_b(source)
+		source = flip_flop.Q.get_b()
+		bits.append(source)
+	gate = b.add(And(1))
+	gate.add_input().set_b(b.clock)
+	gate.add_input().set_b(bits[2])
+	count = b.add(Counter(4))
+	count.CE.set_b(high)
+	count.DS.set_b(high)
+	count.C.set_b(gate.O.get_b())
+	split = b.add(Splitter(4))
+	split.add_input([0, 1, 2, 3]).set_b(count.O.get_b())
+	decoder = b.add(Demultiplexer(1, 2))
+	decoder.S.set_b(split.add_output([0, 1]).get_b())
+	decoder.I.set_b(high)
+	register = b.add(Register(4, Edge.RISING))
+	register.D.set_b(count.O.bus)
+	register.WE.set_b(high)
+	register.OE.set_b(high)
+	register.C.set_b(decoder.outputs[2].get_b())
+	return b.clock, b.components, bits + [gate.O.bus, count.O.bus, decoder.outputs[2].bus, register.Q.get_b()]
+
+
+def memory() -> tuple[Bus, list, list[Bus]]:
+	"""
+	An asynchronous RAM whose output enable glitches through an Xor, a synchronous RAM and a register with a reset,
+	all written from a counter.
+	"""
+	b = Builder()
+	count, bits = b.counter(6)
+	address = b.add(Splitter(6))
+	address.add_input(list(range(6))).set_b(count)
+	address = address.add_output([0, 1, 2, 3]).get_b()
+	data = b.add(Not(6))
+	data.I.set_b(count)
+	enable = b.add(Xor(1))
+	enable.add_input().set_b(bits[5])
+	enable.add_input().set_b(bits[0])
+	watched = [enable.O.get_b()]
+	for async_read in (True, False):
+		ram = b.add(RAM(4, 6, async_read=async_read))
+		ram.A.set_b(address)
+		ram.IN.set_b(data.O.get_b())
+		ram.WE.set_b(bits[4])
+		ram.OE.set_b(enable.O.bus)
+		ram.C.set_b(b.clock)
+		watched.append(ram.OUT.get_b())
+	reset = b.add(And(1))
+	reset.add_input().set_b(bits[3])
+	reset.add_input().set_b(bits[2])
+	register = b.add(Register(6, Edge.RISING))
+	register.D.set_b(watched[1])
+	register.WE.set_b(bits[1])
+	register.OE.set_b(b.const(1, 1))
+	register.R.set_b(reset.O.get_b())
+	register.C.set_b(b.clock)
+	return b.clock, b.components, watched + [register.Q.get_b()]
+
+
+def arithmetic(width: int = 32) -> tuple[Bus, list, list[Bus]]:
+	"""An accumulator fed back through an ALU and wide gates."""
+	b = Builder()
+	count = b.add(Counter(width))
+	high = b.const(1, 1)
+	count.CE.set_b(high)
+	count.DS.set_b(high)
+	count.R.set_b(b.const(1, 0))
+	count.C.set_b(b.clock)
+	accumulator = b.add(Register(width, Edge.RISING))
+	accumulator.C.set_b(b.clock)
+	accumulator.WE.set_b(high)
+	accumulator.OE.set_b(high)
+	alu = b.add(ALU(width))
+	alu.IA.set_b(accumulator.Q.get_b())
+	alu.IB.set_b(count.O.get_b())
+	alu.IC.set_b(b.const(width, 0))
+	alu.M.set_b(b.const(1, 0))
+	mix = b.add(Xor(width))
+	mix.add_input().set_b(alu.OA.get_b())
+	mix.add_input().set_b(count.O.bus)
+	inverter = b.add(Not(width))
+	inverter.I.set_b(mix.O.get_b())
+	mask = b.add(And(width))
+	mask.add_input().set_b(inverter.O.get_b())
+	mask.add_input().set_b(b.const(width, (1 << (width - 1)) - 1))
+	accumulator.D.set_b(mask.O.get_b())
+	return b.clock, b.components, [accumulator.Q.bus, mask.O.bus]
+
+
+CIRCUITS = {"gates": gates, "derived": derived, "memory": memory, "arithmetic": arithmetic}
@@ -0,0 +1,13 @@
+import pytest
+
+from pylogic.simulator import Simulator, get_simulator, set_simulator
+
+
+@pytest.fixture(autouse=True)
+def simulator():
+	"""A fresh simulator for every test, so counters and delta cycles start at zero."""
+	previous = get_simulator()
+	fresh = Simulator()
+	set_simulator(fresh)
+	yield fresh
+	set_simulator(previous)
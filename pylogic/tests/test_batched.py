@@ -0,0 +1,101 @@
+import os
+
+import pytest
+
+from pylogic.base_components import Bus
+from pylogic.batched import compile_batched
+from pylogic.classes import State
+from pylogic.components.gates import Xor
+from pylogic.components.memory import RAM
+from pylogic.components.wiring import Splitter
+from pylogic.compiler import compile_circuit
+
+from .circuits import CIRCUITS, CIRCUIT, Builder
+
+LANES = 3
+
+
+@pytest.mark.parametrize("name", CIRCUITS)
+def test_every_lane_matches_the_compiled_engine(name):
+	clock, components, watched = CIRCUITS[name]()
+	batch = compile_batched(components, clock, LANES)
+	single = compile_circuit(components, clock)
+	for _ in range(64):
+		batch.run(1)
+		single.run(1)
+		for bus in watched:
+			assert batch.net_states(bus) == [single.net_state(bus)] * LANES
+
+
+@pytest.mark.parametrize("name", CIRCUITS)
+def test_lane_zero_matches_the_event_driven_engine(name):
+	clock, components, _ = CIRCUITS[name]()
+	compile_batched(components, clock, LANES).cross_check(64)
+
+
+def writer() -> tuple[Bus, list, Bus, RAM]:
+	"""A RAM that a counter fills with its count mixed with an input from outside."""
+	b = Builder()
+	count, _ = b.counter(8)
+	mix = b.add(Xor(8))
+	external = Bus(8)
+	mix.add_input().set_b(count)
+	mix.add_input().set_b(external)
+	address = b.add(Splitter(8))
+	address.add_input(list(range(8))).set_b(count)
+	ram = b.add(RAM(4, 8))
+	ram.A.set_b(address.add_output([0, 1, 2, 3]).get_b())
+	ram.IN.set_b(mix.O.get_b())
+	ram.WE.set_b(b.const(1, 1))
+	ram.OE.set_b(b.const(1, 1))
+	ram.C.set_b(b.clock)
+	ram.OUT.get_b()
+	return b.clock, b.components, external, ram
+
+
+def test_lanes_run_on_inputs_of_their_own():
+	clock, components, external, ram = writer()
+	batch = compile_batched(components, clock, LANES)
+	inputs = [State.from_planes(8, 0x11 * (lane + 1)) for lane in range(LANES)]
+	batch.set_net(external, inputs)
+	batch.run(20)
+	for lane, state in enumerate(inputs):
+		# The same circuit driven by the event-driven engine with this lane's input
+		clock, components, external, expected = writer()
+		external.set_state(state)
+		for _ in range(20):
+			clock.set_state(State.from_planes(1, 1))
+			clock.set_state(State.from_planes(1, 0))
+		assert batch.net_state(ram.OUT.bus, lane) == expected.OUT.bus.state
+		for address in range(16):
+			assert batch.read_memory(ram, lane, address) == expected.locs[address]
+	# The RAM of the event-driven objects is left alone
+	assert ram.locs.first_difference(RAM(4, 8).locs) is None
+
+
+def test_only_outside_nets_can_be_set():
+	clock, components, external, ram = writer()
+	batch = compile_batched(components, clock, LANES)
+	with pytest.raises(ValueError):
+		batch.set_net(clock, State.from_planes(1, 1))
+	with pytest.raises(ValueError):
+		batch.set_net(ram.OUT.bus, State(8))
+	with pytest.raises(ValueError):
+		batch.set_net(external, [State(8)] * (LANES + 1))
+
+
+def test_a_batch_needs_a_lane():
+	clock, components, _ = CIRCUITS["gates"]()
+	with pytest.raises(ValueError):
+		compile_batched(components, clock, 0)
+
+
+@pytest.mark.skipif(not os.path.exists(CIRCUIT), reason="Circuit.circ is not there")
+def test_virus32_lane_zero_matches_the_event_driven_engine():
+	from pylogic import logisim
+
+	circuit = logisim.import_circ(CIRCUIT)
+	start = circuit.pins["/Button(320, 310)"]
+	start.set_state(State.from_planes(1, 1))
+	start.set_state(State.from_planes(1, 0))
+	compile_batched(circuit.components, circuit.clock, 2).cross_check(30)
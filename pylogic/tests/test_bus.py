@@ -0,0 +1,87 @@
+from pylogic.base_components import Bus, OutputPort
+from pylogic.classes import State
+from pylogic.components.gates import Not
+from pylogic.enums import BitState
+
+L, H = State(1, starter=BitState.LOW), State(1, starter=BitState.HIGH)
+
+
+def watched(bus: Bus) -> list[State]:
+	seen = []
+	bus.add_callback(seen.append)
+	return seen
+
+
+def test_an_unchanged_state_does_not_run_callbacks():
+	bus = Bus(1)
+	seen = watched(bus)
+	assert bus.set_state(H)
+	assert not bus.set_state(State(1, starter=BitState.HIGH))
+	assert seen == [H]
+
+
+def test_suppressed_updates_are_counted(simulator):
+	gate = Not(1)
+	i, o = Bus(1), Bus(1)
+	gate.I.set_b(i)
+	gate.O.set_b(o)
+	i.set_state(H)
+	simulator.reset_counters()
+	seen = watched(o)
+	# The port is driven again with an equal state, which reaches the bus but goes no further
+	gate.O.set_state(L)
+	assert (simulator.delivered, simulator.suppressed) == (0, 1)
+	i.set_state(L)
+	assert (simulator.delivered, simulator.suppressed) == (1, 1)
+	assert seen == [H]
+
+
+def test_a_change_that_resolves_to_the_same_state_is_suppressed():
+	bus = Bus(1)
+	a, b = OutputPort(1), OutputPort(1)
+	a.set_b(bus)
+	b.set_b(bus)
+	a.set_state(H)
+	seen = watched(bus)
+	# A second driver agreeing with the first changes the drivers but not the bus
+	b.set_state(H)
+	assert bus.state == H
+	assert seen == []
+
+
+def driven(width: int, *states: State) -> tuple[Bus, list[OutputPort]]:
+	bus = Bus(width)
+	ports = []
+	for state in states:
+		port = OutputPort(width)
+		port.set_b(bus)
+		port.set_state(state)
+		ports.append(port)
+	return bus, ports
+
+
+def test_conflicting_drivers_resolve_per_bit():
+	# Bit 0 agrees, bit 1 conflicts, bit 2 has one driver, bit 3 has none and bit 4 has an error
+	bus, _ = driven(5, State.from_planes(5, 0b10111, 0b11000), State.from_planes(5, 0b00001, 0b11100))
+	assert bus.state.bits == [BitState.HIGH, BitState.ERROR, BitState.HIGH, BitState.FLOATING, BitState.ERROR]
+
+
+def test_floating_drivers_are_dropped():
+	bus, (a, b) = driven(1, H, L)
+	assert bus.state.get(0) == BitState.ERROR
+	b.set_state(BitState.FLOATING)
+	assert bus.state == H
+	assert list(bus.drivers) == [a]
+	a.set_state(BitState.FLOATING)
+	assert bus.drivers == {}
+	assert bus.state == State(1)
+
+
+def test_pull_fills_only_floating_bits():
+	bus, _ = driven(2, State.from_planes(2, 0b00, 0b10))
+	bus.set_pull(BitState.HIGH)
+	assert bus.state == State.from_planes(2, 0b10)
+	bus.set_pull(BitState.LOW)
+	assert bus.state == State.from_planes(2, 0b00)
+	bus.set_pull(BitState.ERROR)
+	assert bus.state.bits == [BitState.LOW, BitState.ERROR]
@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from pylogic.base_components import Bus
+from pylogic.classes import State
+from pylogic.components.memory import Counter
+from pylogic.components.wiring import Clock
+from pylogic.enums import BitState
+
+L, H = State(1, starter=BitState.LOW), State(1, starter=BitState.HIGH)
+
+
+def clocked_counter(clock: Clock) -> Bus:
+	count = Counter(8)
+	high = Bus(1)
+	high.set_state(H)
+	count.CE.set_b(high)
+	count.DS.set_b(high)
+	wire = Bus(1)
+	clock.C.set_b(wire)
+	count.C.set_b(wire)
+	return count.O.get_b()
+
+
+def test_run_advances_simulated_time_not_wall_time(simulator):
+	clock = Clock(1.0)
+	out = clocked_counter(clock)
+	started = time.perf_counter()
+	assert clock.run(10) == 10
+	assert time.perf_counter() - started < 1
+	assert simulator.time == pytest.approx(10.0)
+	assert clock.cycles == 10
+	# The first rising edge comes from a floating clock, which is no edge
+	assert out.state == State.from_planes(8, 9)
+
+
+def test_run_until_stops_on_the_condition():
+	clock = Clock(1000.0)
+	out = clocked_counter(clock)
+	assert clock.run_until(lambda: out.state.value == 5) == 6
+	assert clock.run_until(lambda: False, limit=3) == 3
+
+
+def test_the_stop_input_ends_a_free_run():
+	clock = Clock(1000.0)
+	out = clocked_counter(clock)
+	stop = Bus(1)
+	stop.set_state(L)
+	clock.I.set_b(stop)
+	out.add_callback(lambda state: state.value == 20 and stop.set_state(H))
+	assert clock.run_free() == 21
+	assert not clock.running
+
+
+def test_the_start_input_sets_the_clock_running():
+	clock = Clock(1000.0)
+	start = Bus(1)
+	start.set_state(L)
+	clock.T.set_b(start)
+	assert not clock.running
+	start.set_state(H)
+	assert clock.running
+
+
+def test_realtime_keeps_pace_with_the_wall_clock():
+	clock = Clock(100.0, realtime=True)
+	clocked_counter(clock)
+	started = time.perf_counter()
+	clock.run(5)
+	assert time.perf_counter() - started >= 0.045
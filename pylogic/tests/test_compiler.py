@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from pylogic.base_components import Bus
+from pylogic.classes import State
+from pylogic.components.gates import Nand, Not
+from pylogic.components.memory import Counter
+from pylogic.compiler import compile_circuit
+from pylogic.enums import BitState
+from pylogic.errors import OscillationException, UnsupportedComponentException
+
+from .circuits import CIRCUITS, CIRCUIT, Builder
+
+VIRUS32_START = "/Button(320, 310)"
+
+
+@pytest.mark.parametrize("name", CIRCUITS)
+def test_compiled_circuits_match_the_event_driven_engine(name):
+	clock, components, _ = CIRCUITS[name]()
+	compile_circuit(components, clock).cross_check(64)
+
+
+@pytest.mark.parametrize("name", CIRCUITS)
+def test_store_writes_the_compiled_state_back(name):
+	clock, components, watched = CIRCUITS[name]()
+	compiled = compile_circuit(components, clock)
+	compiled.run(10)
+	expected = [compiled.net_state(bus) for bus in watched]
+	compiled.store()
+	assert [bus.state for bus in watched] == expected
+	# The event-driven engine carries on from the stored state
+	compiled.cross_check(5)
+
+
+def test_a_gated_ring_oscillates_in_both_engines():
+	b = Builder()
+	_, bits = b.counter(1)
+	ring = b.add(Nand(1))
+	feedback = Bus(1)
+	feedback.set_pull(BitState.LOW)
+	ring.add_input().set_b(bits[0])
+	ring.add_input().set_b(feedback)
+	ring.O.set_b(feedback)
+	compiled = compile_circuit(b.components, b.clock)
+	with pytest.raises(OscillationException):
+		compiled.run(2)
+
+
+def test_components_without_code_are_refused():
+	with pytest.raises(UnsupportedComponentException):
+		compile_circuit([object()], Bus(1))
+
+
+def test_a_component_driving_the_clock_is_refused():
+	clock = Bus(1)
+	inverter = Not(1)
+	inverter.I.set_b(clock)
+	inverter.O.set_b(clock)
+	with pytest.raises(UnsupportedComponentException):
+		compile_circuit([inverter], clock)
+
+
+def test_run_counts_whole_clock_cycles():
+	b = Builder()
+	count, _ = b.counter(8)
+	compiled = compile_circuit(b.components, b.clock)
+	compiled.run(37)
+	# The clock starts floating, so the first cycle has no rising edge
+	assert compiled.net_state(count) == State.from_planes(8, 36)
+
+
+@pytest.mark.skipif(not os.path.exists(CIRCUIT), reason="Circuit.circ is not there")
+def test_virus32_matches_the_event_driven_engine():
+	from pylogic import logisim
+
+	circuit = logisim.import_circ(CIRCUIT)
+	start = circuit.pins[VIRUS32_START]
+	start.set_state(State.from_planes(1, 1))
+	start.set_state(State.from_planes(1, 0))
+	compile_circuit(circuit.components, circuit.clock).cross_check(50)
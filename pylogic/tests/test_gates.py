@@ -0,0 +1,104 @@
+import pytest
+
+from pylogic.base_components import Bus
+from pylogic.classes import State
+from pylogic.components.gates import Not, Buffer, And, Or, Nand, Nor, Xor, Xnor, ControlledBuffer
+from pylogic.enums import BitState, BufferSetting
+
+L, H, Z, E = BitState.LOW, BitState.HIGH, BitState.FLOATING, BitState.ERROR
+
+
+def evaluate(kind: type, *levels: BitState) -> BitState:
+	gate = kind(1)
+	buses = [Bus(1) for _ in levels]
+	for bus in buses:
+		gate.add_input().set_b(bus)
+	out = Bus(1)
+	gate.O.set_b(out)
+	# Buses start floating, so every input is driven high first to be sure the gate sees an event
+	for bus, level in zip(buses, levels):
+		bus.set_state(State(1, starter=H))
+		bus.set_state(State(1, starter=level))
+	return out.state.get(0)
+
+
+@pytest.mark.parametrize("kind, decider, decided", [(And, L, L), (Nand, L, H), (Or, H, H), (Nor, H, L)])
+def test_a_deciding_input_wins_over_unknowns(kind, decider, decided):
+	for other in (L, H, Z, E):
+		assert evaluate(kind, decider, other) == decided
+		assert evaluate(kind, other, decider) == decided
+
+
+@pytest.mark.parametrize("kind", [And, Nand, Or, Nor, Xor, Xnor])
+def test_unknown_inputs_give_an_error_otherwise(kind):
+	passive = {And: H, Nand: H, Or: L, Nor: L, Xor: L, Xnor: L}[kind]
+	for unknown in (Z, E):
+		assert evaluate(kind, passive, unknown) == E
+		assert evaluate(kind, unknown, unknown) == E
+
+
+def test_known_truth_tables():
+	for a in (L, H):
+		for b in (L, H):
+			x, y = a == H, b == H
+			assert (evaluate(And, a, b) == H) == (x and y)
+			assert (evaluate(Nand, a, b) == H) == (not (x and y))
+			assert (evaluate(Or, a, b) == H) == (x or y)
+			assert (evaluate(Nor, a, b) == H) == (not (x or y))
+			assert (evaluate(Xor, a, b) == H) == (x != y)
+			assert (evaluate(Xnor, a, b) == H) == (x == y)
+
+
+def test_xor_is_one_hot_over_more_inputs():
+	assert evaluate(Xor, H, H, H) == L
+	assert evaluate(Xor, L, H, L) == H
+
+
+def test_gates_evaluate_every_bit_at_once():
+	gate = And(32)
+	a, b, out = Bus(32), Bus(32), Bus(32)
+	gate.add_input().set_b(a)
+	gate.add_input().set_b(b)
+	gate.O.set_b(out)
+	a.set_state(State.from_planes(32, 0xFFFF0000, 0x0000FF00))
+	b.set_state(State.from_planes(32, 0xFF00FF00))
+	# Bits 8-15 are unknown on a against high on b, bits 0-7 are low on both
+	assert out.state == State.from_planes(32, 0xFF00FF00, 0x0000FF00)
+
+
+def test_not_turns_floating_into_error():
+	gate = Not(4)
+	i, o = Bus(4), Bus(4)
+	gate.I.set_b(i)
+	gate.O.set_b(o)
+	i.set_state(State.from_planes(4, 0b0001, 0b0100))
+	assert o.state == State.from_planes(4, 0b1110, 0b0100)
+
+
+@pytest.mark.parametrize("setting, expected", [
+	(BufferSetting.LOW_HIGH, [L, H, Z, E]),
+	(BufferSetting.LOW_FLOATING, [L, Z, Z, E]),
+	(BufferSetting.FLOATING_HIGH, [Z, H, Z, E]),
+])
+def test_buffer_settings(setting, expected):
+	gate = Buffer(4, setting)
+	i, o = Bus(4), Bus(4)
+	gate.I.set_b(i)
+	gate.O.set_b(o)
+	i.set_state(State.from_planes(4, 0b1010, 0b1100))
+	assert o.state.bits == expected
+
+
+def test_controlled_buffer():
+	gate = ControlledBuffer(4)
+	i, e, o = Bus(4), Bus(1), Bus(4)
+	gate.I.set_b(i)
+	gate.E.set_b(e)
+	gate.O.set_b(o)
+	i.set_state(State.from_planes(4, 0b0101))
+	e.set_state(State(1, starter=H))
+	assert o.state == State.from_planes(4, 0b0101)
+	e.set_state(State(1, starter=L))
+	assert o.state == State(4)
+	e.set_state(State(1, starter=Z))
+	assert o.state == State(4, starter=E)
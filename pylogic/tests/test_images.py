@@ -0,0 +1,83 @@
+import json
+import struct
+
+import pytest
+
+from pylogic.classes import State
+from pylogic.components.memory import RAM, ROM
+from pylogic.util import RawImage, HexImage, open_image
+
+
+@pytest.fixture
+def path(tmp_path):
+	def path(name: str, data: bytes | str) -> str:
+		target = tmp_path / name
+		if isinstance(data, str):
+			target.write_text(data)
+		else:
+			target.write_bytes(data)
+		return str(target)
+	return path
+
+
+def test_raw_images_decode_words_in_either_byte_order(path):
+	data = struct.pack("<3H", 1, 0x1234, 0xFFFF)
+	little = RawImage(path("words.bin", data), 16)
+	assert len(little) == 3
+	assert [little.word(a) for a in range(3)] == [1, 0x1234, 0xFFFF]
+	assert RawImage(little.path, 16, "big").word(1) == 0x3412
+	# Past the end of the file memory reads as zero
+	assert little.word(10) == 0
+
+
+def test_an_empty_raw_image(path):
+	image = RawImage(path("empty.bin", b""), 8)
+	assert len(image) == 0
+	assert image.word(0) == 0
+
+
+def test_hex_images_expand_runs_and_skip_comments(path):
+	image = HexImage(path("words.hex", "v2.0 raw\n# A comment 99\n1 3*ff\n0 2a # trailing\n"))
+	assert [image.word(a) for a in range(7)] == [1, 0xFF, 0xFF, 0xFF, 0, 0x2A, 0]
+	assert len(image) == 6
+
+
+def test_hex_images_are_only_scanned_as_far_as_read(path):
+	image = HexImage(path("long.hex", "v2.0 raw\n" + " ".join(f"{i:x}" for i in range(10000))))
+	assert image.word(3) == 3
+	assert image.end < 100
+	assert image.word(9999) == 9999
+	assert len(image) == 10000
+
+
+def test_a_hex_image_needs_its_header(path):
+	with pytest.raises(ValueError):
+		HexImage(path("bad.hex", "1 2 3"))
+
+
+def test_open_image_tells_the_formats_apart(path):
+	assert isinstance(open_image(path("a.hex", "v2.0 raw\n1"), 8), HexImage)
+	assert isinstance(open_image(path("a.bin", b"\x01"), 8), RawImage)
+
+
+def test_roms_read_their_images(path):
+	rom = ROM(4, 16, path("rom.bin", struct.pack("<2H", 0xBEEF, 7)))
+	assert rom.read(State.from_planes(4, 0)) == State.from_planes(16, 0xBEEF)
+	rom = ROM(4, 8, path("rom.hex", "v2.0 raw\n2*10 20"))
+	assert rom.read(State.from_planes(4, 2)) == State.from_planes(8, 0x20)
+
+
+def test_json_roms_wrap_negative_words(path):
+	rom = ROM(4, 8, path("rom.json", json.dumps([-1, 5, -128])))
+	assert [rom.read(State.from_planes(4, a)).value for a in range(3)] == [0xFF, 5, 0x80]
+
+
+def test_writes_to_a_ram_image_stay_in_memory(path):
+	image = path("ram.bin", bytes(range(16)))
+	ram = RAM(4, 8, image_path=image)
+	assert ram.read(State.from_planes(4, 5)) == State.from_planes(8, 5)
+	ram.write(State.from_planes(4, 5), State.from_planes(8, 0xAA))
+	assert ram.read(State.from_planes(4, 5)) == State.from_planes(8, 0xAA)
+	assert ram.read(State.from_planes(4, 6)) == State.from_planes(8, 6)
+	with open(image, "rb") as f:
+		assert f.read() == bytes(range(16))
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+from pylogic.base_components import Bus
+from pylogic.classes import State
+from pylogic.components.gates import Not
+from pylogic.enums import BitState
+from pylogic.instrument import InstrumentedSimulator, InstrumentedBus, instrument
+from pylogic.simulator import Simulator
+
+L, H = State(1, starter=BitState.LOW), State(1, starter=BitState.HIGH)
+
+
+def chain(length: int) -> tuple[Bus, list[Not], list[Bus]]:
+	"""A source bus feeding length Not gates in a row, with the bus after each."""
+	source = Bus(1)
+	bus = source
+	gates, buses = [], []
+	for _ in range(length):
+		gate = Not(1)
+		gate.I.set_b(bus)
+		bus = gate.O.get_b()
+		gates.append(gate)
+		buses.append(bus)
+	return source, gates, buses
+
+
+def test_every_callback_and_bus_change_is_counted(simulator):
+	source, gates, buses = chain(3)
+	with instrument(gates) as stats:
+		assert isinstance(simulator, InstrumentedSimulator)
+		source.set_state(H)
+		source.set_state(L)
+	assert all(stats.calls[gate] == 2 for gate in gates)
+	assert all(stats.time[gate] > 0 for gate in gates)
+	assert all(stats.events[bus] == 2 for bus in buses)
+	assert stats.events[source] == 2
+	assert stats.deliveries[source] == 2
+	# The last bus has no readers
+	assert stats.deliveries[buses[-1]] == 0
+	assert stats.settles == 2
+	assert stats.depth == 4
+
+
+def test_detaching_restores_the_plain_classes(simulator):
+	source, gates, buses = chain(2)
+	stats = instrument(gates)
+	with pytest.raises(RuntimeError):
+		instrument(gates)
+	stats.detach()
+	assert type(simulator) is Simulator
+	assert not hasattr(simulator, "instrumentation")
+	assert all(type(bus) is Bus for bus in [source] + buses)
+	source.set_state(H)
+	assert stats.settles == 0
+	assert buses[-1].state == H
+
+
+def test_rows_report_components_and_buses_by_name():
+	source, gates, buses = chain(2)
+	with instrument(gates, {gates[0]: "first"}) as stats:
+		source.set_state(H)
+	rows = {row["name"]: row for row in stats.rows()}
+	assert rows["first"]["kind"] == "component"
+	assert rows["first"]["fanout"] == 1
+	assert rows["Not#1"]["fanout"] == 0
+	bus = next(row for row in rows.values() if row["kind"] == "bus" and row["deliveries"])
+	assert bus["events"] == 1 and bus["width"] == 1
+
+
+def test_table_sorts_by_a_known_key():
+	source, gates, _ = chain(2)
+	with instrument(gates, {gates[0]: "A2", gates[1]: "A1"}) as stats:
+		source.set_state(H)
+	table = stats.table("name", top=2).splitlines()
+	assert table[0] == "1 settles, at most 3 delta cycles each"
+	assert [line.split()[-1] for line in table[2:]] == ["A1", "A2"]
+	with pytest.raises(ValueError):
+		stats.table("speed")
+
+
+def test_reset_and_save(tmp_path):
+	source, gates, _ = chain(2)
+	with instrument(gates) as stats:
+		source.set_state(H)
+		path = tmp_path / "profile.json"
+		stats.save(str(path))
+		saved = json.loads(path.read_text())
+		assert saved["settles"] == 1
+		assert len(saved["rows"]) == len(stats.rows())
+		stats.reset()
+		assert stats.dump() == {"settles": 0, "depth": 0, "rows": []}
+		source.set_state(L)
+		assert stats.settles == 1
+
+
+def test_instrumented_bus_counts_only_changes():
+	source, gates, _ = chain(1)
+	with instrument(gates) as stats:
+		assert type(source) is InstrumentedBus
+		source.set_state(H)
+		source.set_state(H)
+	assert stats.events[source] == 1
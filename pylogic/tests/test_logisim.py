@@ -0,0 +1,125 @@
+import os
+
+import pytest
+
+from pylogic import logisim
+from pylogic.classes import State
+from pylogic.enums import BitState
+from pylogic.errors import WidthConflictException
+
+from .circuits import CIRCUIT
+
+L, H = State(1, starter=BitState.LOW), State(1, starter=BitState.HIGH)
+
+
+def circ(*elements: str) -> str:
+	return (
+		'<?xml version="1.0" encoding="UTF-8" standalone="no"?>\n<project source="3.7.2" version="1.0">\n'
+		'<main name="main"/>\n<circuit name="main">\n' + "\n".join(elements) + "\n</circuit>\n</project>\n"
+	)
+
+
+def comp(name: str, loc: tuple[int, int], **attrs: str) -> str:
+	values = "".join(f'<a name="{key}" val="{value}"/>' for key, value in attrs.items())
+	return f'<comp lib="0" loc="({loc[0]},{loc[1]})" name="{name}">{values}</comp>'
+
+
+def wire(start: tuple[int, int], end: tuple[int, int]) -> str:
+	return f'<wire from="({start[0]},{start[1]})" to="({end[0]},{end[1]})"/>'
+
+
+@pytest.fixture
+def write(tmp_path):
+	def write(*elements: str) -> str:
+		path = str(tmp_path / "test.circ")
+		with open(path, "w") as f:
+			f.write(circ(*elements))
+		return path
+	return write
+
+
+def test_a_gate_between_pins(write):
+	# A two input AND gate of size 50 has its inputs 50 to the left, 20 above and below its output
+	path = write(
+		comp("AND Gate", (200, 100)),
+		comp("Pin", (100, 80), label="A"),
+		comp("Pin", (150, 120), label="B"),
+		comp("Pin", (250, 100), label="Y", output="true"),
+		wire((100, 80), (150, 80)),
+		wire((200, 100), (250, 100)),
+	)
+	circuit = logisim.import_circ(path, cache=False)
+	a, b, y = (circuit.pins[label] for label in "ABY")
+	a.set_state(H)
+	b.set_state(H)
+	assert y.state == H
+	b.set_state(L)
+	assert y.state == L
+
+
+def test_tunnels_and_wire_midpoints_join_nets(write):
+	path = write(
+		comp("NOT Gate", (200, 100)),
+		comp("Pin", (100, 100), label="A"),
+		comp("Tunnel", (100, 200), label="t"),
+		comp("Tunnel", (300, 100), label="t"),
+		comp("Pin", (150, 200), label="Y", output="true"),
+		# The input of the inverter touches the middle of this wire
+		wire((100, 100), (190, 100)),
+		wire((200, 100), (300, 100)),
+		wire((100, 200), (150, 200)),
+	)
+	circuit = logisim.import_circ(path, cache=False)
+	circuit.pins["A"].set_state(L)
+	assert circuit.pins["Y"].state == H
+
+
+def test_negated_inputs_get_an_inverter(write):
+	path = write(
+		comp("OR Gate", (200, 100), negate0="true"),
+		comp("Pin", (140, 80), label="A"),
+		comp("Pin", (150, 120), label="B"),
+		comp("Pin", (200, 100), label="Y", output="true"),
+	)
+	circuit = logisim.import_circ(path, cache=False)
+	circuit.pins["A"].set_state(H)
+	circuit.pins["B"].set_state(L)
+	assert circuit.pins["Y"].state == L
+	circuit.pins["A"].set_state(L)
+	assert circuit.pins["Y"].state == H
+
+
+def test_a_port_of_another_width_is_a_conflict(write):
+	path = write(
+		comp("NOT Gate", (200, 100)),
+		comp("Pin", (170, 100), label="A", width="8"),
+	)
+	with pytest.raises(WidthConflictException):
+		logisim.import_circ(path, cache=False)
+
+
+def test_unknown_components_are_listed(write):
+	path = write(comp("Keyboard", (100, 100)))
+	assert logisim.load_circ(path, cache=False).unsupported == ["/Keyboard(100, 100)"]
+
+
+def test_the_netlist_is_cached_until_the_file_changes(write):
+	path = write(comp("Pin", (100, 100), label="A"))
+	first = logisim.load_circ(path)
+	assert os.path.exists(os.path.join(os.path.dirname(path), "__pycache__", "test.circ.netlist"))
+	assert logisim.load_circ(path).pins == first.pins
+	path = write(comp("Pin", (100, 100), label="A"), comp("Pin", (200, 100), label="Bee"))
+	assert set(logisim.load_circ(path).pins) == {"A", "Bee"}
+
+
+def test_memory_contents_expand_runs():
+	assert logisim.memory_contents("addr/data: 8 8\n1 0 3*ff 0\n2") == {0: 1, 2: 0xFF, 3: 0xFF, 4: 0xFF, 6: 2}
+	assert logisim.memory_contents("addr/data: 8 8") == {}
+
+
+@pytest.mark.skipif(not os.path.exists(CIRCUIT), reason="Circuit.circ is not there")
+def test_virus32_imports_with_a_clock():
+	circuit = logisim.import_circ(CIRCUIT)
+	assert circuit.clock is not None
+	assert "/Button(320, 310)" in circuit.pins
+	assert len(circuit.components) > 100
@@ -0,0 +1,95 @@
+from array import array
+
+from pylogic.base_components import Bus
+from pylogic.classes import State, PagedMemory
+from pylogic.components.memory import RAM
+from pylogic.enums import BitState
+
+
+class Words:
+	"""An image whose word at every address is the address itself."""
+
+	def word(self, address: int) -> int:
+		return address
+
+
+def test_pages_are_allocated_on_the_first_write():
+	memory = PagedMemory(32, 32)
+	assert len(memory) == 1 << 32
+	assert memory[0xDEADBEEF] == State.from_planes(32, 0)
+	memory[0xDEADBEEF] = State.from_planes(32, 7)
+	assert list(memory.values) == [0xDEADBEEF >> 8]
+	assert memory.unknowns == {}
+	assert memory[0xDEADBEEF] == State.from_planes(32, 7)
+
+
+def test_the_unknown_plane_comes_with_the_first_unknown_bit():
+	memory = PagedMemory(8, 8)
+	memory[1] = State.from_planes(8, 1)
+	assert memory.unknowns == {}
+	memory[2] = State(8, starter=BitState.ERROR)
+	assert list(memory.unknowns) == [0]
+	assert memory[1] == State.from_planes(8, 1)
+	assert memory[2] == State(8, starter=BitState.ERROR)
+
+
+def test_words_are_packed_by_width():
+	assert PagedMemory(8, 8).typecode == "B"
+	assert PagedMemory(8, 24).typecode == "I"
+	wide = PagedMemory(8, 100)
+	assert wide.typecode is None
+	wide[3] = State.from_planes(100, 1 << 99)
+	assert isinstance(wide.values[0], list)
+	assert wide[3] == State.from_planes(100, 1 << 99)
+	assert isinstance(PagedMemory(8, 64).page(), array)
+
+
+def test_copies_share_pages_until_written():
+	memory = PagedMemory(16, 8)
+	memory[0x100] = State.from_planes(8, 1)
+	copy = memory.copy()
+	assert copy.values[1] is memory.values[1]
+	copy[0x100] = State.from_planes(8, 2)
+	memory[0x101] = State.from_planes(8, 3)
+	assert (memory[0x100], memory[0x101]) == (State.from_planes(8, 1), State.from_planes(8, 3))
+	assert (copy[0x100], copy[0x101]) == (State.from_planes(8, 2), State.from_planes(8, 0))
+
+
+def test_untouched_cells_read_through_to_the_image():
+	memory = PagedMemory(16, 8)
+	memory.image = Words()
+	assert memory[0x1234] == State.from_planes(8, 0x34)
+	# A write fills its page from the image, so the rest of it still reads the same
+	memory[0x1200] = State.from_planes(8, 0xAA)
+	assert memory[0x1201] == State.from_planes(8, 0x01)
+	memory.clear()
+	assert memory.image is None
+	assert memory[0x1201] == State.from_planes(8, 0)
+
+
+def test_first_difference():
+	memory = PagedMemory(12, 8)
+	other = memory.copy()
+	assert memory.first_difference(other) is None
+	other[0x345] = State.from_planes(8, 1)
+	assert memory.first_difference(other) == 0x345
+	memory[0x345] = State.from_planes(8, 1)
+	assert memory.first_difference(other) is None
+
+
+def test_a_ram_keeps_only_the_pages_it_wrote():
+	ram = RAM(24, 32)
+	address, data, write, clock = Bus(24), Bus(32), Bus(1), Bus(1)
+	ram.A.set_b(address)
+	ram.IN.set_b(data)
+	ram.WE.set_b(write)
+	ram.C.set_b(clock)
+	write.set_state(State.from_planes(1, 1))
+	clock.set_state(State.from_planes(1, 0))
+	for a in (0x000010, 0xFFFFF0, 0x800000):
+		address.set_state(State.from_planes(24, a))
+		data.set_state(State.from_planes(32, a + 1))
+		clock.set_state(State.from_planes(1, 1))
+		clock.set_state(State.from_planes(1, 0))
+	assert sorted(ram.locs.values) == [0x0000, 0x8000, 0xFFFF]
+	assert ram.read(State.from_planes(24, 0x800000)) == State.from_planes(32, 0x800001)
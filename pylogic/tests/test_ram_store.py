@@ -0,0 +1,116 @@
+import gc
+import os
+import weakref
+
+import pytest
+
+from pylogic import util
+from pylogic.classes import State, PagedMemory
+from pylogic.components.memory import RAM
+from pylogic.util import RamStore
+
+
+@pytest.fixture(autouse=True)
+def metadata(tmp_path, monkeypatch):
+	monkeypatch.setattr(util, "metadata_path", str(tmp_path))
+	return tmp_path
+
+
+def filled(addr_width: int, data_width: int, words: dict[int, int]) -> PagedMemory:
+	locs = PagedMemory(addr_width, data_width)
+	for address, value in words.items():
+		locs[address] = State.from_planes(data_width, value)
+	return locs
+
+
+def test_flush_appends_only_the_dirty_pages():
+	store = RamStore("flush", 12, 8)
+	locs = filled(12, 8, {1: 10, 0x300: 30})
+	store.touch(1)
+	store.touch(0x300)
+	store.flush(locs)
+	size = os.path.getsize(store.path)
+	locs[2] = State.from_planes(8, 20)
+	store.touch(2)
+	store.flush(locs)
+	# One more record of one page, and nothing at all when nothing changed
+	assert os.path.getsize(store.path) == size + util.RAM_RECORD.size + (1 << store.page_bits)
+	store.flush(locs)
+	assert os.path.getsize(store.path) == size + util.RAM_RECORD.size + (1 << store.page_bits)
+	pages = RamStore("flush", 12, 8).load()
+	assert sorted(pages) == [0, 3]
+	assert pages[0][1:3] == [(10, 0), (20, 0)]
+
+
+def test_checkpoint_drops_the_history():
+	store = RamStore("checkpoint", 8, 16)
+	locs = filled(8, 16, {5: 500})
+	for _ in range(3):
+		store.touch(5)
+		store.flush(locs)
+	store.checkpoint(locs)
+	assert os.path.getsize(store.path) == util.RAM_HEADER.size + util.RAM_RECORD.size + 2 * 256
+
+
+def test_a_clear_is_recorded_and_replayed():
+	store = RamStore("clear", 8, 8)
+	locs = filled(8, 8, {1: 1})
+	store.touch(1)
+	store.flush(locs)
+	store.clear()
+	store.flush(locs)
+	assert RamStore("clear", 8, 8).load() == {}
+
+
+def test_unknown_cells_keep_their_plane():
+	store = RamStore("unknown", 8, 8)
+	locs = PagedMemory(8, 8)
+	locs[4] = State.from_planes(8, 0x0F, 0xF0)
+	store.touch(4)
+	store.flush(locs, block=False)
+	store.wait()
+	assert RamStore("unknown", 8, 8).load()[0][4] == (0x0F, 0xF0)
+
+
+def test_an_image_of_another_shape_is_refused():
+	store = RamStore("shape", 8, 8)
+	store.touch(0)
+	store.flush(PagedMemory(8, 8))
+	with pytest.raises(ValueError):
+		RamStore("shape", 8, 16).load()
+
+
+def test_writes_do_not_touch_the_file_until_a_flush():
+	ram = RAM(8, 8, volatile=False, name="lazy")
+	ram.write(State.from_planes(8, 1), State.from_planes(8, 11))
+	assert not os.path.exists(ram.store.path)
+	ram.flush()
+	assert RAM(8, 8, volatile=False, name="other").store.load() == {}
+	ram.close()
+	assert RAM(8, 8, volatile=False, name="lazy").read(State.from_planes(8, 1)) == State.from_planes(8, 11)
+
+
+def test_a_non_volatile_ram_needs_a_name_of_its_own():
+	with pytest.raises(ValueError):
+		RAM(4, 8, volatile=False)
+	first = RAM(4, 8, volatile=False, name="shared")
+	with pytest.raises(ValueError):
+		RAM(4, 8, volatile=False, name="shared")
+	first.close()
+	RAM(4, 8, volatile=False, name="shared")
+
+
+def test_close_keeps_the_contents_on_disk():
+	ram = RAM(4, 8, volatile=False, name="closed")
+	ram.write(State.from_planes(4, 3), State.from_planes(8, 42))
+	ram.close()
+	assert ram.store is None
+	assert RAM(4, 8, volatile=False, name="closed").read(State.from_planes(4, 3)) == State.from_planes(8, 42)
+
+
+def test_a_ram_is_not_kept_alive_by_its_exit_hook():
+	ram = RAM(4, 8, volatile=False, name="collected")
+	reference = weakref.ref(ram)
+	del ram
+	gc.collect()
+	assert reference() is None
@@ -0,0 +1,97 @@
+import pytest
+
+from pylogic.base_components import Bus
+from pylogic.classes import State
+from pylogic.components.gates import Not, Nand
+from pylogic.enums import BitState
+from pylogic.errors import OscillationException
+from pylogic.simulator import Simulator, set_simulator
+
+L, H = State(1, starter=BitState.LOW), State(1, starter=BitState.HIGH)
+
+
+def chain(depth: int) -> tuple[Bus, Bus]:
+	source = bus = Bus(1)
+	for _ in range(depth):
+		gate = Not(1)
+		gate.I.set_b(bus)
+		bus = Bus(1)
+		gate.O.set_b(bus)
+	return source, bus
+
+
+def ring() -> Bus:
+	"""A Nand whose output feeds one of its inputs, which oscillates while the other input is high."""
+	gate = Nand(1)
+	enable, feedback = Bus(1), Bus(1)
+	feedback.set_pull(BitState.LOW)
+	gate.add_input().set_b(enable)
+	gate.add_input().set_b(feedback)
+	gate.O.set_b(feedback)
+	enable.set_state(L)
+	return enable
+
+
+def test_deep_chains_settle_without_recursion(simulator):
+	source, sink = chain(5000)
+	simulator.sim_limit = 10000
+	source.set_state(L)
+	assert sink.state == L
+	source.set_state(H)
+	assert sink.state == H
+
+
+def test_every_gate_is_one_delta_cycle(simulator):
+	source, sink = chain(10)
+	source.set_state(L)
+	before = simulator.delta
+	source.set_state(H)
+	# Each delta delivers the output of one gate and runs the next, and a last one delivers the sink
+	assert simulator.delta - before == 11
+	assert sink.state == H
+
+
+def test_oscillation_raises_and_clears_the_queues(simulator):
+	simulator.sim_limit = 50
+	enable = ring()
+	with pytest.raises(OscillationException) as info:
+		enable.set_state(H)
+	assert info.value.sim_limit == 50
+	assert not simulator.updates and not simulator.dirty
+	assert not simulator.settling
+
+
+def test_a_stopped_ring_settles(simulator):
+	simulator.sim_limit = 50
+	enable = ring()
+	with pytest.raises(OscillationException):
+		enable.set_state(H)
+	enable.set_state(L)
+	assert enable.state == L
+
+
+def test_batch_defers_settling_until_the_outermost_exit(simulator):
+	a, b = Bus(1), Bus(1)
+	gate = Nand(1)
+	gate.add_input().set_b(a)
+	gate.add_input().set_b(b)
+	out = Bus(1)
+	gate.O.set_b(out)
+	a.set_state(L)
+	b.set_state(L)
+	assert out.state == H
+	with simulator.batch():
+		with simulator.batch():
+			a.set_state(H)
+			b.set_state(H)
+		assert out.state == H
+	assert out.state == L
+
+
+def test_set_simulator_replaces_the_kernel():
+	replacement = Simulator(sim_limit=7)
+	set_simulator(replacement)
+	source, sink = chain(3)
+	source.set_state(H)
+	assert sink.state == L
+	assert replacement.delta > 0
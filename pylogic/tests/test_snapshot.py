@@ -0,0 +1,80 @@
+import pytest
+
+from pylogic.classes import State
+from pylogic.components.memory import RAM
+from pylogic.snapshot import Snapshot
+
+from .circuits import memory, derived
+
+H, L = State.from_planes(1, 1), State.from_planes(1, 0)
+
+
+def cycle(clock, count: int = 1):
+	for _ in range(count):
+		clock.set_state(H)
+		clock.set_state(L)
+
+
+def observe(components, watched) -> list:
+	rams = [component.locs for component in components if isinstance(component, RAM)]
+	return [bus.state for bus in watched] + [[ram[a] for a in range(16)] for ram in rams]
+
+
+@pytest.mark.parametrize("build", [memory, derived])
+def test_a_restored_circuit_runs_on_as_before(build):
+	clock, components, watched = build()
+	cycle(clock, 13)
+	snapshot = Snapshot.take(components)
+	cycle(clock, 20)
+	expected = observe(components, watched)
+	snapshot.restore(components)
+	cycle(clock, 20)
+	assert observe(components, watched) == expected
+
+
+@pytest.mark.parametrize("build", [memory, derived])
+def test_a_snapshot_restores_into_another_copy_of_the_circuit(build, tmp_path):
+	clock, components, watched = build()
+	cycle(clock, 13)
+	path = str(tmp_path / "circuit.snap")
+	Snapshot.take(components).save(path)
+	cycle(clock, 20)
+	other_clock, other, other_watched = build()
+	Snapshot.load(path).restore(other)
+	cycle(other_clock, 20)
+	assert observe(other, other_watched) == observe(components, watched)
+
+
+def test_restored_memories_are_copies():
+	clock, components, _ = memory()
+	cycle(clock, 20)
+	snapshot = Snapshot.take(components)
+	ram = next(component for component in components if isinstance(component, RAM))
+	before = [ram.locs[a] for a in range(16)]
+	cycle(clock, 20)
+	snapshot.restore(components)
+	assert [ram.locs[a] for a in range(16)] == before
+	cycle(clock, 20)
+	# Writing after the restore leaves the snapshot as it was
+	snapshot.restore(components)
+	assert [ram.locs[a] for a in range(16)] == before
+
+
+def test_a_snapshot_only_fits_its_circuit():
+	_, components, _ = memory()
+	_, others, _ = derived()
+	with pytest.raises(ValueError):
+		Snapshot.take(components).restore(others)
+	with pytest.raises(ValueError):
+		Snapshot.from_bytes(b"not a snapshot" + bytes(64))
+
+
+def test_the_simulator_clock_is_restored(simulator):
+	clock, components, _ = derived()
+	cycle(clock, 3)
+	simulator.time = 1.5
+	snapshot = Snapshot.from_bytes(Snapshot.take(components).to_bytes())
+	delta = simulator.delta
+	cycle(clock, 3)
+	snapshot.restore(components)
+	assert (simulator.delta, simulator.time) == (delta, 1.5)
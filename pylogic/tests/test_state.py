@@ -0,0 +1,73 @@
+import pytest
+
+from pylogic.classes import State
+from pylogic.enums import BitState
+
+
+def test_starters_fill_both_planes():
+	assert (State(4, BitState.LOW).value, State(4, BitState.LOW).unknown) == (0, 0)
+	assert (State(4, BitState.HIGH).value, State(4, BitState.HIGH).unknown) == (0xF, 0)
+	assert (State(4).value, State(4).unknown) == (0, 0xF)
+	assert (State(4, BitState.ERROR).value, State(4, BitState.ERROR).unknown) == (0xF, 0xF)
+
+
+def test_from_planes_masks_to_the_width():
+	state = State.from_planes(4, 0x1F3, 0x10)
+	assert (state.value, state.unknown) == (0x3, 0)
+
+
+def test_get_and_set_bits():
+	state = State.from_planes(4, 0b0110, 0b1100)
+	assert state.bits == [BitState.LOW, BitState.HIGH, BitState.ERROR, BitState.FLOATING]
+	state.set(0, BitState.ERROR)
+	state.set(-1, BitState.HIGH)
+	assert (state.value, state.unknown) == (0b1111, 0b0101)
+	assert state.get(-1) == BitState.HIGH
+
+
+def test_floating_and_error_planes():
+	state = State.from_planes(4, 0b1010, 0b0110)
+	assert state.floating == 0b0100
+	assert state.error == 0b0010
+	assert not state.defined
+
+
+def test_slices():
+	state = State.from_planes(8, 0b10110100)
+	assert state[2:6] == State.from_planes(4, 0b1101)
+	assert state[::2] == State.from_planes(4, 0b0110)
+	assert state[2] == BitState.HIGH
+
+
+def test_from_int_wraps_negative_numbers():
+	assert State(8).from_int(-1) == State.from_planes(8, 0xFF)
+	assert State(8).from_int(200) == State.from_planes(8, 200)
+	with pytest.raises(ValueError):
+		State(8).from_int(256)
+	with pytest.raises(ValueError):
+		State(8).from_int(200, tc=True)
+
+
+def test_int_is_signed():
+	assert int(State.from_planes(8, 0xFF)) == -1
+	assert int(State.from_planes(8, 0x7F)) == 127
+	with pytest.raises(ValueError):
+		int(State(8))
+
+
+def test_neg_inverts_known_bits_and_keeps_unknowns():
+	assert -State.from_planes(4, 0b0011) == State.from_planes(4, 0b1100)
+	assert -State.from_planes(4, 0b0001, 0b0110) == State.from_planes(4, 0b1110, 0b0110)
+
+
+def test_equality_and_hash_cover_width_and_planes():
+	assert State.from_planes(4, 3) == State.from_planes(4, 3)
+	assert State.from_planes(4, 3) != State.from_planes(5, 3)
+	assert State.from_planes(4, 3) != State.from_planes(4, 3, 1)
+	assert len({State.from_planes(4, 3), State.from_planes(4, 3)}) == 1
+
+
+def test_str():
+	assert str(State(4)) == "Undefined"
+	assert str(State.from_planes(4, 1, 1)) == "Error"
+	assert str(State.from_planes(4, 5)) == "5 = 5 = 0101"
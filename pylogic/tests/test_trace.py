@@ -0,0 +1,88 @@
+import pytest
+
+from pylogic.base_components import Bus, InputPort
+from pylogic.classes import State
+from pylogic.components.memory import Counter
+from pylogic.components.wiring import Clock
+from pylogic.enums import BitState
+from pylogic.trace import BinaryTrace, Tracer, trace, vcd_code
+
+H = State(1, starter=BitState.HIGH)
+
+
+def clocked_counter() -> tuple[Clock, Bus, Bus]:
+	clock = Clock(1000.0)
+	count = Counter(4)
+	high = Bus(1)
+	high.set_state(H)
+	count.CE.set_b(high)
+	count.DS.set_b(high)
+	wire = Bus(1)
+	clock.C.set_b(wire)
+	count.C.set_b(wire)
+	return clock, wire, count.O.get_b()
+
+
+def test_vcd_codes_are_short_and_unique():
+	assert [vcd_code(i) for i in (0, 93, 94, 95)] == ["!", "~", "!!", "\"!"]
+	codes = [vcd_code(i) for i in range(20000)]
+	assert len(set(codes)) == len(codes)
+	assert all(" " not in code for code in codes)
+
+
+def test_a_vcd_trace_records_every_change_at_its_time(tmp_path):
+	clock, wire, out = clocked_counter()
+	path = tmp_path / "counter.vcd"
+	with trace(str(path), {"clock": wire, "count": out}, timescale="1us"):
+		clock.run(3)
+	lines = path.read_text().splitlines()
+	assert "$timescale 1us $end" in lines
+	assert "$var wire 1 ! clock $end" in lines
+	assert "$var wire 4 \" count $end" in lines
+	body = lines[lines.index("$dumpvars"):]
+	# Both start floating; the first edge comes from a floating clock, which only drives the count
+	assert body[1:4] == ["z!", "bzzzz \"", "$end"]
+	assert body[4:] == [
+		"#500", "1!", "b0 \"", "#1000", "0!", "#1500", "1!", "b1 \"", "#2000", "0!", "#2500", "1!", "b10 \"", "#3000", "0!",
+	]
+
+
+def test_a_binary_trace_reads_back_its_changes(tmp_path):
+	clock, wire, out = clocked_counter()
+	path = tmp_path / "counter.trace"
+	# Chunks this small hand off to the writer thread many times over
+	with Tracer(str(path), {"clock": wire, "count": out}, timescale="1ms", binary=True, scope="top", chunk=2, backlog=1):
+		clock.run(20)
+	read = BinaryTrace(str(path))
+	assert (read.timescale, read.scope, read.signals) == ("1ms", "top", [("clock", 1), ("count", 4)])
+	changes = list(read)
+	floating = State(4, starter=BitState.FLOATING)
+	assert changes[:2] == [(0, "clock", State(1, starter=BitState.FLOATING)), (0, "count", floating)]
+	counts = [state for _, name, state in changes if name == "count"]
+	assert counts[1:] == [State.from_planes(4, i % 16) for i in range(20)]
+	clocks = [(tick, state.value) for tick, name, state in changes[2:] if name == "clock"]
+	assert len(clocks) == 40
+	# Times are rounded to the timescale, half a millisecond to the even tick
+	assert clocks[-3:] == [(19, 0), (20, 1), (20, 0)]
+
+
+def test_closing_stops_recording(tmp_path):
+	clock, wire, _ = clocked_counter()
+	tracer = trace(str(tmp_path / "clock.trace"), {"clock": wire}, binary=True)
+	clock.run(2)
+	tracer.close()
+	tracer.close()
+	assert tracer.callbacks == [] and tracer not in wire.callbacks
+	clock.run(2)
+	assert len(list(BinaryTrace(str(tmp_path / "clock.trace")))) == 5
+
+
+def test_bad_signals_and_files_are_refused(tmp_path):
+	with pytest.raises(ValueError):
+		Tracer(str(tmp_path / "x.vcd"), {"bus": Bus(1)}, timescale="1min")
+	with pytest.raises(ValueError, match="port"):
+		Tracer(str(tmp_path / "x.vcd"), {"port": InputPort(1)})
+	path = tmp_path / "not.trace"
+	path.write_bytes(b"\0" * 32)
+	with pytest.raises(ValueError):
+		BinaryTrace(str(path))
@@ -0,0 +1,246 @@
+import datetime
+import json
+import queue
+import struct
+import threading
+import zlib
+from typing import Any, Iterator
+
+from .base_components import Bus, Port
+from .classes import State
+from .simulator import get_simulator
+
+TIMESCALES = {"1s": 1.0, "1ms": 1e-3, "1us": 1e-6, "1ns": 1e-9, "1ps": 1e-12}
+# A binary trace is this header, the JSON of its timescale and signals and compressed chunks of changes. A chunk is
+# its compressed size and the changes it holds; a change is its tick, the index of its signal, whether it has unknown
+# bits and the value plane of the signal's state, followed by its unknown plane when it has unknown bits.
+TRACE_MAGIC = b"PLTRACE\x01"
+TRACE_HEADER = struct.Struct("<8sI")
+CHUNK_HEADER = struct.Struct("<I")
+CHANGE = struct.Struct("<QIB")
+CHUNK = 1 << 16
+BACKLOG = 4
+
+
+def vcd_code(index: int) -> str:
+	"""The short identifier of a VCD signal, in base 94 over the printable characters."""
+	code = ""
+	while True:
+		index, digit = divmod(index, 94)
+		code += chr(33 + digit)
+		if not index:
+			return code
+		index -= 1
+
+
+class VcdWriter:
+	def __init__(self, signals: list[tuple[str, int]], timescale: str, scope: str):
+		self.signals = signals
+		self.timescale = timescale
+		self.scale = TIMESCALES[timescale]
+		self.scope = scope
+		self.codes = [vcd_code(i) for i in range(len(signals))]
+		self.tick = -1
+
+	def header(self, states: list[State], time: float) -> bytes:
+		out = [
+			f"$date {datetime.datetime.now().isoformat(timespec='seconds')} $end",
+			"$version pylogic $end",
+			f"$timescale {self.timescale} $end",
+			f"$scope module {self.scope} $end",
+		]
+		for (name, width), code in zip(self.signals, self.codes):
+			out.append(f"$var wire {width} {code} {name.replace(' ', '_')} $end")
+		out += ["$upscope $end", "$enddefinitions $end", f"#{round(time / self.scale)}", "$dumpvars"]
+		out += [self.value(i, state).rstrip("\n") for i, state in enumerate(states)]
+		out.append("$end\n")
+		self.tick = round(time / self.scale)
+		return "\n".join(out).encode()
+
+	def value(self, index: int, state: State) -> str:
+		if state.unknown:
+			bits = "".join(
+				("x" if state.value >> i & 1 else "z") if state.unknown >> i & 1 else str(state.value >> i & 1)
+				for i in range(state.width - 1, -1, -1)
+			)
+		else:
+			bits = format(state.value, "b")
+		if state.width == 1:
+			return f"{bits}{self.codes[index]}\n"
+		return f"b{bits} {self.codes[index]}\n"
+
+	def encode(self, changes: list[tuple[float, int, State]]) -> bytes:
+		out = []
+		scale = self.scale
+		tick = self.tick
+		for time, index, state in changes:
+			now = round(time / scale)
+			if now != tick:
+				out.append(f"#{now}\n")
+				tick = now
+			out.append(self.value(index, state))
+		self.tick = tick
+		return "".join(out).encode()
+
+
+class BinaryWriter:
+	"""The compact binary trace format, which BinaryTrace reads back."""
+
+	def __init__(self, signals: list[tuple[str, int]], timescale: str, scope: str):
+		self.signals = signals
+		self.timescale = timescale
+		self.scale = TIMESCALES[timescale]
+		self.scope = scope
+		self.sizes = [(width + 7) // 8 for _, width in signals]
+
+	def header(self, states: list[State], time: float) -> bytes:
+		description = json.dumps({"timescale": self.timescale, "scope": self.scope, "signals": self.signals}).encode()
+		return TRACE_HEADER.pack(TRACE_MAGIC, len(description)) + description + self.encode([(time, i, state) for i, state in enumerate(states)])
+
+	def encode(self, changes: list[tuple[float, int, State]]) -> bytes:
+		out = []
+		scale = self.scale
+		sizes = self.sizes
+		for time, index, state in changes:
+			size = sizes[index]
+			out.append(CHANGE.pack(round(time / scale), index, state.unknown != 0))
+			out.append(state.value.to_bytes(size, "little"))
+			if state.unknown:
+				out.append(state.unknown.to_bytes(size, "little"))
+		data = zlib.compress(b"".join(out), 1)
+		return CHUNK_HEADER.pack(len(data)) + data
+
+
+class Tracer:
+	"""
+	Records every change of the traced signals with its simulation time into a VCD file, or into the compact binary
+	format with binary set.
+
+	signals maps names to the buses to trace, or to ports, whose bus is traced. A change costs one append to a list on
+	the simulating thread; every chunk changes the list is handed to a background thread that encodes and writes it.
+	At most backlog chunks wait for it, beyond that the simulation waits, so a trace of any length takes bounded
+	memory. Times are rounded to the timescale.
+	"""
+
+	def __init__(
+			self,
+			path: str,
+			signals: dict[str, Bus | Port],
+			timescale: str = "1ns",
+			binary: bool = False,
+			scope: str = "pylogic",
+			chunk: int = CHUNK,
+			backlog: int = BACKLOG
+	):
+		if timescale not in TIMESCALES:
+			raise ValueError(f"Timescale {timescale} is not one of {', '.join(TIMESCALES)}")
+		self.path = path
+		self.buses: list[Bus] = []
+		for name, signal in signals.items():
+			bus = signal if isinstance(signal, Bus) else signal.bus
+			if bus is None:
+				raise ValueError(f"{name} is not connected to a bus")
+			self.buses.append(bus)
+		kind = BinaryWriter if binary else VcdWriter
+		self.writer = kind([(name, bus.width) for name, bus in zip(signals, self.buses)], timescale, scope)
+		self.chunk = chunk
+		self.changes: list[tuple[float, int, State]] = []
+		self.queue: queue.Queue[list | None] = queue.Queue(backlog)
+		self.callbacks = []
+		self.file = None
+		self.worker: threading.Thread | None = None
+
+	def start(self):
+		simulator = get_simulator()
+		self.file = open(self.path, "wb")
+		self.file.write(self.writer.header([bus.state for bus in self.buses], simulator.time))
+		self.worker = threading.Thread(target=self.write, daemon=True)
+		self.worker.start()
+		for index, bus in enumerate(self.buses):
+			callback = self.recorder(index, simulator)
+			bus.add_callback(callback)
+			self.callbacks.append((bus, callback))
+
+	def recorder(self, index: int, simulator):
+		changes = self.changes
+		chunk = self.chunk
+
+		def record(state: State):
+			changes.append((simulator.time, index, state))
+			if len(changes) >= chunk:
+				self.hand_off()
+		return record
+
+	def hand_off(self):
+		self.queue.put(self.changes[:])
+		self.changes.clear()
+
+	def write(self):
+		while True:
+			changes = self.queue.get()
+			if changes is None:
+				break
+			self.file.write(self.writer.encode(changes))
+
+	def close(self):
+		if self.worker is None:
+			return
+		for bus, callback in self.callbacks:
+			bus.callbacks.remove(callback)
+		self.callbacks = []
+		if self.changes:
+			self.hand_off()
+		self.queue.put(None)
+		self.worker.join()
+		self.worker = None
+		self.file.close()
+
+	def __enter__(self) -> "Tracer":
+		if self.worker is None:
+			self.start()
+		return self
+
+	def __exit__(self, *_):
+		self.close()
+
+
+class BinaryTrace:
+	"""A binary trace read back: its timescale, its signals as (name, width) and its changes as (tick, name, State)."""
+
+	def __init__(self, path: str):
+		self.path = path
+		with open(path, "rb") as f:
+			magic, size = TRACE_HEADER.unpack(f.read(TRACE_HEADER.size))
+			if magic != TRACE_MAGIC:
+				raise ValueError(f"{path} is not a pylogic trace")
+			description = json.loads(f.read(size))
+		self.timescale: str = description["timescale"]
+		self.scope: str = description["scope"]
+		self.signals: list[tuple[str, int]] = [tuple(signal) for signal in description["signals"]]
+		self.offset = TRACE_HEADER.size + size
+
+	def __iter__(self) -> Iterator[tuple[int, str, State]]:
+		sizes = [(width + 7) // 8 for _, width in self.signals]
+		with open(self.path, "rb") as f:
+			f.seek(self.offset)
+			while header := f.read(CHUNK_HEADER.size):
+				chunk = zlib.decompress(f.read(CHUNK_HEADER.unpack(header)[0]))
+				position = 0
+				while position < len(chunk):
+					tick, index, unknown = CHANGE.unpack_from(chunk, position)
+					position += CHANGE.size
+					name, width = self.signals[index]
+					value = int.from_bytes(chunk[position:position + sizes[index]], "little")
+					position += sizes[index]
+					unknowns = 0
+					if unknown:
+						unknowns = int.from_bytes(chunk[position:position + sizes[index]], "little")
+						position += sizes[index]
+					yield tick, name, State.from_planes(width, value, unknowns)
+
+
+def trace(path: str, signals: dict[str, Any], **options) -> Tracer:
+	"""Starts tracing signals into path until the returned Tracer is closed, or for the block it is used in."""
+	tracer = Tracer(path, signals, **options)
+	tracer.start()
+	return tracer
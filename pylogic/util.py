@@ -1,21 +1,205 @@
+import mmap
 import os
-import json
+import re
+import struct
+import threading
+from array import array
+from bisect import bisect_right
 
 metadata_path = "/simulation-metadata"
 
+# A RAM image is a header followed by page records; later records override earlier ones. A record is the page
+# number, a flag byte and the value plane of every cell in the page, followed by the unknown plane when the flag is
+# set. The CLEARED page number stands for a reset of the whole RAM.
+RAM_MAGIC = b"PLRAM\x01"
+RAM_HEADER = struct.Struct("<6sBBB")
+RAM_RECORD = struct.Struct("<IB")
+PAGE_BITS = 8
+CLEARED = 0xFFFFFFFF
 
-def update_ram_dump(name: str, data: list[int]):
-	with open(os.path.join(metadata_path, "ram_dump.json"), "r") as f:
-		dump = json.load(f)
-	dump[name] = data
-	with open(os.path.join(metadata_path, "ram_dump.json"), "w") as f:
-		json.dump(dump, f)
 
+class RamStore:
+	"""Keeps a non-volatile RAM on disk, writing only the pages that changed since the last flush."""
 
-def fetch_ram_dump(name: str):
-	with open(os.path.join(metadata_path, "ram_dump.json"), "r") as f:
-		dump = json.load(f)
-	try:
-		return dump[name]
-	except KeyError:
-		return None
+	def __init__(self, name: str, addr_width: int, data_width: int, directory: str = None):
+		self.path = os.path.join(directory or metadata_path, f"{name}.ram")
+		self.addr_width = addr_width
+		self.data_width = data_width
+		self.page_bits = min(PAGE_BITS, addr_width)
+		self.cell_bytes = (data_width + 7) // 8
+		self.dirty: set[int] = set()
+		self.pages: set[int] = set()
+		self.cleared = False
+		self.worker: threading.Thread | None = None
+
+	def touch(self, address: int):
+		page = address >> self.page_bits
+		self.dirty.add(page)
+		self.pages.add(page)
+
+	def clear(self):
+		self.dirty.clear()
+		self.pages.clear()
+		self.cleared = True
+
+	def encode(self, page: int, locs) -> bytes:
+		cells = [locs[address] for address in range(page << self.page_bits, (page + 1) << self.page_bits)]
+		values = b"".join(cell.value.to_bytes(self.cell_bytes, "little") for cell in cells)
+		if not any(cell.unknown for cell in cells):
+			return RAM_RECORD.pack(page, 0) + values
+		unknowns = b"".join(cell.unknown.to_bytes(self.cell_bytes, "little") for cell in cells)
+		return RAM_RECORD.pack(page, 1) + values + unknowns
+
+	def header(self) -> bytes:
+		return RAM_HEADER.pack(RAM_MAGIC, self.addr_width, self.data_width, self.page_bits)
+
+	def load(self) -> dict[int, list[tuple[int, int]]]:
+		"""Reads the image into {page: [(value, unknown) of every cell]}."""
+		pages = {}
+		if not os.path.exists(self.path):
+			return pages
+		size = self.cell_bytes << self.page_bits
+		with open(self.path, "rb") as f:
+			data = f.read()
+		if data[:RAM_HEADER.size] != self.header():
+			raise ValueError(f"{self.path} does not hold a {self.addr_width} bit RAM of {self.data_width} bit words")
+		offset = RAM_HEADER.size
+		while offset < len(data):
+			page, flags = RAM_RECORD.unpack_from(data, offset)
+			offset += RAM_RECORD.size
+			if page == CLEARED:
+				pages.clear()
+				continue
+			values = self.cells(data[offset:offset + size])
+			offset += size
+			unknowns = [0] * len(values)
+			if flags & 1:
+				unknowns = self.cells(data[offset:offset + size])
+				offset += size
+			pages[page] = list(zip(values, unknowns))
+		self.pages = set(pages)
+		return pages
+
+	def cells(self, planes: bytes) -> list[int]:
+		return [int.from_bytes(planes[i:i + self.cell_bytes], "little") for i in range(0, len(planes), self.cell_bytes)]
+
+	def append(self, data: bytes):
+		os.makedirs(os.path.dirname(self.path), exist_ok=True)
+		if not os.path.exists(self.path):
+			data = self.header() + data
+		with open(self.path, "ab") as f:
+			f.write(data)
+
+	def wait(self):
+		if self.worker is not None:
+			self.worker.join()
+			self.worker = None
+
+	def flush(self, locs, block: bool = True):
+		"""Appends the dirty pages to the image. The pages are encoded before returning, so locs may change during an asynchronous write."""
+		data = RAM_RECORD.pack(CLEARED, 0) if self.cleared else b""
+		data += b"".join(self.encode(page, locs) for page in sorted(self.dirty))
+		self.dirty.clear()
+		self.cleared = False
+		self.wait()
+		if not data:
+			return
+		if block:
+			self.append(data)
+		else:
+			self.worker = threading.Thread(target=self.append, args=(data,))
+			self.worker.start()
+
+	def checkpoint(self, locs):
+		"""Rewrites the image with one record per page in use, dropping the history of earlier flushes."""
+		self.wait()
+		data = self.header() + b"".join(self.encode(page, locs) for page in sorted(self.pages))
+		os.makedirs(os.path.dirname(self.path), exist_ok=True)
+		with open(self.path + ".tmp", "wb") as f:
+			f.write(data)
+		os.replace(self.path + ".tmp", self.path)
+		self.dirty.clear()
+		self.cleared = False
+
+
+def _map(path: str) -> mmap.mmap | bytes:
+	with open(path, "rb") as f:
+		if os.fstat(f.fileno()).st_size == 0:
+			return b""
+		return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class RawImage:
+	"""A memory image of fixed-size words, mapped into memory and decoded one word at a time."""
+
+	def __init__(self, path: str, data_width: int, byteorder: str = "little"):
+		self.path = path
+		self.size = (data_width + 7) // 8
+		self.byteorder = byteorder
+		self.map = _map(path)
+
+	def __len__(self):
+		return len(self.map) // self.size
+
+	def word(self, address: int) -> int:
+		start = address * self.size
+		return int.from_bytes(self.map[start:start + self.size], self.byteorder)
+
+
+class HexImage:
+	"""
+	A Logisim "v2.0 raw" image, as written by the AssemblX compilers, mapped into memory.
+
+	The text is only tokenised as far as the highest address read so far; for every token the index keeps its first
+	address and its offset in the file, and the word itself is decoded when it is read.
+	"""
+
+	HEADER = b"v2.0 raw"
+	TOKEN = re.compile(rb"#[^\n]*|[^\s#]+")
+
+	def __init__(self, path: str):
+		self.path = path
+		self.map = _map(path)
+		if self.map[:len(self.HEADER)] != self.HEADER:
+			raise ValueError(f"{path} is not a v2.0 raw image")
+		self.position = len(self.HEADER)
+		self.addresses = array("Q")
+		self.offsets = array("Q")
+		self.end = 0
+		self.done = False
+
+	def scan(self, address: int):
+		if self.end > address or self.done:
+			return
+		for match in self.TOKEN.finditer(self.map, self.position):
+			token = match.group()
+			if token.startswith(b"#"):
+				continue
+			count, _, _ = token.rpartition(b"*")
+			self.addresses.append(self.end)
+			self.offsets.append(match.start())
+			self.end += int(count) if count else 1
+			if self.end > address:
+				self.position = match.end()
+				return
+		self.done = True
+
+	def __len__(self):
+		self.scan(float("inf"))
+		return self.end
+
+	def word(self, address: int) -> int:
+		self.scan(address)
+		if address >= self.end:
+			return 0
+		token = self.TOKEN.match(self.map, self.offsets[bisect_right(self.addresses, address) - 1]).group()
+		return int(token.rpartition(b"*")[2], 16)
+
+
+def open_image(path: str, data_width: int) -> RawImage | HexImage:
+	"""Opens a memory image, telling v2.0 raw hex images from raw binary ones by their header."""
+	with open(path, "rb") as f:
+		header = f.read(len(HexImage.HEADER))
+	if header == HexImage.HEADER:
+		return HexImage(path)
+	return RawImage(path, data_width)